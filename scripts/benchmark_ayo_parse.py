@@ -0,0 +1,88 @@
+"""Benchmark parsing thousands of AYO input files, e.g. for a parameter sweep.
+
+Writes copies of the example AYO input file (with a varied telescope diameter)
+to a temporary directory and compares, per file:
+
+- reading the file (the I/O floor),
+- parsing every line with the pyparsing grammar only,
+- the default parse with the regex fast path, and
+- rebuilding the grammar, which used to happen for every file.
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pyparsing as pp
+
+from yieldplotlib.datasets import fetch_ayo_data
+from yieldplotlib.load.ayo.ayo_input import (
+    KEY_VALUE,
+    AYOInputFile,
+    Expression,
+    build_grammar,
+)
+from yieldplotlib.logger import logger
+
+N_FILES = 2000
+
+
+def parse_with_grammar(raw_data):
+    """Parse every line of an input file with the pyparsing grammar only."""
+    data = {}
+    for line in raw_data.split("\n"):
+        line = line.strip()
+        if not line or line.startswith(";") or line.startswith("#"):
+            continue
+        try:
+            parsed = KEY_VALUE.parseString(line, parseAll=True)
+        except pp.ParseException:
+            continue
+        value = parsed["value"][0]
+        if isinstance(value, Expression):
+            value = value.evaluate(data)
+        if "units" in parsed:
+            value *= parsed["units"]
+        data[parsed["key"]] = value
+    return data
+
+
+def main():
+    """Run the benchmark and print the time per file of each step."""
+    logger.setLevel("WARNING")
+    example = fetch_ayo_data().input.file_path.read_text(encoding="utf-8")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = []
+        for i in range(N_FILES):
+            path = Path(tmp_dir, f"sweep_{i:05d}.ayo")
+            path.write_text(example.replace("D = 7.22577", f"D = {6 + i / N_FILES}"))
+            paths.append(path)
+
+        timings = {}
+        start = time.perf_counter()
+        raw = [path.read_text(encoding="utf-8") for path in paths]
+        timings["read"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for raw_data in raw:
+            parse_with_grammar(raw_data)
+        timings["grammar only"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            AYOInputFile(path)
+        timings["AYOInputFile"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in paths:
+            build_grammar()
+        timings["grammar build"] = time.perf_counter() - start
+
+    print(f"{N_FILES} files")
+    print(f"{'step':>15} {'per file [ms]':>14}")
+    for step, total in timings.items():
+        print(f"{step:>15} {1e3 * total / N_FILES:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
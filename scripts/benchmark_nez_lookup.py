@@ -0,0 +1,58 @@
+"""Benchmark the per-star nEZ lookup used for blind completeness.
+
+Compares the grouped `first_planet_values` lookup against the original loop
+that searched the planets of every star, over synthetic universes of 10^3 to
+10^6 planets (about 10 planets per star). The loop is skipped for the largest
+universes because it grows as O(stars x planets).
+"""
+
+import time
+
+import numpy as np
+
+from yieldplotlib.load.exosims.exosims_input_file import first_planet_values
+
+# Universes larger than this are only timed with the grouped lookup
+MAX_LOOP_PLANETS = 10**5
+
+
+def loop_lookup(plan2star, nEZ, sInds):
+    """The original per-star lookup."""
+    star_nEZ = np.full(len(sInds), 3.0)
+    for i, sInd in enumerate(sInds):
+        planet_indices = np.where(plan2star == sInd)[0]
+        if len(planet_indices) > 0:
+            star_nEZ[i] = nEZ[planet_indices[0]]
+    return star_nEZ
+
+
+def best_time(func, *args, repeats=3):
+    """Return the best wall time of several calls."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    """Run the benchmark and print a table of timings."""
+    rng = np.random.default_rng(0)
+    print(f"{'planets':>10} {'stars':>8} {'grouped [s]':>12} {'loop [s]':>10}")
+    for n_planets in [10**3, 10**4, 10**5, 10**6]:
+        n_stars = n_planets // 10
+        plan2star = rng.integers(0, n_stars, n_planets)
+        nEZ = rng.uniform(0, 10, n_planets)
+        sInds = np.arange(n_stars)
+
+        grouped = best_time(first_planet_values, plan2star, nEZ, sInds, 3.0)
+        if n_planets <= MAX_LOOP_PLANETS:
+            loop = f"{best_time(loop_lookup, plan2star, nEZ, sInds, repeats=1):10.4f}"
+        else:
+            loop = f"{'skipped':>10}"
+        print(f"{n_planets:>10} {n_stars:>8} {grouped:12.4f} {loop}")
+
+
+if __name__ == "__main__":
+    main()
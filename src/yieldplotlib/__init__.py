@@ -2,6 +2,7 @@
 
 __all__ = [
     "KEY_MAP",
+    "RunCollection",
     "__version__",
     "calculate_axis_limits_and_ticks",
     "compare",
@@ -25,6 +26,7 @@ from importlib.resources import as_file, files
 import matplotlib.pyplot as plt
 
 from ._version import __version__
+from .core import RunCollection
 from .datasets import fetch_ayo_data, fetch_exosims_data, fetch_yip_data
 from .key_map import KEY_MAP
 from .logger import logger
@@ -7,8 +7,11 @@ __all__ = [
     "JSONFile",
     "Node",
     "PickleFile",
+    "RunCollection",
+    "StackedValues",
 ]
 
 from .directory_node import DirectoryNode
 from .file_nodes import CSVFile, FileNode, JSONFile, PickleFile
 from .node import Node
+from .run_collection import RunCollection, StackedValues
@@ -0,0 +1,364 @@
+"""Read-only view of zip and tar archives as directory trees.
+
+Archived runs can be loaded without extracting them to disk: `ArchivePath`
+implements the parts of the `pathlib.Path` interface used by the directory and
+file nodes (`iterdir`, `is_dir`, `open`, `stat`, ...) for the members of an
+archive, and members are only read when a node loads them. Readers open files
+through `open_path`, which accepts both paths on disk and archive members.
+
+Example:
+    >>> run = AYODirectory.from_archive("runs/ayo.zip")
+"""
+
+import io
+import os
+import stat
+import tarfile
+import threading
+import zipfile
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+from yieldplotlib.core.compression import decompress as decompress_file
+from yieldplotlib.core.compression import split_compression
+
+# Resource forks and metadata added by macOS when archiving
+JUNK_DIRECTORIES = {"__MACOSX"}
+JUNK_PREFIX = "._"
+
+
+class ArchiveStat(NamedTuple):
+    """The `os.stat_result` fields of an archive member used by the nodes."""
+
+    st_mode: int
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+
+
+def normalize_member(member: str) -> str:
+    """Return a member path without leading "./" or "/", "" for the root."""
+    member = str(PurePosixPath(member)).strip("/")
+    return "" if member == "." else member
+
+
+def is_junk(member: str) -> bool:
+    """Whether an archive member is macOS metadata rather than run data."""
+    parts = PurePosixPath(member).parts
+    return any(part in JUNK_DIRECTORIES for part in parts) or (
+        len(parts) > 0 and parts[-1].startswith(JUNK_PREFIX)
+    )
+
+
+class Archive:
+    """Index of the members of a zip or tar archive.
+
+    The archive is opened on first use, and again after unpickling, so archive
+    paths can be sent to worker processes.
+    """
+
+    def __init__(self, archive_path: Path | str):
+        """Index the members of an archive.
+
+        Args:
+            archive_path (Path | str):
+                The zip or tar (optionally compressed) archive.
+
+        Raises:
+            ValueError: If the file is neither a zip nor a tar archive.
+        """
+        self.path = Path(archive_path).resolve()
+        if zipfile.is_zipfile(self.path):
+            self.kind = "zip"
+        elif tarfile.is_tarfile(self.path):
+            self.kind = "tar"
+        else:
+            raise ValueError(f"{archive_path} is not a zip or tar archive")
+        self._handle = None
+        self._lock = threading.RLock()
+        # Maps the directories to their children (name -> is a directory), and
+        # the files to their (size, modification time in ns, archived name)
+        self.children = {"": {}}
+        self.files = {}
+        for name, is_dir, size, mtime_ns in self._list_members():
+            member = normalize_member(name)
+            if not member or is_junk(member):
+                continue
+            self._add(member, is_dir)
+            if not is_dir:
+                self.files[member] = (size, mtime_ns, name)
+
+    def __getstate__(self):
+        """Drop the open archive and lock, they are recreated when needed."""
+        state = self.__dict__.copy()
+        state["_handle"] = None
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        """Restore the index of the archive."""
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        """Show the archive path."""
+        return f"{self.__class__.__name__}({self.path})"
+
+    @property
+    def handle(self):
+        """The open `ZipFile` or `TarFile`."""
+        with self._lock:
+            if self._handle is None:
+                if self.kind == "zip":
+                    self._handle = zipfile.ZipFile(self.path)
+                else:
+                    self._handle = tarfile.open(self.path)
+            return self._handle
+
+    def _list_members(self):
+        """Yield the (name, is a directory, size, mtime in ns) of every member."""
+        if self.kind == "zip":
+            for info in self.handle.infolist():
+                mtime = datetime(*info.date_time).timestamp()
+                yield info.filename, info.is_dir(), info.file_size, int(mtime * 1e9)
+        else:
+            for info in self.handle.getmembers():
+                if info.isdir() or info.isfile():
+                    yield info.name, info.isdir(), info.size, int(info.mtime * 1e9)
+
+    def _add(self, member: str, is_dir: bool):
+        """Add a member and its parent directories to the index."""
+        path = PurePosixPath(member)
+        parents = [str(parent) for parent in path.parents][::-1]
+        # PurePosixPath("a").parent is ".", which is the archive root
+        parents = ["" if parent == "." else parent for parent in parents]
+        for parent, child in zip(parents, [*parents[1:], member], strict=True):
+            self.children.setdefault(parent, {})
+            name = PurePosixPath(child).name
+            self.children[parent][name] = child != member or is_dir
+        if is_dir:
+            self.children.setdefault(member, {})
+
+    def open(self, member: str):
+        """Open a file member for binary reading.
+
+        Zip members are decompressed as they are read. Tar members share a
+        single stream, so they are read whole under a lock.
+        """
+        if member not in self.files:
+            raise FileNotFoundError(f"No file {member} in {self.path}")
+        name = self.files[member][2]
+        if self.kind == "zip":
+            return self.handle.open(name)
+        with self._lock:
+            return io.BytesIO(self.handle.extractfile(name).read())
+
+    def close(self):
+        """Close the archive, it is reopened on the next read."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class ArchivePath:
+    """Path of a member of an `Archive`, with a subset of the `Path` interface.
+
+    Archive paths have no `__fspath__`, so libraries that need a real file
+    (e.g. memory-mapped fits files) fail loudly instead of reading the
+    archive itself.
+    """
+
+    def __init__(self, archive: Archive | Path | str, member: str = ""):
+        """Initialize the path.
+
+        Args:
+            archive (Archive | Path | str):
+                The archive, or the path of the archive to index.
+            member (str):
+                The member path inside the archive, "" for its root.
+        """
+        self.archive = archive if isinstance(archive, Archive) else Archive(archive)
+        self.member = normalize_member(member)
+
+    def __str__(self):
+        """Show the archive path followed by the member path."""
+        return str(self.archive.path / self.member)
+
+    def __repr__(self):
+        """Show the archive and member."""
+        return f"{self.__class__.__name__}({str(self)!r})"
+
+    def __eq__(self, other):
+        """Paths are equal if they point to the same member of the same archive."""
+        if not isinstance(other, ArchivePath):
+            return NotImplemented
+        return (self.archive.path, self.member) == (other.archive.path, other.member)
+
+    def __hash__(self):
+        """Hash the archive and member paths."""
+        return hash((self.archive.path, self.member))
+
+    def __lt__(self, other):
+        """Order paths by their member path."""
+        return str(self) < str(other)
+
+    def __truediv__(self, name: str):
+        """Return the path of a child member."""
+        return self.joinpath(name)
+
+    def joinpath(self, *names):
+        """Return the path of a descendant member."""
+        return ArchivePath(self.archive, str(PurePosixPath(self.member, *names)))
+
+    @property
+    def _pure(self) -> PurePosixPath:
+        return PurePosixPath(self.member or self.archive.path.name)
+
+    @property
+    def name(self) -> str:
+        """The member name, or the archive file name for its root."""
+        return self._pure.name
+
+    @property
+    def suffix(self) -> str:
+        """The member's file extension."""
+        return self._pure.suffix
+
+    @property
+    def suffixes(self) -> list:
+        """The member's file extensions."""
+        return self._pure.suffixes
+
+    @property
+    def stem(self) -> str:
+        """The member name without its last suffix."""
+        return self._pure.stem
+
+    @property
+    def parent(self):
+        """The parent member, the root is its own parent."""
+        parent = str(PurePosixPath(self.member).parent)
+        return ArchivePath(self.archive, "" if parent == "." else parent)
+
+    def with_suffix(self, suffix: str):
+        """Return the path with its suffix replaced."""
+        return ArchivePath(
+            self.archive, str(PurePosixPath(self.member).with_suffix(suffix))
+        )
+
+    def match(self, pattern: str) -> bool:
+        """Match the member path against a glob pattern, like `Path.match`."""
+        return self._pure.match(pattern)
+
+    def resolve(self):
+        """Archive paths are already absolute."""
+        return self
+
+    def exists(self) -> bool:
+        """Whether the member exists in the archive."""
+        return self.is_dir() or self.is_file()
+
+    def is_dir(self) -> bool:
+        """Whether the member is a directory."""
+        return self.member in self.archive.children
+
+    def is_file(self) -> bool:
+        """Whether the member is a file."""
+        return self.member in self.archive.files
+
+    def iterdir(self):
+        """Yield the paths of the members of this directory."""
+        if not self.is_dir():
+            raise NotADirectoryError(f"{self} is not a directory")
+        for name in self.archive.children[self.member]:
+            yield self / name
+
+    def stat(self) -> ArchiveStat:
+        """Return the size and modification time of the member."""
+        if self.is_file():
+            size, mtime_ns, _ = self.archive.files[self.member]
+            mode = stat.S_IFREG
+        elif self.is_dir():
+            size, mtime_ns = 0, self.archive.path.stat().st_mtime_ns
+            mode = stat.S_IFDIR
+        else:
+            raise FileNotFoundError(f"No member {self.member} in {self.archive.path}")
+        return ArchiveStat(mode, size, mtime_ns / 1e9, mtime_ns)
+
+    def open(self, mode: str = "r", encoding: str | None = None, **kwargs):
+        """Open the member for reading, in text mode unless mode has a "b"."""
+        if set(mode) - {"r", "b", "t"}:
+            raise ValueError(f"Archive members are read-only, cannot open in {mode}")
+        f = self.archive.open(self.member)
+        if "b" in mode:
+            return f
+        return io.TextIOWrapper(f, encoding=encoding, **kwargs)
+
+    def read_bytes(self) -> bytes:
+        """Read the member's contents."""
+        with self.open("rb") as f:
+            return f.read()
+
+    def read_text(self, encoding: str | None = None) -> str:
+        """Read the member's contents as text."""
+        with self.open("r", encoding=encoding) as f:
+            return f.read()
+
+
+def archive_root(archive_path: Path | str, member: str | None = None) -> ArchivePath:
+    """Return the directory of an archive holding a run.
+
+    Args:
+        archive_path (Path | str):
+            The zip or tar archive.
+        member (str, optional):
+            The run directory inside the archive. Defaults to the single
+            top-level directory if the archive has one (as in archives of a
+            run directory), otherwise the archive root.
+
+    Returns:
+        ArchivePath:
+            The run directory.
+    """
+    root = ArchivePath(archive_path)
+    if member is not None:
+        path = root.joinpath(member)
+        if not path.is_dir():
+            raise NotADirectoryError(f"No directory {member} in {archive_path}")
+        return path
+    children = list(root.iterdir())
+    if len(children) == 1 and children[0].is_dir():
+        return children[0]
+    return root
+
+
+def open_path(path, mode: str = "r", decompress: bool = True, **kwargs):
+    """Open a file on disk or an archive member, like the builtin `open`.
+
+    Files with a compression suffix (e.g. "observations.csv.gz") are
+    decompressed as they are read, see `core.compression`.
+
+    Args:
+        path (Path | ArchivePath | str):
+            The file to open for reading.
+        mode (str):
+            Read mode, text unless it contains "b".
+        decompress (bool):
+            If False, compressed files are read as they are stored.
+        **kwargs:
+            Passed to `open` (e.g. `encoding`).
+
+    Returns:
+        file-like:
+            The open file.
+    """
+    is_member = isinstance(path, ArchivePath)
+    name = path.name if is_member else os.path.basename(os.fspath(path))
+    compression = split_compression(name)[1] if decompress else None
+    if compression is None:
+        if is_member:
+            return path.open(mode, **kwargs)
+        return open(os.fspath(path), mode, **kwargs)
+    source = path.open("rb") if is_member else open(os.fspath(path), "rb")
+    return decompress_file(source, compression, mode, **kwargs)
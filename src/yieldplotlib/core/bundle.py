@@ -0,0 +1,221 @@
+"""Columnar "run bundles" holding every resolved key of a run in one file.
+
+A bundle is a single-row Arrow table with one list column per yieldplotlib
+key, so keys of different lengths share one file. Multi-dimensional arrays are
+stored flattened, and DataFrames get one column per DataFrame column (named
+"<key>/<column>"). The units, shapes and kinds of the values and the parsed
+input-file parameters are stored as JSON in the table's schema metadata.
+
+Bundles ending in ".parquet" are written as Parquet, anything else as an Arrow
+IPC file which is memory-mapped when read so that arrays are zero-copy views.
+pyarrow is an optional dependency, install it with ``yieldplotlib[arrow]``.
+"""
+
+import json
+from pathlib import Path
+
+import astropy.units as u
+import numpy as np
+import pandas as pd
+from lod_unit import lod
+
+from yieldplotlib.key_map import KEY_MAP
+from yieldplotlib.logger import logger
+
+# Schema metadata entry holding the bundle description
+METADATA_KEY = b"yieldplotlib"
+BUNDLE_VERSION = 1
+
+# Custom units whose string representation astropy cannot parse back
+CUSTOM_UNITS = {lod.to_string(): lod}
+
+
+def decode_unit(unit: str) -> u.UnitBase:
+    """Parse a unit string written by `UnitBase.to_string`.
+
+    Args:
+        unit (str):
+            The unit string.
+
+    Returns:
+        astropy.units.UnitBase:
+            The unit, including the custom units that astropy cannot parse.
+    """
+    if unit in CUSTOM_UNITS:
+        return CUSTOM_UNITS[unit]
+    return u.Unit(unit, parse_strict="warn")
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for run bundles."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ImportError(
+            "Run bundles require pyarrow, install it with "
+            "`pip install yieldplotlib[arrow]`"
+        ) from err
+    return pa, pq
+
+
+def _json_default(value):
+    """Convert the values of parsed input files to JSON."""
+    if isinstance(value, u.Quantity):
+        return {"value": value.value.tolist(), "unit": value.unit.to_string()}
+    if isinstance(value, np.ndarray | np.generic):
+        return value.tolist()
+    return str(value)
+
+
+def _list_column(pa, values: np.ndarray):
+    """Wrap a flat array in a single-row list column."""
+    # Missing values of object (e.g. string) arrays are stored as nulls
+    flat = pa.array(values.ravel(), from_pandas=values.dtype == object)
+    return pa.ListArray.from_arrays(pa.array([0, len(flat)], pa.int32()), flat)
+
+
+def _encode(pa, key: str, value) -> tuple[dict, dict]:
+    """Encode a value as bundle columns and its metadata entry."""
+    if isinstance(value, pd.DataFrame):
+        columns = {
+            f"{key}/{col}": _list_column(pa, np.asarray(value[col]))
+            for col in value.columns
+        }
+        return columns, {"kind": "frame", "columns": list(value.columns)}
+    unit = None
+    if isinstance(value, u.Quantity):
+        unit = value.unit.to_string()
+        value = value.value
+    array = np.asarray(value)
+    kind = "scalar" if array.ndim == 0 else "array"
+    meta = {"kind": kind, "unit": unit, "shape": list(array.shape)}
+    return {key: _list_column(pa, array)}, meta
+
+
+def write_bundle(node, path: Path, keys=None) -> Path:
+    """Write every resolved key of a node to a run bundle.
+
+    Args:
+        node (Node):
+            The run to export, usually an `AYODirectory` or `EXOSIMSDirectory`.
+        path (Path):
+            The bundle file. A ".parquet" suffix writes Parquet, otherwise an
+            Arrow IPC file is written.
+        keys (list, optional):
+            The keys to export. Defaults to every key the node can list, or
+            every key of the key map if it cannot list its keys.
+
+    Returns:
+        Path:
+            The path of the written bundle.
+    """
+    pa, pq = _import_pyarrow()
+    path = Path(path)
+    if keys is None:
+        keys = node.keys()
+    if keys is None:
+        keys = [key for key in KEY_MAP if node.has_key(key)]
+
+    columns = {}
+    key_meta = {}
+    skipped = []
+    for key in sorted(keys):
+        try:
+            value = node.get(key)
+        except Exception as err:
+            logger.warning(f"Skipping {key} in the bundle, it failed to load: {err}")
+            continue
+        if value is None:
+            continue
+        if isinstance(value, dict):
+            skipped.append(key)
+            continue
+        try:
+            key_columns, key_meta[key] = _encode(pa, key, value)
+        except (pa.ArrowException, TypeError, ValueError) as err:
+            logger.warning(f"Skipping {key} in the bundle, it cannot be stored: {err}")
+            continue
+        columns.update(key_columns)
+    if skipped:
+        logger.warning(
+            f"Skipping {len(skipped)} keys in the bundle, dictionary values (e.g."
+            f" per instrument) cannot be stored: {skipped}"
+        )
+
+    input_node = getattr(node, "input", None)
+    metadata = {
+        "version": BUNDLE_VERSION,
+        "source": node.__class__.__name__,
+        "name": node.file_name,
+        "keys": key_meta,
+        "input": None if input_node is None else input_node.data,
+    }
+    table = pa.table(columns).replace_schema_metadata(
+        {METADATA_KEY: json.dumps(metadata, default=_json_default)}
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    logger.info(f"Wrote {len(key_meta)} keys of {node.file_name} to {path}")
+    return path
+
+
+def read_bundle(path: Path):
+    """Read a run bundle.
+
+    Args:
+        path (Path):
+            The bundle file.
+
+    Returns:
+        tuple:
+            table (pyarrow.Table):
+                The bundle's columns, memory-mapped for Arrow IPC files.
+            metadata (dict):
+                The bundle description written by `write_bundle`.
+    """
+    pa, pq = _import_pyarrow()
+    path = Path(path)
+    if path.suffix == ".parquet":
+        table = pq.read_table(path, memory_map=True)
+    else:
+        table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    metadata = json.loads(table.schema.metadata[METADATA_KEY])
+    return table, metadata
+
+
+def _column_values(table, name: str) -> np.ndarray:
+    """Return the flat values of a list column, without copying if possible."""
+    return table.column(name).chunk(0).values.to_numpy(zero_copy_only=False)
+
+
+def decode_bundle_value(table, key: str, meta: dict):
+    """Rebuild the value of a key from its bundle columns.
+
+    Args:
+        table (pyarrow.Table):
+            The bundle's columns.
+        key (str):
+            The key to rebuild.
+        meta (dict):
+            The key's entry in the bundle metadata.
+
+    Returns:
+        The value, as returned by the exported node's `get`.
+    """
+    if meta["kind"] == "frame":
+        return pd.DataFrame(
+            {col: _column_values(table, f"{key}/{col}") for col in meta["columns"]}
+        )
+    value = _column_values(table, key).reshape(meta["shape"])
+    if meta["kind"] == "scalar":
+        value = value.item()
+    if meta["unit"] is not None:
+        # Wrap the (memory-mapped) values without copying them
+        value = u.Quantity(value, decode_unit(meta["unit"]), copy=False)
+    return value
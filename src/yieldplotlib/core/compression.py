@@ -0,0 +1,105 @@
+"""Streaming decompression of compressed run files.
+
+Run files can be stored compressed, e.g. "observations.csv.gz" or
+"seed_1.pkl.zst". The node factories dispatch on the suffix before the
+compression suffix (see `file_suffix`), and `open_path` decompresses the file
+as it is read, so no decompressed copy is ever written. zstd files require the
+optional zstandard package.
+"""
+
+import bz2
+import gzip
+import importlib.util
+import io
+import lzma
+from pathlib import PurePath
+
+ZSTD_AVAILABLE = importlib.util.find_spec("zstandard") is not None
+
+# Compression suffixes and the name of their compression
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+if ZSTD_AVAILABLE:
+    COMPRESSION_SUFFIXES[".zst"] = "zstd"
+
+
+def split_compression(file_name: str) -> tuple:
+    """Split the compression suffix off a file name.
+
+    Args:
+        file_name (str):
+            The file name, e.g. "observations.csv.gz".
+
+    Returns:
+        tuple:
+            name (str):
+                The file name without its compression suffix, e.g.
+                "observations.csv".
+            compression (str or None):
+                The compression (a value of `COMPRESSION_SUFFIXES`), None if
+                the file is not compressed.
+    """
+    suffix = PurePath(file_name).suffix
+    if suffix in COMPRESSION_SUFFIXES:
+        return file_name[: -len(suffix)], COMPRESSION_SUFFIXES[suffix]
+    return file_name, None
+
+
+def file_suffix(path) -> str:
+    """Return the suffix of a file, ignoring its compression suffix.
+
+    Example:
+        >>> file_suffix(Path("drm/seed_1.pkl.zst"))
+        '.pkl'
+    """
+    return PurePath(split_compression(path.name)[0]).suffix
+
+
+class _DecompressedReader(io.BufferedReader):
+    """Buffered reader of a decompressor that also closes the compressed file."""
+
+    def __init__(self, stream, source):
+        super().__init__(stream)
+        self._source = source
+
+    def close(self):
+        """Close the decompressor and the compressed file."""
+        try:
+            super().close()
+        finally:
+            self._source.close()
+
+
+def decompress(source, compression: str, mode: str = "rb", **kwargs):
+    """Wrap a compressed binary file in a streaming decompressor.
+
+    Args:
+        source (file-like):
+            The compressed file, opened in binary mode. It is closed with the
+            returned file.
+        compression (str):
+            The compression, a value of `COMPRESSION_SUFFIXES`.
+        mode (str):
+            Read mode of the returned file, text unless it contains "b".
+        **kwargs:
+            Passed to `io.TextIOWrapper` in text mode (e.g. `encoding`).
+
+    Returns:
+        file-like:
+            The decompressed file.
+    """
+    if compression == "gzip":
+        stream = gzip.GzipFile(fileobj=source, mode="rb")
+    elif compression == "bz2":
+        stream = bz2.BZ2File(source, mode="rb")
+    elif compression == "xz":
+        stream = lzma.LZMAFile(source, mode="rb")
+    elif compression == "zstd" and ZSTD_AVAILABLE:
+        import zstandard
+
+        stream = zstandard.ZstdDecompressor().stream_reader(source, closefd=False)
+    else:
+        raise ValueError(f"Unsupported compression {compression}")
+    reader = _DecompressedReader(stream, source)
+    if "b" in mode:
+        return reader
+    return io.TextIOWrapper(reader, **kwargs)
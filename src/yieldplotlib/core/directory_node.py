@@ -1,41 +1,187 @@
 """Represents a directory containing multiple nodes (files or subdirectories)."""
 
+import copy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 
+import astropy.units as u
+import pandas as pd
 from tqdm import tqdm
 
+from yieldplotlib.core.archive import archive_root
+from yieldplotlib.core.bundle import write_bundle
+from yieldplotlib.core.compression import file_suffix
+from yieldplotlib.core.disk_cache import DiskCache
 from yieldplotlib.core.file_nodes import CSVFile, JSONFile, PickleFile
 from yieldplotlib.core.node import Node
+from yieldplotlib.core.result_cache import ResultCache
 from yieldplotlib.logger import logger
 
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+# Default byte budget of the per-directory result cache
+DEFAULT_CACHE_BYTES = 256 * 2**20
+
+
+def values_frame(values: dict) -> pd.DataFrame:
+    """Build a DataFrame with one column per key from the values of `get_many`.
+
+    Quantities are stored as plain values, with their units listed in
+    ``attrs["units"]``. Scalars are broadcast to the length of the arrays.
+
+    Args:
+        values (dict):
+            Maps the keys to their values.
+
+    Returns:
+        pandas.DataFrame:
+            The values, one column per key.
+
+    Raises:
+        ValueError: If the values cannot share a table (e.g. different lengths).
+    """
+    columns = {}
+    units = {}
+    for key, value in values.items():
+        if isinstance(value, u.Quantity):
+            units[key] = value.unit
+            value = value.value
+        columns[key] = value
+    # A table of scalars has a single row
+    scalars = all(pd.api.types.is_scalar(value) for value in columns.values())
+    try:
+        frame = pd.DataFrame(columns, index=[0] if scalars else None)
+    except ValueError as err:
+        raise ValueError(f"The values of {list(values)} cannot share a table") from err
+    frame.attrs["units"] = units
+    return frame
+
+
+def _create_child_node(factory, path: Path) -> Node:
+    """Create the node of a path in a worker, see `DirectoryNode._worker_factory`."""
+    return factory._create_node(path)
+
 
 class DirectoryNode(Node):
     """Represents a directory containing multiple nodes (files or subdirectories)."""
 
-    def __init__(self, directory_path: Path):
-        """Initialize the directory node with a list of children."""
+    def __init__(
+        self,
+        directory_path: Path,
+        max_workers: int | None = None,
+        executor: str = "thread",
+        lazy: bool = False,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        disk_cache: DiskCache | bool | str | Path | None = None,
+        projected: bool = False,
+        progress: bool = True,
+    ):
+        """Initialize the directory node with a list of children.
+
+        Args:
+            directory_path (Path):
+                The directory to load.
+            max_workers (int, optional):
+                Number of workers used to load the children of this directory.
+                Subdirectories are loaded serially inside the workers, so the
+                number of workers does not multiply with the tree depth. If
+                None or 1, children are loaded serially.
+            executor (str):
+                Either "thread" (best for I/O-bound CSV/FITS trees) or "process"
+                (best for pickle-heavy trees, requires picklable nodes).
+            lazy (bool):
+                If True, file nodes only record their path and key map, and
+                load their data the first time one of their keys is requested.
+            cache_bytes (int):
+                Byte budget of the cache of values returned by `get`. The least
+                recently used values are evicted first. Set to 0 to disable.
+            disk_cache (DiskCache | bool | str | Path, optional):
+                On-disk cache of parsed file payloads. True uses the default
+                cache directory under the yieldplotlib pooch cache, a path uses
+                that directory. Unchanged files are restored from the cache
+                instead of being parsed again.
+            projected (bool):
+                If True, CSV files only read the columns named in the key map,
+                using the pyarrow engine when it is installed.
+            progress (bool):
+                If True, show a progress bar while the children are loaded.
+        """
         super().__init__(directory_path)
 
+        if executor not in EXECUTORS:
+            raise ValueError(
+                f"Unknown executor {executor}, expected one of {list(EXECUTORS)}"
+            )
         # Aliasing file_path to directory_path for consistency
         self.directory_path = self.file_path
         self.directory_name = self.directory_path.name
+        self.max_workers = max_workers
+        self.executor = executor
+        self.lazy = lazy
+        self.disk_cache = DiskCache.from_option(disk_cache)
+        self.projected = projected
+        self.progress = progress
         self._children = []
+        self._key_index = None
+        self._cache = ResultCache(cache_bytes)
         self.load()
 
+    @classmethod
+    def from_archive(
+        cls, archive_path: Path | str, member: str | None = None, **kwargs
+    ):
+        """Load a directory straight from a zip or tar archive.
+
+        The archive is not extracted, its members are read when their nodes
+        load (see `core.archive`). macOS metadata such as `__MACOSX` folders
+        and `._*` files is skipped. File types that need a real file on disk
+        (e.g. memory-mapped fits files) are not supported.
+
+        Args:
+            archive_path (Path | str):
+                The zip or tar (optionally compressed) archive.
+            member (str, optional):
+                The directory inside the archive to load, see `archive_root`.
+                Defaults to the archive's single top-level directory if it has
+                one, otherwise the archive root.
+            **kwargs:
+                Loading options passed to the directory (e.g. `max_workers`).
+
+        Returns:
+            DirectoryNode:
+                The directory, of the class this method is called on.
+        """
+        return cls(archive_root(archive_path, member), **kwargs)
+
     def load(self):
         """Recursively scan directories and load all child nodes."""
-        paths = list(self.directory_path.iterdir())
+        # Sort the paths so the child order (and therefore the input file
+        # selection) does not depend on the filesystem or on worker timing
+        paths = sorted(self.directory_path.iterdir(), key=lambda path: path.name)
         with tqdm(
             total=len(paths),
             desc=f"Loading {self.__class__.__name__} {self.directory_path.name}",
             unit="item",
+            disable=not self.progress,
         ) as pbar:
-            for path in paths:
-                if path.is_dir():
-                    self.add(self._create_directory_node(path))
-                else:
-                    self.add(self._create_file_node(path))
-                pbar.update(1)
+            if self.max_workers is None or self.max_workers <= 1:
+                for path in paths:
+                    self.add(self._create_node(path))
+                    pbar.update(1)
+            else:
+                factory = self._worker_factory()
+                with EXECUTORS[self.executor](max_workers=self.max_workers) as pool:
+                    futures = [
+                        pool.submit(_create_child_node, factory, path) for path in paths
+                    ]
+                    for future in futures:
+                        node = future.result()
+                        if isinstance(node, DirectoryNode):
+                            # Loading is done, queries (e.g. ensemble
+                            # reductions) can use the workers again
+                            node._set_max_workers(self.max_workers)
+                        self.add(node)
+                        pbar.update(1)
         # Establish the input node
         input_files = [child for child in self._children if child.is_input]
         if len(input_files) == 0:
@@ -46,19 +192,191 @@ class DirectoryNode(Node):
         else:
             logger.warning("Multiple input files found, using the first")
             self.input = input_files[0]
+        self._build_key_index()
 
     def add(self, node: Node):
         """Add a child node to the directory."""
         if node is not None:
             self._children.append(node)
+            node._parent = self
+            self._mark_changed()
 
-    def get(self, key: str, **kwargs):
-        """Recursively search for data associated with the given key."""
+    def _build_key_index(self):
+        """Map every key to the children that may resolve it.
+
+        Children that cannot list their keys ahead of time are stored under the
+        `None` entry and are searched for every key.
+        """
+        index = {None: []}
         for child in self._children:
+            child_keys = child.keys()
+            if child_keys is None:
+                index[None].append(child)
+                continue
+            for key in child_keys:
+                index.setdefault(key, []).append(child)
+        self._key_index = index
+        # Owners of keys that children resolve without listing them
+        self._implicit_owners = {}
+
+    def _mark_changed(self):
+        """Discard the key index and cached values of this directory and parents."""
+        node = self
+        while node is not None:
+            node._key_index = None
+            node._cache.clear()
+            node = node._parent
+
+    def invalidate(self):
+        """Clear the cached values and key index of the whole tree.
+
+        Call this if the underlying data changes after loading, e.g. when a
+        file node is reloaded.
+        """
+        for child in self._children:
+            if isinstance(child, DirectoryNode):
+                child.invalidate()
+        self._mark_changed()
+
+    def close(self):
+        """Release the resources held by every node in the tree."""
+        for child in self._children:
+            child.close()
+
+    def _key_owners(self, key: str) -> list:
+        """Return the children that may resolve the key, in child order."""
+        if self._key_index is None:
+            self._build_key_index()
+        owners = self._key_index.get(key)
+        if owners is None:
+            # Some children resolve open-ended key families they cannot list
+            # (e.g. "det_SNR.q95" of DRM ensembles), so ask them directly
+            if key not in self._implicit_owners:
+                self._implicit_owners[key] = [
+                    child for child in self._children if child.has_key(key)
+                ]
+            owners = self._implicit_owners[key]
+        unindexed = self._key_index[None]
+        if unindexed:
+            # Keep the original child order so the first match still wins
+            owners = [
+                child
+                for child in self._children
+                if child in owners or child in unindexed
+            ]
+        return owners
+
+    def has_key(self, key: str) -> bool:
+        """Whether any child of this directory may resolve the key."""
+        return len(self._key_owners(key)) > 0
+
+    def keys(self):
+        """Return the keys resolvable by this directory.
+
+        Returns None if any node in the tree cannot list its keys.
+        """
+        if self._key_index is None:
+            self._build_key_index()
+        if self._key_index[None]:
+            return None
+        return self._key_index.keys() - {None}
+
+    def get(self, key: str, **kwargs):
+        """Search the children that own the key for its data.
+
+        Values are cached per set of keyword arguments, so repeated requests for
+        the same key are only resolved once. Cached values are shared between
+        callers and should not be modified in place.
+        """
+        cache_key = self._cache.make_key(key, kwargs)
+        if cache_key is not None:
+            hit, result = self._cache.lookup(cache_key)
+            if hit:
+                return result
+        result = None
+        for child in self._key_owners(key):
             result = child.get(key, **kwargs)
             if result is not None:
-                return result
-        return None
+                break
+        if cache_key is not None:
+            self._cache.put(cache_key, result)
+        return result
+
+    def get_many(self, keys, as_frame: bool = False, **kwargs):
+        """Resolve several keys in one traversal of the tree.
+
+        The keys are grouped by the child that owns them, so each child (and
+        subdirectory) is asked for all of its keys at once. As with `get`, the
+        first child in order that returns a value wins, and values are cached.
+
+        Args:
+            keys (list):
+                The keys to resolve.
+            as_frame (bool):
+                Return a DataFrame with one column per key (see `values_frame`)
+                instead of a dictionary.
+            **kwargs:
+                Passed to the `get` of the owning children.
+
+        Returns:
+            dict or pandas.DataFrame:
+                The value of every key, None for keys that are not found.
+        """
+        keys = list(dict.fromkeys(keys))
+        results = {}
+        cache_keys = {}
+        for key in keys:
+            cache_key = self._cache.make_key(key, kwargs)
+            hit, value = self._cache.lookup(cache_key)
+            if hit:
+                results[key] = value
+            else:
+                cache_keys[key] = cache_key
+
+        # Ask every key's first owner, then the next owner of the keys that
+        # were not found, until every key is resolved or has no owner left
+        owners = {key: self._key_owners(key) for key in cache_keys}
+        attempt = dict.fromkeys(cache_keys, 0)
+        while attempt:
+            groups = {}
+            for key, i in list(attempt.items()):
+                if i < len(owners[key]):
+                    groups.setdefault(owners[key][i], []).append(key)
+                else:
+                    results[key] = None
+                    del attempt[key]
+            for owner, owner_keys in groups.items():
+                for key, value in owner.get_many(owner_keys, **kwargs).items():
+                    if value is None:
+                        attempt[key] += 1
+                    else:
+                        results[key] = value
+                        del attempt[key]
+        for key, cache_key in cache_keys.items():
+            if cache_key is not None:
+                self._cache.put(cache_key, results[key])
+
+        results = {key: results[key] for key in keys}
+        return values_frame(results) if as_frame else results
+
+    def export_bundle(self, path: Path, keys=None) -> Path:
+        """Write every resolved key of this directory to a run bundle.
+
+        The bundle can be loaded with `yieldplotlib.load.BundleDirectory`
+        without parsing the run's files again, see `core.bundle`.
+
+        Args:
+            path (Path):
+                The bundle file, ".parquet" for Parquet and otherwise an Arrow
+                IPC file.
+            keys (list, optional):
+                The keys to export, defaults to every key of the directory.
+
+        Returns:
+            Path:
+                The path of the written bundle.
+        """
+        return write_bundle(self, path, keys=keys)
 
     def display_tree(self, level=0, max_children=5, prefix=""):
         """Recursively display the tree structure.
@@ -102,6 +420,54 @@ class DirectoryNode(Node):
 
         return repr_str
 
+    def _create_node(self, path: Path) -> Node:
+        """Create the directory or file node for the given path."""
+        if path.is_dir():
+            return self._create_directory_node(path)
+        return self._create_file_node(path)
+
+    def _worker_factory(self):
+        """Return a childless copy of this directory that creates its children.
+
+        The copy is sent to the workers instead of the directory itself, and
+        has no workers of its own, so subdirectories created inside a worker
+        load serially.
+        """
+        factory = copy.copy(self)
+        factory._children = []
+        factory._key_index = None
+        factory._cache = ResultCache(self._cache.max_bytes)
+        factory._parent = None
+        factory.max_workers = None
+        return factory
+
+    def _set_max_workers(self, max_workers: int | None):
+        """Set the number of workers of this directory and its subdirectories."""
+        self.max_workers = max_workers
+        for child in self._children:
+            if isinstance(child, DirectoryNode):
+                child._set_max_workers(max_workers)
+
+    def _directory_options(self) -> dict:
+        """Keyword arguments forwarded to the subdirectories of this directory."""
+        return {
+            "max_workers": self.max_workers,
+            "executor": self.executor,
+            "lazy": self.lazy,
+            "cache_bytes": self._cache.max_bytes,
+            "disk_cache": self.disk_cache,
+            "projected": self.projected,
+            "progress": self.progress,
+        }
+
+    def _file_options(self) -> dict:
+        """Keyword arguments forwarded to the file nodes of this directory."""
+        return {
+            "lazy": self.lazy,
+            "disk_cache": self.disk_cache,
+            "projected": self.projected,
+        }
+
     def _create_directory_node(self, path: Path) -> Node:
         """Create a directory node for the given path."""
         return self.create_base_directory(path)
@@ -112,16 +478,17 @@ class DirectoryNode(Node):
 
     def create_base_file(self, path: Path):
         """Create a base file node for the given path."""
-        if path.suffix == ".csv":
-            return CSVFile(path)
-        elif path.suffix == ".json":
-            return JSONFile(path)
-        elif path.suffix == ".pkl":
-            return PickleFile(path)
+        suffix = file_suffix(path)
+        if suffix == ".csv":
+            return CSVFile(path, **self._file_options())
+        elif suffix == ".json":
+            return JSONFile(path, **self._file_options())
+        elif suffix == ".pkl":
+            return PickleFile(path, **self._file_options())
         else:
-            logger.warning(f"Unknown file type: {path.suffix}")
+            logger.warning(f"Unknown file type: {suffix}")
             return None
 
     def create_base_directory(self, path: Path):
         """Create a directory node for the given path."""
-        return DirectoryNode(path)
+        return DirectoryNode(path, **self._directory_options())
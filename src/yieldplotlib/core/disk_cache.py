@@ -0,0 +1,168 @@
+"""Persistent on-disk cache of parsed file payloads.
+
+Parsing an AYO input grammar or reading a large CSV is much slower than reading
+the pickled result back. The `DiskCache` stores the parsed payload of each file
+node keyed by the file's path, and validates it against the file's size and
+modification time so that edited files are always re-parsed. The content hash
+of a file is only computed once its entry has been invalidated, so files that
+are merely touched (e.g. by copying a run) are not re-parsed again.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import pooch
+
+from yieldplotlib._version import __version__
+from yieldplotlib.core.archive import open_path
+from yieldplotlib.logger import logger
+
+DEFAULT_CACHE_DIR = Path(pooch.os_cache("yieldplotlib")) / "parsed"
+
+# Size of the chunks used when hashing file contents
+_HASH_CHUNK_BYTES = 2**20
+
+
+def file_digest(path: Path) -> str:
+    """Return the hex digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open_path(path, "rb", decompress=False) as f:
+        while chunk := f.read(_HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Directory of pickled file node payloads.
+
+    Each entry holds a small header with the fingerprint of the source file
+    followed by the payload, so a stale entry can be rejected without
+    unpickling the payload.
+    """
+
+    def __init__(self, cache_dir: Path | str = DEFAULT_CACHE_DIR):
+        """Initialize the cache.
+
+        Args:
+            cache_dir (Path | str):
+                Directory holding the cache entries, created if needed.
+        """
+        self.cache_dir = Path(cache_dir)
+
+    @classmethod
+    def from_option(cls, option):
+        """Create a cache from a user-facing option.
+
+        Args:
+            option (bool | str | Path | DiskCache | None):
+                False/None disables the cache, True uses `DEFAULT_CACHE_DIR`, a
+                path uses that directory and a `DiskCache` is used as is.
+
+        Returns:
+            DiskCache or None:
+                The cache, or None if caching is disabled.
+        """
+        if option is None or option is False:
+            return None
+        if option is True:
+            return cls()
+        if isinstance(option, DiskCache):
+            return option
+        return cls(option)
+
+    def __repr__(self):
+        """Show the cache directory."""
+        return f"{self.__class__.__name__}({self.cache_dir})"
+
+    def entry_path(self, node) -> Path:
+        """Return the path of the cache entry for a file node."""
+        # Projected nodes hold a subset of the file, so they get their own entry
+        source = (
+            f"{__version__}:{node.__class__.__name__}:{node.projected}:"
+            f"{node.file_path.resolve()}"
+        )
+        name = hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{name}.pkl"
+
+    def restore(self, node) -> bool:
+        """Restore a node's payload from the cache.
+
+        Args:
+            node (FileNode):
+                The node to restore.
+
+        Returns:
+            bool:
+                True if a valid entry was found and restored.
+        """
+        entry = self.entry_path(node)
+        if not entry.exists():
+            return False
+        stat = node.file_path.stat()
+        try:
+            with open(entry, "rb") as f:
+                header = pickle.load(f)
+                if header["size"] != stat.st_size:
+                    return False
+                # Only hash the file if it was modified since it was cached
+                same_stat = header["mtime_ns"] == stat.st_mtime_ns
+                if not same_stat:
+                    # Entries without a digest cannot tell a touched file from
+                    # an edited one, the replacing entry records the digest
+                    if header["digest"] is None:
+                        return False
+                    digest = file_digest(node.file_path)
+                    if header["digest"] != digest:
+                        return False
+                payload = pickle.load(f)
+        except Exception as err:
+            logger.warning(f"Ignoring unreadable cache entry {entry}: {err}")
+            return False
+        node._restore_cache_payload(payload)
+        logger.debug(f"Restored {node.file_name} from {entry}")
+        if not same_stat:
+            # The file was touched but not changed, refresh the fingerprint
+            self.store(node, digest=digest)
+        return True
+
+    def store(self, node, digest: str | None = None):
+        """Write a node's payload to the cache.
+
+        The content hash of the file is only recorded when an existing entry
+        is replaced, i.e. once the file's modification time has changed, so
+        first loads read every file once.
+
+        Args:
+            node (FileNode):
+                The loaded node to store.
+            digest (str, optional):
+                The hex digest of the file, if it is already known.
+        """
+        entry = self.entry_path(node)
+        if digest is None and entry.exists():
+            digest = file_digest(node.file_path)
+        stat = node.file_path.stat()
+        header = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "digest": digest,
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(node._cache_payload(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry)
+        except Exception as err:
+            Path(tmp_path).unlink(missing_ok=True)
+            logger.warning(f"Could not cache {node.file_name}: {err}")
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        for entry in self.cache_dir.glob("*.pkl"):
+            entry.unlink(missing_ok=True)
@@ -0,0 +1,448 @@
+"""Streaming reductions over the members of an ensemble.
+
+An ensemble (e.g. the DRMs of the seeds of an EXOSIMS run) is reduced by
+reading one member at a time, computing its `MemberStatistic` values and
+adding them to online accumulators:
+
+- `Moments`: count, mean, variance (Welford/Chan updates) and extrema,
+- `QuantileSketch`: a t-digest-style sketch of the distribution, and
+- `Histogram`: counts in fixed bins.
+
+The accumulators can be merged, so workers reduce separate chunks of members
+and their partial results are combined. Peak memory is that of one member per
+worker, plus the accumulators.
+"""
+
+import re
+
+import numpy as np
+from tqdm import tqdm
+
+from yieldplotlib.core.directory_node import EXECUTORS
+from yieldplotlib.logger import logger
+
+# Reductions available for every statistic, besides "q<percent>" and "hist"
+REDUCTIONS = ("count", "mean", "std", "var", "min", "max", "median")
+QUANTILE_REDUCTION = re.compile(r"q(\d+(?:\.\d+)?)")
+DEFAULT_COMPRESSION = 100
+
+
+def _padded(array: np.ndarray, size: int) -> np.ndarray:
+    """Pad the end of a 1D array with zeros."""
+    return np.pad(array, (0, size - len(array)))
+
+
+class Moments:
+    """Running count, mean, variance and extrema of samples.
+
+    Samples are arrays of a common shape, reduced elementwise. 1D samples may
+    grow from one member to the next, in which case the missing trailing
+    elements count as zeros (e.g. the visits of stars a member never observed).
+    """
+
+    def __init__(self):
+        """Initialize the accumulator without samples."""
+        self.count = 0
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+
+    def add(self, sample):
+        """Add one sample."""
+        self.add_batch(np.asarray(sample, dtype=float)[np.newaxis])
+
+    def add_batch(self, samples):
+        """Add several samples, stacked along the first axis."""
+        samples = np.asarray(samples, dtype=float)
+        if len(samples) == 0:
+            return
+        batch = Moments()
+        batch.count = len(samples)
+        batch.mean = samples.mean(axis=0)
+        batch.m2 = ((samples - batch.mean) ** 2).sum(axis=0)
+        batch.min = samples.min(axis=0)
+        batch.max = samples.max(axis=0)
+        self.merge(batch)
+
+    def _grow(self, size: int):
+        """Pad 1D accumulators to a larger number of elements."""
+        if np.ndim(self.mean) == 1 and len(self.mean) < size:
+            self.mean, self.m2, self.min, self.max = (
+                _padded(array, size)
+                for array in (self.mean, self.m2, self.min, self.max)
+            )
+
+    def merge(self, other: "Moments"):
+        """Add the samples of another accumulator (Chan et al. update)."""
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count = other.count
+            self.mean, self.m2 = np.copy(other.mean), np.copy(other.m2)
+            self.min, self.max = np.copy(other.min), np.copy(other.max)
+            return
+        if np.ndim(self.mean) == 1:
+            size = max(len(self.mean), len(other.mean))
+            self._grow(size)
+            other._grow(size)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * (other.count / count)
+        self.m2 = self.m2 + other.m2 + delta**2 * (self.count * other.count / count)
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.count = count
+
+    @property
+    def var(self):
+        """The sample variance (with one degree of freedom removed)."""
+        if self.count < 2:
+            return np.full(np.shape(self.mean), np.nan)[()]
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self):
+        """The sample standard deviation."""
+        return np.sqrt(self.var)
+
+
+class QuantileSketch:
+    """Mergeable sketch of the distribution of scalar samples.
+
+    Samples are summarized by weighted centroids as in a merging t-digest:
+    neighbouring centroids are merged while their weight stays below a limit
+    that shrinks towards the tails, so extreme quantiles stay accurate.
+    """
+
+    def __init__(self, compression: float = DEFAULT_COMPRESSION):
+        """Initialize an empty sketch.
+
+        Args:
+            compression (float):
+                Controls the number of centroids kept (about twice this value)
+                and therefore the accuracy of the quantiles.
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def add_batch(self, samples):
+        """Add several scalar samples."""
+        samples = np.asarray(samples, dtype=float).ravel()
+        if len(samples) == 0:
+            return
+        self._add_centroids(samples, np.ones(len(samples)))
+
+    def merge(self, other: "QuantileSketch"):
+        """Add the samples of another sketch."""
+        other._compress()
+        if len(other.means):
+            self._add_centroids(other.means, other.weights)
+
+    def _add_centroids(self, means, weights):
+        """Buffer centroids, compressing once the buffer is large."""
+        self._buffer.append((means, weights))
+        self._buffered += weights.sum()
+        self.min = min(self.min, means.min())
+        self.max = max(self.max, means.max())
+        if len(self._buffer) > 1 and self._buffered > 10 * self.compression:
+            self._compress()
+
+    def _compress(self):
+        """Merge the buffered centroids into the sketch."""
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means, *(means for means, _ in self._buffer)])
+        weights = np.concatenate(
+            [self.weights, *(weights for _, weights in self._buffer)]
+        )
+        self._buffer = []
+        self._buffered = 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        merged_means, merged_weights = [], []
+        # Weight of the centroids before the current one
+        before = 0.0
+        mean, weight = means[0], weights[0]
+        for next_mean, next_weight in zip(means[1:], weights[1:], strict=True):
+            q = (before + (weight + next_weight) / 2) / total
+            limit = max(1.0, 4 * total * q * (1 - q) / self.compression)
+            if weight + next_weight <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                merged_means.append(mean)
+                merged_weights.append(weight)
+                before += weight
+                mean, weight = next_mean, next_weight
+        merged_means.append(mean)
+        merged_weights.append(weight)
+        self.means = np.array(merged_means)
+        self.weights = np.array(merged_weights)
+
+    def quantile(self, q):
+        """Estimate the quantiles of the samples.
+
+        Args:
+            q (float | np.ndarray):
+                The quantiles, between 0 and 1.
+
+        Returns:
+            float or np.ndarray:
+                The estimated quantiles, NaN if the sketch is empty.
+        """
+        self._compress()
+        total = self.weights.sum()
+        if total == 0:
+            return np.full(np.shape(q), np.nan)[()]
+        # Interpolate between the centroid centers, pinned to the extrema
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return np.interp(
+            np.asarray(q) * total,
+            [0, *centers, total],
+            [self.min, *self.means, self.max],
+        )
+
+
+class Histogram:
+    """Counts of samples in fixed bins."""
+
+    def __init__(self, edges):
+        """Initialize empty bins.
+
+        Args:
+            edges (np.ndarray):
+                The bin edges, samples outside of them are not counted.
+        """
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) - 1, dtype=int)
+
+    def add_batch(self, samples):
+        """Add several samples."""
+        self.counts += np.histogram(samples, self.edges)[0]
+
+    def merge(self, other: "Histogram"):
+        """Add the counts of another histogram with the same bins."""
+        self.counts += other.counts
+
+
+class MemberStatistic:
+    """A value computed from the columns of one ensemble member.
+
+    Scalar statistics (e.g. the yield of a member) and pooled statistics (e.g.
+    the integration time of every observation of a member) are reduced over
+    their samples. Elementwise statistics (e.g. per-star visit counts) are
+    reduced per element across members, and have no quantiles.
+    """
+
+    def __init__(self, columns, func=None, elementwise: bool = False):
+        """Initialize the statistic.
+
+        Args:
+            columns (tuple):
+                The member columns the statistic needs.
+            func (callable, optional):
+                Computes the statistic from a dictionary of member columns.
+                Must be picklable for process workers. Defaults to the values
+                of the first column.
+            elementwise (bool):
+                Whether array values are reduced per element across members
+                instead of being pooled as samples.
+        """
+        self.columns = tuple(columns)
+        self.func = func
+        self.elementwise = elementwise
+
+    def __call__(self, member: dict):
+        """Compute the statistic of a member."""
+        if self.func is None:
+            return member[self.columns[0]]
+        return self.func(member)
+
+
+class StatisticAccumulator:
+    """Online accumulators of one statistic over the members of an ensemble."""
+
+    def __init__(
+        self,
+        elementwise: bool = False,
+        edges=None,
+        compression: float = DEFAULT_COMPRESSION,
+    ):
+        """Initialize empty accumulators.
+
+        Args:
+            elementwise (bool):
+                Whether values are reduced per element, see `MemberStatistic`.
+            edges (np.ndarray, optional):
+                Histogram bin edges, no histogram is kept if None.
+            compression (float):
+                Compression of the quantile sketch.
+        """
+        self.elementwise = elementwise
+        self.moments = Moments()
+        self.sketch = None if elementwise else QuantileSketch(compression)
+        self.histogram = None if edges is None else Histogram(edges)
+
+    def add(self, value):
+        """Add the value of a member."""
+        value = np.asarray(value, dtype=float)
+        if self.elementwise:
+            self.moments.add(value)
+            samples = value.ravel()
+        else:
+            samples = value.ravel()
+            samples = samples[~np.isnan(samples)]
+            self.moments.add_batch(samples)
+            self.sketch.add_batch(samples)
+        if self.histogram is not None:
+            self.histogram.add_batch(samples)
+
+    def merge(self, other: "StatisticAccumulator"):
+        """Add the members reduced by another accumulator."""
+        self.moments.merge(other.moments)
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        if self.histogram is not None:
+            self.histogram.merge(other.histogram)
+
+    def value(self, reduction: str):
+        """Return a reduction of the statistic.
+
+        Args:
+            reduction (str):
+                One of `REDUCTIONS`, "q<percent>" (e.g. "q95") or "hist".
+
+        Returns:
+            The reduced value, a (counts, edges) tuple for "hist".
+        """
+        if reduction == "hist":
+            if self.histogram is None:
+                raise ValueError("Histograms require the `bins` argument")
+            return self.histogram.counts, self.histogram.edges
+        if reduction in ("count", "mean", "min", "max", "var", "std"):
+            return getattr(self.moments, reduction)
+        match = QUANTILE_REDUCTION.fullmatch(reduction)
+        if reduction != "median" and match is None:
+            raise ValueError(f"Unknown reduction {reduction}")
+        if self.sketch is None:
+            raise ValueError("Quantiles of elementwise statistics are not available")
+        q = 0.5 if reduction == "median" else float(match.group(1)) / 100
+        return self.sketch.quantile(q)
+
+
+def split_ensemble_key(key: str, statistics: dict):
+    """Split a key like "det_SNR.q95" into its statistic and reduction.
+
+    Args:
+        key (str):
+            The requested key.
+        statistics (dict):
+            The available statistics, by name.
+
+    Returns:
+        tuple or None:
+            The (statistic, reduction) names, or None if the key is not an
+            ensemble key.
+    """
+    statistic, _, reduction = key.rpartition(".")
+    if statistic not in statistics:
+        return None
+    if reduction in REDUCTIONS or reduction == "hist":
+        return statistic, reduction
+    if QUANTILE_REDUCTION.fullmatch(reduction):
+        return statistic, reduction
+    return None
+
+
+def _reduce_chunk(paths, read_member, statistics, edges, compression):
+    """Reduce a chunk of members, one member at a time."""
+    accumulators = {
+        name: StatisticAccumulator(stat.elementwise, edges.get(name), compression)
+        for name, stat in statistics.items()
+    }
+    for path in paths:
+        member = read_member(path)
+        for name, stat in statistics.items():
+            accumulators[name].add(stat(member))
+        # Only keep one member in memory
+        del member
+    return accumulators
+
+
+def reduce_members(
+    paths,
+    read_member,
+    statistics: dict,
+    edges: dict | None = None,
+    compression: float = DEFAULT_COMPRESSION,
+    max_workers: int | None = None,
+    executor: str = "thread",
+    progress: bool = True,
+) -> dict:
+    """Stream the members of an ensemble through online accumulators.
+
+    Args:
+        paths (list):
+            The member files.
+        read_member (callable):
+            Reads a member file into a dictionary of columns. Must be picklable
+            for process workers.
+        statistics (dict):
+            The `MemberStatistic`s to reduce, by name.
+        edges (dict, optional):
+            Histogram bin edges, by statistic name.
+        compression (float):
+            Compression of the quantile sketches.
+        max_workers (int, optional):
+            Number of workers, each reducing a share of the members. If None or
+            1, the members are reduced serially.
+        executor (str):
+            Either "thread" or "process".
+        progress (bool):
+            If True, show a progress bar while the members are reduced.
+
+    Returns:
+        dict:
+            Maps the statistic names to their `StatisticAccumulator`.
+    """
+    edges = {} if edges is None else edges
+    paths = list(paths)
+    n_workers = 1 if max_workers is None else max(1, max_workers)
+    # Several chunks per worker balance the load and update the progress bar
+    n_chunks = min(len(paths), 4 * n_workers) if n_workers > 1 else len(paths)
+    chunks = [list(chunk) for chunk in np.array_split(paths, max(n_chunks, 1))]
+
+    totals = {
+        name: StatisticAccumulator(stat.elementwise, edges.get(name), compression)
+        for name, stat in statistics.items()
+    }
+    with tqdm(
+        total=len(paths),
+        desc="Reducing ensemble",
+        unit="member",
+        disable=not progress,
+    ) as pbar:
+        args = (read_member, statistics, edges, compression)
+        if n_workers == 1:
+            for chunk in chunks:
+                for name, accumulator in _reduce_chunk(chunk, *args).items():
+                    totals[name].merge(accumulator)
+                pbar.update(len(chunk))
+        else:
+            with EXECUTORS[executor](max_workers=n_workers) as pool:
+                futures = [pool.submit(_reduce_chunk, chunk, *args) for chunk in chunks]
+                # Merge in member order so the results do not depend on timing
+                for chunk, future in zip(chunks, futures, strict=True):
+                    for name, accumulator in future.result().items():
+                        totals[name].merge(accumulator)
+                    pbar.update(len(chunk))
+    logger.info(f"Reduced {len(statistics)} statistics over {len(paths)} members")
+    return totals
@@ -1,41 +1,127 @@
 """Base module for all common file-type nodes."""
 
+import importlib.util
 import json
 import pickle
-import posixpath
 from pathlib import Path
 
-import astropy.io.fits as pyfits
 import pandas as pd
 
+from yieldplotlib.core.archive import open_path
+from yieldplotlib.core.compression import split_compression
+from yieldplotlib.core.disk_cache import DiskCache
+from yieldplotlib.core.fits_handles import FITS_HANDLES
 from yieldplotlib.core.node import Node
-from yieldplotlib.key_map import KEY_MAP
 from yieldplotlib.logger import logger
+from yieldplotlib.util import get_file_key_map, get_file_unit_columns
+
+# The pyarrow CSV engine is used for projected loads when it is installed
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
 
 
 class FileNode(Node):
-    """A generic node for handling files."""
+    """A generic node for handling files.
+
+    By default the file is loaded when the node is created. Lazy nodes only
+    record the path and key map, and load the file the first time one of their
+    keys is requested (or their `data` is accessed).
+
+    Nodes of a `cacheable` type can also be given a `DiskCache`, in which case
+    the parsed payload is restored from (or saved to) the cache instead of
+    parsing an unchanged file again.
+
+    Projected nodes only load the parts of the file that the key map can
+    return, for the file types that support it (currently CSV files).
 
-    def __init__(self, file_path: Path):
-        """Initialize the node with the file path."""
+    Files with a compression suffix (e.g. "observations.csv.gz") are
+    decompressed as they are read, see `core.compression`.
+    """
+
+    cacheable = True
+
+    def __init__(
+        self,
+        file_path: Path,
+        lazy: bool = False,
+        disk_cache: DiskCache | bool | str | Path | None = None,
+        projected: bool = False,
+    ):
+        """Initialize the node with the file path.
+
+        Args:
+            file_path (Path):
+                The path to the file.
+            lazy (bool):
+                If True, defer loading the file until its data is needed.
+            disk_cache (DiskCache | bool | str | Path, optional):
+                On-disk cache of parsed payloads, see `DiskCache.from_option`.
+            projected (bool):
+                If True, only load the data that the key map can return.
+        """
+        self._loaded = False
         super().__init__(file_path)
-        self.load()
+        self.lazy = lazy
+        self.projected = projected
+        self.disk_cache = DiskCache.from_option(disk_cache) if self.cacheable else None
+        # The key map is needed before loading to project the file
         self.file_key_map, self.file_transforms = self.get_file_key_map()
+        if not lazy:
+            self.ensure_loaded()
+
+    @property
+    def data(self):
+        """The file's data, loaded on first access for lazy nodes."""
+        self.ensure_loaded()
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+
+    def ensure_loaded(self):
+        """Load the file if it has not been loaded yet."""
+        if self._loaded:
+            return
+        # Mark the node as loaded first so `load` can use `self.data` freely
+        self._loaded = True
+        try:
+            if self.disk_cache is None:
+                self.load()
+            elif not self.disk_cache.restore(self):
+                self.load()
+                self.disk_cache.store(self)
+        except Exception:
+            self._loaded = False
+            raise
+
+    def open(self, mode: str = "r", **kwargs):
+        """Open the file for reading, on disk or in an archive (see `open_path`)."""
+        return open_path(self.file_path, mode, **kwargs)
+
+    def _cache_payload(self):
+        """Return the parsed payload stored in the disk cache."""
+        return self.data
+
+    def _restore_cache_payload(self, payload):
+        """Restore the node from a payload produced by `_cache_payload`."""
+        self.data = payload
+
+    @property
+    def key_map_name(self) -> str:
+        """The file name matched against the key map, without compression suffix."""
+        return split_compression(self.file_name)[0]
 
     def get_file_key_map(self):
         """Get a list of keys expected to be in this file based on the key map."""
-        file_key_map = {}
-        transforms = {}
-        for key, mappings in KEY_MAP.items():
-            if self.__class__.__name__ in mappings:
-                filename = mappings[self.__class__.__name__]["file"]
-                key_name = mappings[self.__class__.__name__]["name"]
-                transform = mappings[self.__class__.__name__]["transform"]
-                matching_file = self.file_name.endswith(filename)
-                if matching_file:
-                    file_key_map[key] = key_name
-                    transforms[key] = transform
-        return file_key_map, transforms
+        return get_file_key_map(self.__class__.__name__, self.key_map_name)
+
+    def has_key(self, key: str) -> bool:
+        """Whether the key map assigns the key to this file."""
+        return key in self.file_key_map
+
+    def keys(self):
+        """Return the yieldplotlib keys the key map assigns to this file."""
+        return self.file_key_map.keys()
 
     def get(self, key: str, **kwargs):
         """Translate the key and delegate to the subclass-specific _get method."""
@@ -43,6 +129,7 @@ class FileNode(Node):
         has_key = key in self.file_key_map.keys()
         if has_key:
             logger.debug(f"Key {key} found in {self.file_name}.")
+            self.ensure_loaded()
             data = self._get(self.file_key_map[key], **kwargs)
             return self.transform_data(key, data, **kwargs)
         else:
@@ -88,19 +175,45 @@ class FileNode(Node):
 
 
 class CSVFile(FileNode):
-    """Represents a CSV file and its associated data."""
+    """Represents a CSV file and its associated data.
 
-    def __init__(self, file_path: Path):
-        """Initialize the CSV node with the file path."""
-        super().__init__(file_path)
-        self.load()
+    Projected CSV files only read the columns named in the key map (plus the
+    `extra_columns` that the subclass reads directly), with the columns that
+    carry a unit parsed straight to floats.
+    """
+
+    # Columns read by the subclass beyond those named in the key map
+    extra_columns = ()
 
     def load(self):
         """Load the CSV file into memory."""
-        self.data = pd.read_csv(self.file_path)
+        if self.projected:
+            self.data = self._read_projected()
+        else:
+            with self.open("rb") as f:
+                self.data = pd.read_csv(f)
         # Strip whitespace from column names
         self.data.columns = self.data.columns.str.strip()
 
+    def _read_projected(self) -> pd.DataFrame:
+        """Read only the columns that `_get` can return."""
+        wanted = {*self.file_key_map.values(), *self.extra_columns}
+        # Column names are matched after stripping whitespace, like `load`
+        with self.open("rb") as f:
+            header = pd.read_csv(f, nrows=0).columns
+        usecols = [col for col in header if col.strip() in wanted]
+        unit_columns = get_file_unit_columns(self.__class__.__name__, self.key_map_name)
+        dtype = {col: float for col in usecols if col.strip() in unit_columns}
+        engine = "pyarrow" if PYARROW_AVAILABLE else None
+        try:
+            with self.open("rb") as f:
+                return pd.read_csv(f, usecols=usecols, dtype=dtype, engine=engine)
+        except (TypeError, ValueError) as err:
+            # A unit-bearing column holds non-numeric values, infer the dtypes
+            logger.debug(f"Inferring the dtypes of {self.file_name}: {err}")
+            with self.open("rb") as f:
+                return pd.read_csv(f, usecols=usecols, engine=engine)
+
     def _get(self, key: str, **kwargs):
         """Return the data associated with the key."""
         if key in self.data.columns:
@@ -109,57 +222,78 @@ class CSVFile(FileNode):
 
 
 class JSONFile(FileNode):
-    """Node for handling JSON files and their associated data."""
+    """Node for handling JSON files and their associated data.
 
-    def __init__(self, file_path: Path):
-        """Initialize the node with the file path and load."""
-        super().__init__(file_path)
-        self.load()
+    Keys that are not at the top level of the file are looked up in a path
+    index built once per load, which maps every key to the named dictionaries
+    (e.g. instruments or starlight suppression systems) holding it.
+    """
+
+    _path_index = None
 
     def load(self):
         """Load the JSON file into memory."""
-        with open(self.file_path) as f:
+        with self.open() as f:
             self.data = json.load(f)
 
-    def _get(self, key: str, **kwargs):
-        """Return the data associated with the key."""
-        values = {}
+    @property
+    def path_index(self) -> dict:
+        """Map every key of the file to the dictionaries holding it.
+
+        The owners of a key are listed in depth-first order, as (name, owner)
+        pairs where the name is the owner's "name" (or "instName") entry and
+        None if it has neither. Keys nested inside the value of the same key
+        are not listed, since that value is already returned with its owner.
+        """
+        data = self.data
+        if self._path_index is None or self._path_index[0] is not data:
+            index = {}
+
+            def index_recur(value, outer_keys):
+                if isinstance(value, dict):
+                    name = value.get("name", value.get("instName"))
+                    if "name" not in value and "instName" not in value:
+                        name = None
+                    for k, v in value.items():
+                        if k not in outer_keys:
+                            index.setdefault(k, []).append((name, value))
+                        if isinstance(v, dict | list):
+                            index_recur(v, outer_keys | {k})
+                elif isinstance(value, list):
+                    for item in value:
+                        index_recur(item, outer_keys)
+
+            index_recur(data, frozenset())
+            self._path_index = (data, index)
+        return self._path_index[1]
 
-        def json_recur(data, target_key):
-            if isinstance(data, dict):
-                for k, v in data.items():
-                    if k == target_key:
-                        try:
-                            values[data["name"]] = data.get(key, None)
-                        except KeyError:
-                            values[data["instName"]] = data.get(key, None)
-                    elif isinstance(v, dict | list):
-                        json_recur(v, target_key)
-            elif isinstance(data, list):
-                for item in data:
-                    json_recur(item, target_key)
-            return values
+    def _get(self, key: str, **kwargs):
+        """Return the data associated with the key.
 
+        Returns:
+            The top level value of the key if it is set, otherwise a dictionary
+            mapping the name of every dictionary holding the key to its value.
+            None if a dictionary holding the key has no name.
+        """
         if self.data.get(key):
             return self.data.get(key)
-        else:
-            try:
-                return json_recur(self.data, key)
-            except KeyError:
+        values = {}
+        for name, owner in self.path_index.get(key, []):
+            if name is None:
                 return None
+            values[name] = owner[key]
+        return values
 
 
 class PickleFile(FileNode):
     """Node for handling generic pickle files and their associated data."""
 
-    def __init__(self, file_path: Path):
-        """Initialize the node with the file path."""
-        super().__init__(file_path)
-        self.load()
+    # Pickles are already stored in the cache's format
+    cacheable = False
 
     def load(self):
         """Load the pickle file into memory."""
-        with open(self.file_path, "rb") as f:
+        with self.open("rb") as f:
             self.data = pickle.load(f)
 
     def _get(self, key: str, **kwargs):
@@ -167,22 +301,99 @@ class PickleFile(FileNode):
         return self.data.get(key, None)
 
 
+def read_fits_data(file_path: Path, frames=None, ext=0):
+    """Read the data of a fits HDU through a memory map.
+
+    Only the pages of the file that back the returned array (or the requested
+    frames) are read from disk. The file is opened through the shared
+    `FITS_HANDLES` pool, and the memory map stays open as long as the returned
+    array, or any view of it, is referenced.
+
+    Args:
+        file_path (Path):
+            The fits file to read.
+        frames (int | slice | np.ndarray, optional):
+            Index along the first axis of the data, e.g. `slice(k, m)` for
+            frames k..m-1 of a PSF cube. Defaults to the full array.
+        ext (int | str, optional):
+            The HDU to read, defaults to the primary HDU.
+
+    Returns:
+        np.ndarray:
+            A memory-mapped view of the (sliced) data.
+    """
+    with FITS_HANDLES.borrow(file_path) as hdul:
+        data = hdul[ext].data
+        if frames is not None:
+            data = data[frames]
+    return data
+
+
 class FitsFile(FileNode):
-    """Node for handling generic fits files and their associated data."""
+    """Node for handling generic fits files and their associated data.
 
-    def __init__(self, file_path: Path):
-        """Initialize the node with the file path."""
-        super().__init__(file_path)
-        self.load()
-        self.file_name = posixpath.basename(file_path)
+    The file is opened through the shared `FITS_HANDLES` pool, so repeated
+    header and data lookups reuse one open handle. Headers are cached on the
+    node, call `close` to release the file's handle.
+    """
+
+    # Only the header is read on load, which is already cheap
+    cacheable = False
+
+    def __init__(self, file_path: Path, **kwargs):
+        """Initialize the node with an empty header cache.
+
+        Args:
+            file_path (Path):
+                The path to the file.
+            **kwargs:
+                Loading options passed to `FileNode`.
+        """
+        self._headers = {}
+        super().__init__(file_path, **kwargs)
 
     def load(self):
-        """Load the fits file."""
-        self.fits_file = pyfits.open(self.file_path)
+        """Read the primary header of the fits file.
 
-    def _get(self, key: str, **kwargs):
-        """Return the data associated with the key."""
+        The image data is only read when it is requested.
+        """
+        self.data = self.header(0)
+
+    def header(self, ext=0):
+        """Return the (cached) header of an HDU.
+
+        Args:
+            ext (int | str, optional):
+                The HDU, defaults to the primary HDU.
+
+        Returns:
+            astropy.io.fits.Header:
+                A copy of the header that does not depend on the open file.
+        """
+        if ext not in self._headers:
+            with FITS_HANDLES.borrow(self.file_path) as hdul:
+                self._headers[ext] = hdul[ext].header.copy()
+        return self._headers[ext]
+
+    def close(self):
+        """Release the file's handle in the shared pool."""
+        FITS_HANDLES.release(self.file_path)
+
+    def _get(self, key: str, frames=None, ext=0, **kwargs):
+        """Return the data associated with the key.
+
+        Args:
+            key (str):
+                "data" for the image data, otherwise a header keyword.
+            frames (int | slice | np.ndarray, optional):
+                Index along the first axis of the image data, see
+                `read_fits_data`.
+            ext (int | str, optional):
+                The HDU to read, defaults to the primary HDU.
+            **kwargs:
+                Unused, accepted for compatibility with other file nodes.
+        """
         if key == "data":
-            return pyfits.getdata(self.file_path)
+            return read_fits_data(self.file_path, frames=frames, ext=ext)
         else:
-            return pyfits.getheader(self.file_path).get(key, None)
+            return self.header(ext).get(key, None)
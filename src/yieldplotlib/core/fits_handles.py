@@ -0,0 +1,87 @@
+"""Bounded pool of open fits files shared by the fits file nodes.
+
+Opening a fits file parses its headers, so looking up many header keywords or
+data arrays across many files is dominated by repeated opens. The
+`FitsHandlePool` keeps the most recently used files open (memory-mapped) and
+closes the least recently used ones once `max_open` files are open. Arrays read
+through a handle stay valid after the handle is closed.
+"""
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import astropy.io.fits as pyfits
+
+from yieldplotlib.logger import logger
+
+DEFAULT_MAX_OPEN = 32
+
+
+class FitsHandlePool:
+    """Least-recently-used pool of open `HDUList` handles."""
+
+    def __init__(self, max_open: int = DEFAULT_MAX_OPEN):
+        """Initialize an empty pool.
+
+        Args:
+            max_open (int):
+                The maximum number of files kept open at the same time.
+        """
+        self.max_open = max_open
+        self._handles = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        """Number of open files."""
+        return len(self._handles)
+
+    def __contains__(self, file_path):
+        """Whether the file is currently open."""
+        return Path(file_path).resolve() in self._handles
+
+    @contextmanager
+    def borrow(self, file_path: Path):
+        """Open (or reuse) a file's handle for the duration of a block.
+
+        The handle must not be used outside the block, as it may be closed once
+        the pool needs room for other files.
+
+        Args:
+            file_path (Path):
+                The fits file to open.
+
+        Yields:
+            HDUList:
+                The open, memory-mapped file.
+        """
+        path = Path(file_path).resolve()
+        with self._lock:
+            if path in self._handles:
+                self._handles.move_to_end(path)
+            else:
+                self._handles[path] = pyfits.open(path, memmap=True)
+                logger.debug(f"Opened {path}, {len(self._handles)} fits files open")
+                while len(self._handles) > self.max_open:
+                    _, evicted = self._handles.popitem(last=False)
+                    evicted.close()
+            yield self._handles[path]
+
+    def release(self, file_path: Path):
+        """Close a file's handle if it is open."""
+        with self._lock:
+            handle = self._handles.pop(Path(file_path).resolve(), None)
+            if handle is not None:
+                handle.close()
+
+    def close(self):
+        """Close every open handle."""
+        with self._lock:
+            while self._handles:
+                _, handle = self._handles.popitem()
+                handle.close()
+
+
+# Pool shared by every fits node of the process
+FITS_HANDLES = FitsHandlePool()
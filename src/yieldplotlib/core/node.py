@@ -13,6 +13,7 @@ class Node(ABC):
         self.file_path = file_path
         self.file_name = file_path.name
         self.is_input = False
+        self._parent = None
 
     @abstractmethod
     def load(self):
@@ -24,10 +25,37 @@ class Node(ABC):
         """Abstract method to search for data associated with a key."""
         pass
 
+    def get_many(self, keys, **kwargs) -> dict:
+        """Return the data of several keys, as a dictionary keyed by key."""
+        return {key: self.get(key, **kwargs) for key in keys}
+
     def has_key(self, key: str) -> bool:
         """Abstract method to determine if the node contains the given key."""
         return False
 
+    def keys(self):
+        """Return the keys this node can resolve.
+
+        Returns None if the keys are not known ahead of time, in which case
+        parent directories always search this node.
+        """
+        return None
+
+    def close(self):
+        """Release any resources (e.g. open files) held by the node.
+
+        Nodes hold no resources by default.
+        """
+        return None
+
+    def __enter__(self):
+        """Use the node as a context manager that closes it on exit."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the node."""
+        self.close()
+
     def __repr__(self):
         """Default representation for a DataNode."""
         return f"<{self.__class__.__name__}: {self.file_name}>"
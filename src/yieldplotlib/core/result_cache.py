@@ -0,0 +1,110 @@
+"""Bounded least-recently-used cache for the values returned by `get`."""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value) -> int:
+    """Estimate the memory used by a value returned from a node.
+
+    Args:
+        value:
+            The value to measure, usually an array, Quantity, DataFrame or a
+            container of those.
+
+    Returns:
+        int:
+            The approximate size of the value in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        # Also covers astropy Quantities
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_nbytes(val) for val in value.values()
+        )
+    if isinstance(value, list | tuple):
+        return sys.getsizeof(value) + sum(estimate_nbytes(val) for val in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Least-recently-used cache with a byte budget.
+
+    Entries are keyed on the requested key and the keyword arguments of the
+    request. Requests with unhashable keyword arguments (e.g. arrays of
+    integration times) are never cached. Cached values are shared between
+    callers, so they should be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        """Initialize an empty cache.
+
+        Args:
+            max_bytes (int):
+                The maximum total size of the cached values. A value of 0
+                disables the cache.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        """Drop the entries and lock when pickling (e.g. for process pools)."""
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        """Restore an empty cache with the pickled budget."""
+        self.__init__(state["max_bytes"])
+
+    def __len__(self):
+        """Number of cached entries."""
+        return len(self._entries)
+
+    def make_key(self, key: str, kwargs: dict):
+        """Build the cache key for a request, or None if it cannot be cached."""
+        if self.max_bytes <= 0:
+            return None
+        cache_key = (key, tuple(sorted(kwargs.items())))
+        try:
+            hash(cache_key)
+        except TypeError:
+            return None
+        return cache_key
+
+    def lookup(self, cache_key):
+        """Return a (hit, value) tuple for the cache key."""
+        with self._lock:
+            if cache_key not in self._entries:
+                return False, None
+            self._entries.move_to_end(cache_key)
+            return True, self._entries[cache_key][0]
+
+    def put(self, cache_key, value):
+        """Store a value, evicting the least recently used entries if needed."""
+        nbytes = estimate_nbytes(value)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if cache_key in self._entries:
+                self.nbytes -= self._entries.pop(cache_key)[1]
+            self._entries[cache_key] = (value, nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, evicted_nbytes) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_nbytes
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
@@ -0,0 +1,197 @@
+"""Container for comparing a key across many runs in one call."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import astropy.units as u
+import numpy as np
+import pandas as pd
+
+from yieldplotlib.logger import logger
+
+
+class StackedValues:
+    """The values of one key across runs, concatenated into one array.
+
+    The values of run `i` are `values[offsets[i]:offsets[i + 1]]`, flattened,
+    and `run_ids` gives the run of every value. Runs that do not resolve the
+    key have no values.
+    """
+
+    def __init__(self, values, offsets: np.ndarray, names: list):
+        """Initialize the stacked values.
+
+        Args:
+            values (np.ndarray | astropy.units.Quantity):
+                The concatenated values of every run, in a common unit.
+            offsets (np.ndarray):
+                Start of the values of every run, followed by the total length.
+            names (list):
+                The name of every run.
+        """
+        self.values = values
+        self.offsets = offsets
+        self.names = names
+
+    def __len__(self):
+        """Number of runs."""
+        return len(self.names)
+
+    def __getitem__(self, run):
+        """Return the values of a run, by index or name."""
+        if isinstance(run, str):
+            run = self.names.index(run)
+        return self.values[self.offsets[run] : self.offsets[run + 1]]
+
+    def __repr__(self):
+        """Show the number of runs and values."""
+        return f"{self.__class__.__name__}({len(self)} runs, {len(self.values)} values)"
+
+    @property
+    def unit(self):
+        """The common unit of the values, None if they have no unit."""
+        return getattr(self.values, "unit", None)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """The number of values of every run."""
+        return np.diff(self.offsets)
+
+    @property
+    def run_ids(self) -> np.ndarray:
+        """The index of the run of every value."""
+        return np.repeat(np.arange(len(self)), self.lengths)
+
+    def stack(self):
+        """Return the values as a (runs, values per run) array.
+
+        Raises:
+            ValueError: If the runs have different numbers of values.
+        """
+        if len(set(self.lengths)) > 1:
+            raise ValueError("Runs have different numbers of values, cannot stack")
+        return self.values.reshape(len(self), -1)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return a long DataFrame with the run name and value of every value."""
+        values = self.values.value if self.unit is not None else self.values
+        return pd.DataFrame(
+            {"run": np.asarray(self.names, dtype=object)[self.run_ids], "value": values}
+        )
+
+
+class RunCollection:
+    """A collection of runs (e.g. `AYODirectory`s) queried together.
+
+    `get` resolves a key in every run, in parallel if `max_workers` is set,
+    and returns the values of all runs in one array in a common unit, instead
+    of one tree search and unit conversion per run by the caller.
+
+    Example:
+        >>> runs = RunCollection([ayo_run, exosims_run], names=["AYO", "EXOSIMS"])
+        >>> dist = runs.get("star_dist")
+        >>> dist["AYO"], dist.values, dist.run_ids
+    """
+
+    def __init__(self, runs, names=None, max_workers: int | None = None):
+        """Initialize the collection.
+
+        Args:
+            runs (list):
+                The runs, any nodes with a `get` method.
+            names (list, optional):
+                The name of every run. Defaults to the run directory names,
+                made unique with the run index if needed.
+            max_workers (int, optional):
+                Number of threads resolving a key across runs. If None or 1,
+                runs are queried serially.
+        """
+        self.runs = list(runs)
+        if names is None:
+            names = [run.file_path.name for run in self.runs]
+            if len(set(names)) < len(names):
+                names = [f"{name} ({i})" for i, name in enumerate(names)]
+        if len(names) != len(self.runs):
+            raise ValueError(f"Expected {len(self.runs)} names, got {len(names)}")
+        self.names = list(names)
+        self.max_workers = max_workers
+
+    def __len__(self):
+        """Number of runs."""
+        return len(self.runs)
+
+    def __iter__(self):
+        """Iterate over the runs, so collections can be passed to `compare`."""
+        return iter(self.runs)
+
+    def __getitem__(self, run):
+        """Return a run, by index or name."""
+        if isinstance(run, str):
+            run = self.names.index(run)
+        return self.runs[run]
+
+    def __repr__(self):
+        """Show the run names."""
+        return f"{self.__class__.__name__}({self.names})"
+
+    def get_each(self, key: str, **kwargs) -> list:
+        """Return the value of a key in every run, None where it is missing."""
+        if self.max_workers is None or self.max_workers <= 1:
+            return [run.get(key, **kwargs) for run in self.runs]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(lambda run: run.get(key, **kwargs), self.runs))
+
+    def get(self, key: str, **kwargs):
+        """Return the values of a key across every run.
+
+        Quantities are converted to the unit of the first run that returns one.
+        Values without a unit are assumed to be in that unit.
+
+        Args:
+            key (str):
+                The key to look up.
+            **kwargs:
+                Passed to the `get` of every run.
+
+        Returns:
+            StackedValues or pandas.DataFrame or None:
+                The stacked values of every run. DataFrame values are
+                concatenated with the run name as the first index level. None
+                if no run resolves the key.
+        """
+        results = self.get_each(key, **kwargs)
+        found = {
+            name: value
+            for name, value in zip(self.names, results, strict=True)
+            if value is not None
+        }
+        if not found:
+            return None
+        if any(isinstance(value, pd.DataFrame) for value in found.values()):
+            return pd.concat(found, names=["run", None])
+        for name, value in found.items():
+            if isinstance(value, dict):
+                raise TypeError(f"Cannot stack the dictionary {key} of run {name}")
+
+        unit = next(
+            (value.unit for value in found.values() if isinstance(value, u.Quantity)),
+            None,
+        )
+        chunks = []
+        for name, value in zip(self.names, results, strict=True):
+            if value is None:
+                chunks.append(np.empty(0))
+            elif isinstance(value, u.Quantity):
+                chunks.append(np.ravel(value.to_value(unit)))
+            else:
+                if unit is not None:
+                    logger.warning(
+                        f"{key} of run {name} has no unit, assuming {unit.to_string()}"
+                    )
+                chunks.append(np.ravel(value))
+        offsets = np.concatenate([[0], np.cumsum([len(chunk) for chunk in chunks])])
+        # Empty chunks are left out so they do not change the dtype of the values
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        values = np.concatenate(chunks) if chunks else np.empty(0)
+        if unit is not None:
+            values = u.Quantity(values, unit, copy=False)
+        return StackedValues(values, offsets, self.names)
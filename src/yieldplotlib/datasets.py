@@ -26,8 +26,16 @@ PIKACHU = pooch.create(
 )
 
 
-def fetch_ayo_data():
-    """Fetch and unpack AYO data."""
+def fetch_ayo_data(extract: bool = True):
+    """Fetch and unpack AYO data.
+
+    Args:
+        extract (bool):
+            If False, read the run directly from the downloaded zip instead of
+            unpacking it, see `DirectoryNode.from_archive`.
+    """
+    if not extract:
+        return AYODirectory.from_archive(PIKACHU.fetch("ayo.zip"))
     PIKACHU.fetch("ayo.zip", processor=Unzip())
     return AYODirectory(PIKACHU.abspath / "ayo.zip.unzip/ayo")
 
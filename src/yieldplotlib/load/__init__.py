@@ -2,14 +2,18 @@
 
 __all__ = [
     "AYODirectory",
+    "BundleDirectory",
     "DRMDirectory",
     "EXOSIMSCSVDirectory",
     "EXOSIMSDirectory",
     "SPCDirectory",
     "YIPDirectory",
+    "load_ayo_sweep",
 ]
 
 from .ayo_directory import AYODirectory
+from .ayo_sweep import load_ayo_sweep
+from .bundle_directory import BundleDirectory
 from .exosims_directory import (
     DRMDirectory,
     EXOSIMSCSVDirectory,
@@ -15,6 +15,16 @@ OVERRIDE_KEYS = {
 class AYOCSVFile(CSVFile):
     """Node for handling reduced AYO CSV files."""
 
+    # Columns read by `_get_blind_comp` and `_get_core_thruput`
+    extra_columns = (
+        "Visit #",
+        "exoEarth candidate yield",
+        "HIP",
+        "Exp Time (days)",
+        "Sep (l/D)",
+        "Core throughput",
+    )
+
     def transform_star_name(self, data):
         """Add a prefix to the star_name data."""
         return np.array(["HIP " + str(int(name)) for name in data])
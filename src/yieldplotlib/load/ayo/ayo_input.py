@@ -1,6 +1,9 @@
 """Node for handling input .ayo files."""
 
+import functools
 import json
+import operator
+import re
 from pathlib import Path
 
 import astropy.units as u
@@ -20,142 +23,328 @@ u.add_enabled_units([read])
 zodis = u.def_unit("zodis")
 u.add_enabled_units([zodis])
 
+# Unit names used in AYO input files that are not astropy unit names
+UNIT_MAP = {
+    "years": u.yr,
+    "l/D": lod,
+    "lambda/D": lod,
+    "mags": u.mag,
+    "microns": u.um,
+    "counts": u.count,
+    "photon_count": u.photon,
+    "read": read,
+    "degrees": u.deg,
+}
+
+
+def convert_array(tokens):
+    """Convert parsed array tokens to a numpy array."""
+    return np.array(tokens[0].asList())
+
+
+@functools.cache
+def convert_unit(units: tuple):
+    """Combine (unit name, exponent) pairs into an astropy unit.
+
+    Parsing units with astropy is slow, so the result is cached.
+
+    Args:
+        units (tuple):
+            The (unit name, exponent) pairs, e.g. (("count", 1), ("s", -1)).
+
+    Returns:
+        astropy.units.Unit:
+            The product of the units raised to their exponents.
+    """
+    final_unit = None
+    for unit_str, degree in units:
+        # Get the unit from the predefined map, otherwise parse it with astropy
+        _u = UNIT_MAP[unit_str] if unit_str in UNIT_MAP else u.Unit(unit_str)
+        if final_unit is None:
+            final_unit = _u**degree
+        else:
+            final_unit *= _u**degree
+    return final_unit
 
-class AYOInputFile(FileNode):
-    """Node for handling AYO input files using PyParsing."""
 
-    def __init__(self, file_path: Path):
-        """Initialize the AYOInputFile node with the file path."""
-        super().__init__(file_path)
-        self.data = {}
-        self.parse()
-        self.is_input = True
+# Operators supported in `value op value` expressions
+OPERATORS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+}
 
-    def load(self):
-        """Load the text file into memory."""
-        with open(self.file_path, encoding="utf-8") as f:
-            self.raw_data = f.read()
-        logger.info(f"Loaded AYO input file: {self.file_path}")
 
-    def _get(self, key: str, **kwargs):
-        """Return the data associated with the key."""
-        return self.data.get(key, None)
+class Expression:
+    """A parsed `value op value` expression, evaluated once parsing is done.
 
-    def parse(self):
-        """Parse the AYO input file and populate the self.data dictionary."""
-        # Define a unit as a word composed of alphabetic characters and underscores,
-        # possibly combined with slashes for compound units
-        simple_unit = pp.Word(pp.alphas, pp.alphanums + "_")
-        compound_unit = pp.Combine(simple_unit + pp.ZeroOrMore("/" + simple_unit))
+    Keeping the evaluation out of the grammar's parse actions lets the grammar
+    be built once and shared by every input file.
+    """
 
-        # Unit can be either a compound unit or a simple unit
-        unit = compound_unit("unit")
+    def __init__(self, tokens):
+        """Store the operands and operator of the expression."""
+        self.left, self.op, self.right = tokens
 
-        # Define an optional exponent, e.g., ^-1, ^2
-        exponent = pp.Suppress("^") + pp.Regex(r"[+-]?\d+").setParseAction(
-            lambda t: int(t[0])
+    def evaluate(self, data: dict):
+        """Evaluate the expression, looking up parameter references in data."""
+        left = (
+            data[self.left]
+            if isinstance(self.left, str) and self.left in data
+            else self.left
+        )
+        right = (
+            data[self.right]
+            if isinstance(self.right, str) and self.right in data
+            else self.right
         )
+        return OPERATORS[self.op](left, right)
 
-        # Define a unit with an optional exponent
-        unit_with_exp = pp.Group(unit + pp.Optional(exponent, default=1)("degree"))
 
-        # Define grammar for a single key-value pair with type identifier
-        identifier = pp.Word(pp.alphas + "_", pp.alphanums + "_").setName("identifier")
+def build_grammar():
+    """Build the pyparsing grammar of a single `key = value` line.
 
-        # Define number (integer or float)
-        number = pp.common.number().setName("number")
+    Returns:
+        pp.ParserElement:
+            The grammar, with the results names "key", "value", "units",
+            "type", "comment_before_type" and "comment_after_type".
+    """
+    # Define a unit as a word composed of alphabetic characters and underscores,
+    # possibly combined with slashes for compound units
+    simple_unit = pp.Word(pp.alphas, pp.alphanums + "_")
+    compound_unit = pp.Combine(simple_unit + pp.ZeroOrMore("/" + simple_unit))
 
-        # Define string (single or double quoted)
-        string = pp.QuotedString("'", escChar="\\") | pp.QuotedString('"', escChar="\\")
+    # Unit can be either a compound unit or a simple unit
+    unit = compound_unit("unit")
 
-        # Define array
-        array = (
-            pp.Group(
-                pp.Suppress("[")
-                + pp.Optional(pp.delimitedList(number | string, delim=","))
-                + pp.Suppress("]")
-            )
-            .setName("array")
-            .setParseAction(self._convert_array)
-        )
+    # Define an optional exponent, e.g., ^-1, ^2
+    exponent = pp.Suppress("^") + pp.Regex(r"[+-]?\d+").setParseAction(
+        lambda t: int(t[0])
+    )
 
-        # Define parameter reference (used in expressions)
-        param_ref = identifier.copy().setName("param_ref")
+    # Define a unit with an optional exponent
+    unit_with_exp = pp.Group(unit + pp.Optional(exponent, default=1)("degree"))
 
-        # Define expression parts - handle addition, subtraction,
-        # multiplication, division
-        expr_term = number | param_ref
+    # Define grammar for a single key-value pair with type identifier
+    identifier = pp.Word(pp.alphas + "_", pp.alphanums + "_").setName("identifier")
 
-        # Simple expressions (value op value)
-        simple_expr = (expr_term + pp.oneOf("+ - * /") + expr_term).setName(
-            "simple_expr"
+    # Define number (integer or float)
+    number = pp.common.number().setName("number")
+
+    # Define string (single or double quoted)
+    string = pp.QuotedString("'", escChar="\\") | pp.QuotedString('"', escChar="\\")
+
+    # Define array
+    array = (
+        pp.Group(
+            pp.Suppress("[")
+            + pp.Optional(pp.delimitedList(number | string, delim=","))
+            + pp.Suppress("]")
+        )
+        .setName("array")
+        .setParseAction(convert_array)
+    )
+
+    # Define parameter reference (used in expressions)
+    param_ref = identifier.copy().setName("param_ref")
+
+    # Define expression parts - handle addition, subtraction,
+    # multiplication, division
+    expr_term = number | param_ref
+
+    # Simple expressions (value op value), evaluated against the parsed
+    # parameters after parsing
+    expression = (
+        (expr_term + pp.oneOf("+ - * /") + expr_term)
+        .setName("simple_expr")
+        .setParseAction(Expression)
+    )
+
+    # Define type identifier in curly braces
+    type_literal = (
+        pp.Suppress("{")
+        + pp.Word(pp.alphas).setResultsName("type")
+        + pp.SkipTo(pp.Suppress("}"))
+    )
+
+    # Unit identifier in parentheses
+    unit_literal = (
+        pp.Suppress("(")
+        + pp.OneOrMore(unit_with_exp)
+        .setResultsName("units")
+        .setParseAction(
+            lambda tokens: convert_unit(tuple((t["unit"], t["degree"]) for t in tokens))
         )
+        + pp.Suppress(") ")
+    )
+
+    # Define all possible value types with priorities (try more specific
+    # patterns first)
+    value_types = expression | array | string | number | param_ref
+
+    # Define key-value pair with type, optional unit, and optional comments
+    return (
+        identifier.setResultsName("key")
+        + pp.Suppress("=")
+        + value_types.setResultsName("value")
+        + pp.Optional(pp.Suppress(";"))  # Semicolon is optional
+        + pp.Optional(unit_literal)
+        # The comments are matched with regexes, which are much faster than
+        # `SkipTo` on long comments: text up to a "{", and the rest of the line
+        + pp.Optional(pp.Regex(r"[^{]*(?=\{)").setResultsName("comment_before_type"))
+        + pp.Optional(type_literal)
+        + pp.Optional(pp.Regex(r".*").setResultsName("comment_after_type"))
+    )
+
+
+# Grammar shared by every AYO input file
+KEY_VALUE = build_grammar()
+
+# Fast path for the common `key = number ;(unit) {type} comment` lines, and for
+# arrays of numbers and quoted strings without escapes. The value must be
+# followed by a semicolon or the end of the line, anything else (e.g. an
+# expression) is left to the grammar.
+_NUMBER = r"[+-]?(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?"
+_ARRAY = rf"\[\s*(?:{_NUMBER}\s*(?:,\s*{_NUMBER}\s*)*)?\]"
+_STRING = r"'[^'\\]*'|\"[^\"\\]*\""
+_FAST_LINE = re.compile(
+    rf"(?P<key>[A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?P<value>{_NUMBER}|{_ARRAY}|{_STRING})\s*"
+    r"(?:;(?P<rest>.*))?",
+    re.ASCII,
+)
+# The grammar only reads units followed by ") "
+_FAST_UNITS = re.compile(r"\((?P<units>[^()]*)\) ", re.ASCII)
+_FAST_UNIT = re.compile(
+    r"(?P<unit>[A-Za-z][A-Za-z0-9_]*(?:/[A-Za-z][A-Za-z0-9_]*)*)"
+    r"(?:\^(?P<degree>[+-]?\d+))?",
+    re.ASCII,
+)
+_FAST_TYPE = re.compile(r"[^{]*\{\s*(?P<type>[A-Za-z]+).*\}", re.ASCII)
+
+
+def _convert_number(text: str):
+    """Convert a number to an int or float, like `pp.common.number`."""
+    if "." in text or "e" in text or "E" in text:
+        return float(text)
+    return int(text)
+
+
+def parse_simple_line(line: str):
+    """Parse a simple `key = value ;(unit) {type}` line without pyparsing.
+
+    The value can be a number, an array of numbers or a quoted string without
+    escapes.
+
+    Args:
+        line (str):
+            The stripped line.
+
+    Returns:
+        tuple or None:
+            The (key, value, type) of the line, or None if the line is not
+            simple and must be parsed with the grammar.
+    """
+    match = _FAST_LINE.fullmatch(line)
+    if match is None:
+        return None
+    value = match["value"]
+    if value[0] in "'\"":
+        value = value[1:-1]
+    elif value.startswith("["):
+        elements = value[1:-1].split(",") if value[1:-1].strip() else []
+        value = np.array([_convert_number(element.strip()) for element in elements])
+    else:
+        value = _convert_number(value)
+    rest = (match["rest"] or "").lstrip()
+    if rest.startswith("("):
+        units_match = _FAST_UNITS.match(rest)
+        if units_match is None:
+            return None
+        units = []
+        for token in units_match["units"].split():
+            unit_match = _FAST_UNIT.fullmatch(token)
+            if unit_match is None:
+                return None
+            units.append((unit_match["unit"], int(unit_match["degree"] or 1)))
+        if not units:
+            return None
+        value *= convert_unit(tuple(units))
+        rest = rest[units_match.end() :]
+    type_match = _FAST_TYPE.match(rest)
+    type_ = type_match["type"].lower() if type_match else "string"
+    return match["key"], value, type_
+
+
+def parse_line(line: str, data: dict):
+    """Parse a single `key = value` line of an AYO input file.
+
+    Args:
+        line (str):
+            The stripped line.
+        data (dict):
+            The parameters parsed so far, used to evaluate expressions.
+
+    Returns:
+        tuple:
+            The (key, value, type) of the line.
+
+    Raises:
+        pp.ParseException:
+            If the line does not follow the AYO input grammar.
+    """
+    fast = parse_simple_line(line)
+    if fast is not None:
+        return fast
+    parsed = KEY_VALUE.parseString(line, parseAll=True)
+    type_ = parsed.get("type", "string").lower()
+    value = parsed["value"][0]
+    if isinstance(value, Expression):
+        value = value.evaluate(data)
+    if "units" in parsed:
+        value *= parsed["units"]
+    return parsed["key"], value, type_
 
-        # Define a post-processing function for mathematical expressions
-        def process_expression(tokens):
-            """Process a mathematical expression with parameter references."""
-            if len(tokens) == 3:  # It's an expression like a + b or a - b
-                left, op, right = tokens
 
-                # If the right side is a parameter reference, look it up
-                if isinstance(right, str) and right in self.data:
-                    right_val = self.data[right]
-                else:
-                    right_val = right
+class AYOInputFile(FileNode):
+    """Node for handling AYO input files using PyParsing."""
 
-                # If the left side is a parameter reference, look it up
-                if isinstance(left, str) and left in self.data:
-                    left_val = self.data[left]
-                else:
-                    left_val = left
-
-                # Perform the operation
-                if op == "+":
-                    return left_val + right_val
-                elif op == "-":
-                    return left_val - right_val
-                elif op == "*":
-                    return left_val * right_val
-                elif op == "/":
-                    return left_val / right_val
-
-            return tokens[0]  # Not an expression we recognize
-
-        # Define the expression and set its parse action
-        expression = simple_expr.setParseAction(process_expression)
-
-        # Define type identifier in curly braces
-        type_literal = (
-            pp.Suppress("{")
-            + pp.Word(pp.alphas).setResultsName("type")
-            + pp.SkipTo(pp.Suppress("}"))
-        )
+    def __init__(self, file_path: Path, **kwargs):
+        """Initialize the AYOInputFile node with the file path.
 
-        # Unit identifier in parentheses
-        unit_literal = (
-            pp.Suppress("(")
-            + pp.OneOrMore(unit_with_exp)
-            .setResultsName("units")
-            .setParseAction(self._convert_unit)
-            + pp.Suppress(") ")
-        )
+        Args:
+            file_path (Path):
+                The path to the .ayo file.
+            **kwargs:
+                Loading options passed to `FileNode` (e.g. `lazy`).
+        """
+        super().__init__(file_path, **kwargs)
+        self.is_input = True
 
-        # Define all possible value types with priorities (try more specific
-        # patterns first)
-        value_types = expression | array | string | number | param_ref
-
-        # Define key-value pair with type, optional unit, and optional comments
-        key_value = (
-            identifier.setResultsName("key")
-            + pp.Suppress("=")
-            + value_types.setResultsName("value")
-            + pp.Optional(pp.Suppress(";"))  # Semicolon is optional
-            + pp.Optional(unit_literal)
-            + pp.Optional(pp.SkipTo("{").setResultsName("comment_before_type"))
-            + pp.Optional(type_literal)
-            + pp.Optional(pp.SkipTo(pp.lineEnd()).setResultsName("comment_after_type"))
-        )
+    def load(self):
+        """Load the text file into memory and parse it."""
+        with self.open(encoding="utf-8") as f:
+            self.raw_data = f.read()
+        logger.info(f"Loaded AYO input file: {self.file_path}")
+        self.data = {}
+        self.parse()
+
+    def _cache_payload(self):
+        """Return the parsed parameters and raw text for the disk cache."""
+        return {"raw_data": self.raw_data, "data": self.data}
+
+    def _restore_cache_payload(self, payload):
+        """Restore the parsed parameters without parsing the file again."""
+        self.raw_data = payload["raw_data"]
+        self.data = payload["data"]
+        self.expected_keys = list(self.data.keys())
 
+    def _get(self, key: str, **kwargs):
+        """Return the data associated with the key."""
+        return self.data.get(key, None)
+
+    def parse(self):
+        """Parse the AYO input file and populate the self.data dictionary."""
         # Split the raw data into individual lines
         input_file_lines = self.raw_data.split("\n")
 
@@ -167,16 +356,7 @@ class AYOInputFile(FileNode):
                 continue
 
             try:
-                # Parse the line using the defined parser
-                parsed = key_value.parseString(line, parseAll=True)
-
-                # Extract key, value, and type from the parsed result
-                key = parsed["key"]
-                type_ = parsed.get("type", "string").lower()
-                value = parsed["value"][0]
-                if "units" in parsed:
-                    unit = parsed["units"]
-                    value *= unit
+                key, value, type_ = parse_line(line, self.data)
 
                 # Store the value in self.data
                 self.data[key] = value
@@ -190,50 +370,6 @@ class AYOInputFile(FileNode):
         self.expected_keys = list(self.data.keys())
         logger.info(f"Successfully parsed {len(self.data)} input parameters.")
 
-    def _convert_array(self, tokens):
-        """Convert parsed array tokens to a Python list."""
-        array = tokens[0].asList()
-        return np.array(array)
-
-    def _convert_unit(self, parsed_unit):
-        """Convert parsed unit string to the appropriate astropy unit."""
-        # get the unit from the ParseResult object
-        _map = {
-            "years": u.yr,
-            "l/D": lod,
-            "lambda/D": lod,
-            "mags": u.mag,
-            "microns": u.um,
-            "counts": u.count,
-            "photon_count": u.photon,
-            "read": read,
-            "degrees": u.deg,
-        }
-        _whitelist = []
-        final_unit = None
-        n_units = 0
-        for current_unit in parsed_unit:
-            current_unit_str = current_unit["unit"]
-            if current_unit_str in _whitelist:
-                continue
-            if current_unit_str in _map.keys():
-                # Get the unit from the predefined map
-                _u = _map[current_unit_str]
-            else:
-                # Parse as an astropy unit
-                _u = u.Unit(current_unit_str)
-
-            # Apply the exponent
-            current_unit_degree = current_unit["degree"]
-            # Apply exponent and include the unit in the final unit
-            if n_units == 0:
-                final_unit = _u**current_unit_degree
-            else:
-                final_unit *= _u**current_unit_degree
-            n_units += 1
-
-        return final_unit
-
     def export_exosims(
         self,
         output_path: str,
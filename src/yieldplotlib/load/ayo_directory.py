@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+from yieldplotlib.core.compression import file_suffix
 from yieldplotlib.core.directory_node import DirectoryNode
 from yieldplotlib.core.node import Node
 from yieldplotlib.load.ayo import AYOCSVFile, AYOInputFile
@@ -10,14 +11,16 @@ from yieldplotlib.load.ayo import AYOCSVFile, AYOInputFile
 class AYODirectory(DirectoryNode):
     """Loader for AYO directories.
 
-    Currently only supports CSV files.
+    Currently only supports CSV files. Loading options such as `max_workers`
+    are accepted as keyword arguments, see `DirectoryNode`.
     """
 
     def _create_file_node(self, path: Path) -> Node:
         """Override file node creation logic for AYO-specific files."""
-        if path.suffix == ".csv":
-            return AYOCSVFile(path)
-        elif path.suffix == ".ayo":
-            return AYOInputFile(path)
+        suffix = file_suffix(path)
+        if suffix == ".csv":
+            return AYOCSVFile(path, **self._file_options())
+        elif suffix == ".ayo":
+            return AYOInputFile(path, **self._file_options())
         else:
             return self.create_base_file(path)
@@ -0,0 +1,197 @@
+"""Loader for AYO parameter sweeps, with one table row per input file.
+
+Trade studies vary a few parameters over thousands of AYO runs. Rather than
+keeping an `AYOInputFile` per run, `load_ayo_sweep` parses the input files in a
+worker pool and assembles a single DataFrame with one row per run and one
+column per parameter, so a parameter of the whole sweep is one array.
+"""
+
+import os
+from pathlib import Path
+
+import astropy.units as u
+import pandas as pd
+from tqdm import tqdm
+
+from yieldplotlib.core.bundle import decode_unit
+from yieldplotlib.core.directory_node import EXECUTORS
+from yieldplotlib.load.ayo import AYOInputFile
+from yieldplotlib.logger import logger
+
+
+def find_ayo_files(sweep_dir: Path, pattern: str = "*.ayo") -> list[Path]:
+    """Recursively find the input files of a sweep.
+
+    Args:
+        sweep_dir (Path):
+            The directory holding the sweep.
+        pattern (str):
+            Glob pattern of the input files.
+
+    Returns:
+        list:
+            The input files, sorted so the row order does not depend on the
+            filesystem.
+    """
+    paths = []
+    directories = [Path(sweep_dir)]
+    # os.scandir avoids a stat call per entry on most filesystems
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    directories.append(Path(entry.path))
+                elif entry.is_file() and Path(entry.name).match(pattern):
+                    paths.append(Path(entry.path))
+    return sorted(paths)
+
+
+def _read_sweep_file(file_path: Path, disk_cache=None) -> dict:
+    """Parse an input file into (value, unit string) pairs.
+
+    Units are returned as strings because custom units such as λ/D are not
+    the same unit objects once unpickled in another process.
+    """
+    data = AYOInputFile(file_path, disk_cache=disk_cache).data
+    parameters = {}
+    for key, value in data.items():
+        if isinstance(value, u.Quantity):
+            parameters[key] = (value.value, value.unit.to_string())
+        else:
+            parameters[key] = (value, None)
+    return parameters
+
+
+def _normalize_column(key: str, entries: list, run_names: list):
+    """Convert the values of a parameter to the unit of its first run.
+
+    Args:
+        key (str):
+            The parameter name.
+        entries (list):
+            The (value, unit string) pair of every run, or None for runs that
+            do not set the parameter.
+        run_names (list):
+            The name of every run, used in error messages.
+
+    Returns:
+        tuple:
+            values (list):
+                The values in a common unit, None for missing values.
+            unit (astropy.units.UnitBase or None):
+                The common unit, None for parameters without units.
+    """
+    unit_strings = [entry[1] for entry in entries if entry is not None and entry[1]]
+    if not unit_strings:
+        return [None if entry is None else entry[0] for entry in entries], None
+
+    unit = decode_unit(unit_strings[0])
+    scales = {unit_strings[0]: 1.0}
+    values = []
+    for run_name, entry in zip(run_names, entries, strict=True):
+        if entry is None:
+            values.append(None)
+            continue
+        value, unit_string = entry
+        if unit_string is None:
+            logger.warning(
+                f"{key} has no unit in {run_name}, assuming {unit.to_string()}"
+            )
+        elif unit_string not in scales:
+            try:
+                scales[unit_string] = decode_unit(unit_string).to(unit)
+            except u.UnitConversionError as err:
+                raise ValueError(
+                    f"Cannot convert {key} of {run_name} to {unit.to_string()}"
+                ) from err
+        if unit_string is not None and scales[unit_string] != 1.0:
+            value = value * scales[unit_string]
+        values.append(value)
+    return values, unit
+
+
+def load_ayo_sweep(
+    sweep,
+    pattern: str = "*.ayo",
+    max_workers: int | None = None,
+    executor: str = "process",
+    disk_cache=None,
+) -> pd.DataFrame:
+    """Load the input parameters of an AYO sweep into one table.
+
+    Example:
+        >>> sweep = load_ayo_sweep("trade_study/")
+        >>> diameters = sweep["D"].to_numpy() * sweep.attrs["units"]["D"]
+
+    Args:
+        sweep (Path | list):
+            A directory searched recursively for input files, or a list of
+            input files.
+        pattern (str):
+            Glob pattern of the input files when `sweep` is a directory.
+        max_workers (int, optional):
+            Number of workers parsing the files. Defaults to the number of
+            CPUs, 1 parses the files serially.
+        executor (str):
+            Either "process" (parsing is CPU-bound) or "thread".
+        disk_cache (DiskCache | bool | str | Path, optional):
+            On-disk cache of parsed input files, see `DiskCache.from_option`.
+
+    Returns:
+        pandas.DataFrame:
+            One row per run, indexed by the input file path (relative to the
+            sweep directory, without suffix), and one column per parameter.
+            Quantities are stored as plain values in the unit of the first
+            run setting them, listed in ``attrs["units"]``. Array parameters
+            are stored as one array per cell, and parameters missing from a
+            run are None (NaN for numeric columns).
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor {executor}, expected one of {list(EXECUTORS)}"
+        )
+    if isinstance(sweep, str | Path):
+        base = Path(sweep)
+        paths = find_ayo_files(base, pattern)
+    else:
+        paths = sorted(Path(path) for path in sweep)
+        base = Path(os.path.commonpath([path.parent for path in paths]))
+    if not paths:
+        raise FileNotFoundError(f"No AYO input files found in {sweep}")
+    run_names = [path.relative_to(base).with_suffix("").as_posix() for path in paths]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    with tqdm(total=len(paths), desc="Loading AYO sweep", unit="file") as pbar:
+        if max_workers <= 1:
+            runs = []
+            for path in paths:
+                runs.append(_read_sweep_file(path, disk_cache))
+                pbar.update(1)
+        else:
+            # Send the files in chunks to amortize the inter-process overhead
+            chunksize = max(1, len(paths) // (4 * max_workers))
+            with EXECUTORS[executor](max_workers=max_workers) as pool:
+                runs = []
+                for run in pool.map(
+                    _read_sweep_file,
+                    paths,
+                    [disk_cache] * len(paths),
+                    chunksize=chunksize,
+                ):
+                    runs.append(run)
+                    pbar.update(1)
+
+    # Parameters in order of first appearance
+    keys = list(dict.fromkeys(key for run in runs for key in run))
+    columns = {}
+    units = {}
+    for key in keys:
+        entries = [run.get(key) for run in runs]
+        columns[key], unit = _normalize_column(key, entries, run_names)
+        if unit is not None:
+            units[key] = unit
+    table = pd.DataFrame(columns, index=pd.Index(run_names, name="run"))
+    table.attrs["units"] = units
+    logger.info(f"Loaded {len(keys)} parameters of {len(paths)} AYO runs")
+    return table
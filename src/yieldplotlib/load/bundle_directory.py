@@ -0,0 +1,56 @@
+"""Loader for run bundles written by `DirectoryNode.export_bundle`."""
+
+from pathlib import Path
+
+from yieldplotlib.core import Node
+from yieldplotlib.core.bundle import decode_bundle_value, read_bundle
+from yieldplotlib.logger import logger
+
+
+class BundleDirectory(Node):
+    """A pre-digested run loaded from a single bundle file.
+
+    Supports the same `get` contract as the directory it was exported from,
+    without parsing the run's input, JSON, pickle or CSV files. Arrow IPC
+    bundles are memory-mapped, so the returned arrays are zero-copy views of
+    the file.
+    """
+
+    def __init__(self, bundle_path: Path):
+        """Initialize the loader by reading the bundle.
+
+        Args:
+            bundle_path (Path):
+                The bundle file.
+        """
+        super().__init__(Path(bundle_path))
+        # Aliasing file_path to directory_path for consistency
+        self.directory_path = self.file_path
+        self.directory_name = self.file_path.stem
+        self.load()
+
+    def load(self):
+        """Read the bundle's columns and metadata."""
+        self.data, self.metadata = read_bundle(self.file_path)
+        # Name of the directory class the bundle was exported from
+        self.source = self.metadata["source"]
+        self.input_parameters = self.metadata["input"]
+        logger.info(
+            f"Loaded bundle of {self.metadata['name']} ({self.source}) with "
+            f"{len(self.metadata['keys'])} keys"
+        )
+
+    def has_key(self, key: str) -> bool:
+        """Whether the bundle holds the key."""
+        return key in self.metadata["keys"]
+
+    def keys(self):
+        """Return the keys held by the bundle."""
+        return self.metadata["keys"].keys()
+
+    def get(self, key: str, **kwargs):
+        """Return the value of a key, or None if the bundle does not hold it."""
+        if not self.has_key(key):
+            logger.debug(f"Key {key} not found in {self.file_name}.")
+            return None
+        return decode_bundle_value(self.data, key, self.metadata["keys"][key])
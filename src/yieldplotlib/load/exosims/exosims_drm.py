@@ -1,57 +1,339 @@
-"""Custom node for handling DRM pickle files."""
+"""Custom node for handling DRM pickle files.
+
+DRM pickles hold the observations of one EXOSIMS run, with EXOSIMS objects and
+astropy Quantities mixed in. Unpickling them normally requires the EXOSIMS
+version that wrote them, so they are read with `DRMUnpickler` instead, which
+only imports the numpy reconstruction functions and replaces every other class
+with an inert stub. The observations are then reduced to typed NumPy columns
+and the rest of the pickle is dropped.
+"""
+
+import pickle
+from pathlib import Path
 
-import astropy.units as u
 import numpy as np
 
+from yieldplotlib.core.archive import open_path
+from yieldplotlib.core.ensemble import MemberStatistic
 from yieldplotlib.core.file_nodes import PickleFile
+from yieldplotlib.key_map import KEY_MAP
 from yieldplotlib.logger import logger
 
+# Columns with one value per observation
+DRM_OBSERVATION_COLUMNS = (
+    "star_ind",
+    "star_name",
+    "arrival_time",
+    "OB_nb",
+    "ObsNum",
+    "det_time",
+    "det_fZ",
+    "det_mode",
+    "det_comp",
+)
+# Columns with one value per planet of each observation
+DRM_PLANET_COLUMNS = ("plan_inds", "det_status", "det_SNR")
+# Per-planet entries of the `det_params` dictionary of each observation
+DRM_DET_PARAMS = ("d", "phi", "fEZ", "dMag", "WA")
+# Index of the observation of every per-planet row
+PLANET_OBSERVATION_COLUMN = "plan_obs"
 
-class DRMFile(PickleFile):
-    """Node for handling DRM-specific pickle files."""
+DRM_COLUMNS = (
+    *DRM_OBSERVATION_COLUMNS,
+    *DRM_PLANET_COLUMNS,
+    *(f"det_params/{name}" for name in DRM_DET_PARAMS),
+    PLANET_OBSERVATION_COLUMN,
+)
 
-    def load(self):
-        """Load the DRM file as a list of dictionaries."""
-        # INFO: We are ignoring DRM files because they are often built on
-        # EXOSIMS versions that are not available on the local machine and
-        # cannot be loaded. The vast majority of the information the DRM data
-        # is available in the CSV files.
-        pass
+# The functions numpy arrays, scalars and dtypes are pickled with
+NUMPY_GLOBALS = {
+    "_reconstruct": np.zeros(1).__reduce__()[0],
+    "_frombuffer": np.zeros(1).__reduce_ex__(5)[0],
+    "scalar": np.float64(0).__reduce__()[0],
+    "ndarray": np.ndarray,
+    "dtype": np.dtype,
+}
+SAFE_GLOBALS = {
+    ("builtins", "set"): set,
+    ("builtins", "frozenset"): frozenset,
+    ("builtins", "complex"): complex,
+    ("builtins", "slice"): slice,
+    ("builtins", "bytearray"): bytearray,
+    ("collections", "OrderedDict"): dict,
+    # Used by numpy for bytes in pickle protocols 0-2
+    ("_codecs", "encode"): lambda text, encoding="latin1": text.encode(encoding),
+}
+# astropy classes that pickle like a numpy array with a unit attached
+QUANTITY_CLASSES = {
+    "Quantity",
+    "SpecificTypeQuantity",
+    "Angle",
+    "Latitude",
+    "Longitude",
+    "Distance",
+}
+# Stub classes created by `DRMUnpickler`, by module and name
+_STUBS = {}
 
-    def _get(self, key: str, **kwargs):
-        """Custom logic for DRM files."""
-        # TODO: Implement custom logic for DRM files.
-        return None
-
-        # DRM files are a list of dictionaries.
-        # We want to return a list of values for the given key.
-        drm_dict_keys = [
-            "star_ind",
-            "star_name",
+
+class StubObject:
+    """Inert placeholder for a class the DRM reader does not import.
+
+    Stubs accept (and record) any constructor arguments and pickled state, and
+    calling a stubbed function returns a new stub, so nothing outside of the
+    allowed globals is ever executed.
+    """
+
+    def __new__(cls, *args, **kwargs):
+        """Create the stub without running any constructor."""
+        stub = super().__new__(cls)
+        stub.args = args
+        return stub
+
+    def __init__(self, *args, **kwargs):
+        """Ignore the constructor arguments (already recorded by `__new__`)."""
+
+    def __setstate__(self, state):
+        """Record the pickled state."""
+        self.state = state
+
+    def __repr__(self):
+        """Show the stubbed class."""
+        return f"<stub {self.__class__.__module__}.{self.__class__.__name__}>"
+
+
+class QuantityStub(np.ndarray):
+    """Plain array standing in for an astropy Quantity, dropping its unit."""
+
+    def __setstate__(self, state):
+        """Restore the array part of a pickled Quantity."""
+        # Quantities pickle as (ndarray state, instance dict)
+        if len(state) == 2 and isinstance(state[1], dict):
+            state = state[0]
+        super().__setstate__(state)
+
+
+class DRMUnpickler(pickle.Unpickler):
+    """Unpickler that resolves EXOSIMS and astropy classes to stubs."""
+
+    def find_class(self, module: str, name: str):
+        """Return an allowed global, or a stub for anything else."""
+        if module.split(".")[0] == "numpy" and name in NUMPY_GLOBALS:
+            return NUMPY_GLOBALS[name]
+        if (module, name) in SAFE_GLOBALS:
+            return SAFE_GLOBALS[(module, name)]
+        if module.startswith("astropy.") and name in QUANTITY_CLASSES:
+            return QuantityStub
+        if (module, name) not in _STUBS:
+            logger.debug(f"Stubbing {module}.{name} in DRM pickle")
+            _STUBS[(module, name)] = type(name, (StubObject,), {"__module__": module})
+        return _STUBS[(module, name)]
+
+
+def load_drm(file_path: Path):
+    """Unpickle a DRM file without importing EXOSIMS.
+
+    Args:
+        file_path (Path | ArchivePath):
+            The DRM pickle, on disk or in an archive.
+
+    Returns:
+        list:
+            The observations of the run, as dictionaries. Quantities are plain
+            arrays in their pickled unit, and EXOSIMS objects are stubs.
+    """
+    with open_path(file_path, "rb") as f:
+        contents = DRMUnpickler(f).load()
+    # EXOSIMS ensembles pickle {"DRM": ..., "systems": ..., "seed": ...}
+    if isinstance(contents, dict) and "DRM" in contents:
+        contents = contents["DRM"]
+    if not isinstance(contents, list):
+        raise ValueError(f"{file_path} does not hold a DRM list")
+    return contents
+
+
+def _as_value(value):
+    """Convert a DRM value to a plain scalar or array."""
+    if isinstance(value, np.ndarray):
+        value = value.view(np.ndarray)
+        return value.item() if value.ndim == 0 else value
+    if isinstance(value, dict):
+        # Observing modes are summarized by their system name
+        return value.get("systName", value.get("hex"))
+    return value
+
+
+def _typed_column(values: list) -> np.ndarray:
+    """Build a typed array, filling missing (None) values with NaN or ""."""
+    present = [value for value in values if value is not None]
+    try:
+        column = np.asarray(present)
+    except ValueError:
+        # Values of different shapes cannot share a typed column
+        column = np.empty(len(present), dtype=object)
+        column[:] = present
+    if len(present) == len(values):
+        return column
+    if column.dtype.kind == "O":
+        filled = np.full(len(values), None, dtype=object)
+        filled[[value is not None for value in values]] = column
+        return filled
+    if column.dtype.kind in "biu":
+        column = column.astype(float)
+    filled = np.full(len(values), "" if column.dtype.kind == "U" else np.nan)
+    filled = filled.astype(column.dtype if len(present) else float)
+    filled[[value is not None for value in values]] = column
+    return filled
+
+
+def read_drm_columns(file_path: Path, columns=None) -> dict:
+    """Extract the observations of a DRM pickle into typed NumPy columns.
+
+    Observation columns (e.g. `star_ind`, `arrival_time`, `det_time`) hold one
+    value per observation. Planet columns (e.g. `plan_inds`, `det_SNR` and the
+    `det_params/<name>` entries) hold one value per planet of each observation,
+    concatenated, with `plan_obs` giving the observation index of each value.
+    Quantities are stored as values in their pickled unit, missing values are
+    NaN (or "" for strings).
+
+    Args:
+        file_path (Path):
+            The DRM pickle.
+        columns (list, optional):
+            The columns to keep, defaults to `DRM_COLUMNS`.
+
+    Returns:
+        dict:
+            Maps the column names to arrays.
+    """
+    columns = DRM_COLUMNS if columns is None else columns
+    observations = load_drm(file_path)
+
+    values = {column: [] for column in columns}
+    for obs_ind, obs in enumerate(observations):
+        n_planets = len(np.atleast_1d(obs.get("plan_inds", [])))
+        for column in columns:
+            if column == PLANET_OBSERVATION_COLUMN:
+                values[column].extend([obs_ind] * n_planets)
+                continue
+            if column.startswith("det_params/"):
+                value = (obs.get("det_params") or {}).get(column.split("/", 1)[1])
+            else:
+                value = obs.get(column)
+            value = _as_value(value)
+            if column in DRM_OBSERVATION_COLUMNS:
+                values[column].append(value)
+                continue
+            per_planet = np.atleast_1d(value) if value is not None else []
+            if len(per_planet) != n_planets:
+                per_planet = [None] * n_planets
+            values[column].extend(per_planet)
+    logger.debug(f"Read {len(observations)} observations from {file_path}")
+    return {
+        column: _typed_column(column_values) for column, column_values in values.items()
+    }
+
+
+def _detected(member: dict) -> np.ndarray:
+    """Mask of the per-planet rows of successful detections."""
+    return member["det_status"] == 1
+
+
+def n_detections(member: dict) -> int:
+    """Number of successful detections of a DRM."""
+    return np.count_nonzero(_detected(member))
+
+
+def n_unique_detections(member: dict) -> int:
+    """Number of distinct planets detected in a DRM."""
+    return len(np.unique(member["plan_inds"][_detected(member)]))
+
+
+def n_observations(member: dict) -> int:
+    """Number of observations of a DRM."""
+    return len(member["star_ind"])
+
+
+def total_det_time(member: dict) -> float:
+    """Total detection integration time of a DRM."""
+    return np.nansum(member["det_time"])
+
+
+def star_visits(member: dict) -> np.ndarray:
+    """Number of observations of each star, indexed by star index."""
+    return np.bincount(member["star_ind"].astype(int))
+
+
+def star_detections(member: dict) -> np.ndarray:
+    """Number of successful detections around each star, indexed by star index."""
+    stars = member["star_ind"][member["plan_obs"][_detected(member)]]
+    return np.bincount(stars.astype(int), minlength=len(star_visits(member)))
+
+
+# Ensemble statistics of DRMs, see `DRMDirectory`
+DRM_STATISTICS = {
+    "n_detections": MemberStatistic(("det_status",), n_detections),
+    "n_unique_detections": MemberStatistic(
+        ("plan_inds", "det_status"), n_unique_detections
+    ),
+    "n_observations": MemberStatistic(("star_ind",), n_observations),
+    "total_det_time": MemberStatistic(("det_time",), total_det_time),
+    "star_visits": MemberStatistic(("star_ind",), star_visits, elementwise=True),
+    "star_detections": MemberStatistic(
+        ("star_ind", "plan_obs", "det_status"), star_detections, elementwise=True
+    ),
+    # Values of every observation (or planet) of the DRMs, pooled
+    **{
+        column: MemberStatistic((column,))
+        for column in (
             "arrival_time",
-            "OB_nb",
-            "ObsNum",
-            "plan_inds",
             "det_time",
-            "det_status",
-            "det_SNR",
             "det_fZ",
-            "det_params",
-            "det_mode",
             "det_comp",
-        ]
-        if key in drm_dict_keys:
-            vals = []
-            for obs in self.data:
-                try:
-                    val = obs[key]
-                    if isinstance(val, u.Quantity):
-                        vals.append(val.value)
-                    else:
-                        vals.append(val)
-                except KeyError:
-                    logger.warning(f"Key {key} not found in DRM file.")
-                    continue
-            return np.array(vals)
-        else:
-            return None
+            "det_SNR",
+            *(f"det_params/{name}" for name in DRM_DET_PARAMS),
+        )
+    },
+}
+
+
+class DRMFile(PickleFile):
+    """Node for handling DRM-specific pickle files.
+
+    The DRM is read with `read_drm_columns`, so it does not require the EXOSIMS
+    version that wrote it. DRM columns are requested by their DRM name (e.g.
+    "det_SNR"), except for names that are also yieldplotlib keys, which are
+    resolved from the run's other files.
+    """
+
+    # The extracted columns are much cheaper to restore than the pickle
+    cacheable = True
+
+    def __init__(self, file_path: Path, **kwargs):
+        """Initialize the node, deferring the read until a column is requested.
+
+        Args:
+            file_path (Path):
+                The path to the DRM pickle.
+            **kwargs:
+                Loading options passed to `FileNode`. DRM files are always lazy.
+        """
+        kwargs["lazy"] = True
+        super().__init__(file_path, **kwargs)
+
+    def get_file_key_map(self):
+        """Map the DRM columns that are not yieldplotlib keys to themselves."""
+        columns = [column for column in DRM_COLUMNS if column not in KEY_MAP]
+        transform = {"type": "none", "value": None}
+        return (
+            {column: column for column in columns},
+            {column: transform for column in columns},
+        )
+
+    def load(self):
+        """Extract the DRM's columns."""
+        self.data = read_drm_columns(self.file_path)
+
+    def _get(self, key: str, **kwargs):
+        """Return the column of the DRM."""
+        return self.data.get(key, None)
@@ -99,17 +99,60 @@ SPECIAL_KEYS = {
 }
 
 
+def first_planet_values(plan2star, values, sInds, default):
+    """Get the value of the first planet of each star.
+
+    Uses a single sorted pass over the planets instead of searching the planets
+    of every star, so the cost grows as O((planets + stars) log planets).
+
+    Args:
+        plan2star (np.ndarray):
+            The index of the host star of each planet.
+        values (np.ndarray):
+            The per-planet values (e.g. nEZ).
+        sInds (np.ndarray):
+            The indices of the stars of interest.
+        default (float):
+            The value used for stars without planets.
+
+    Returns:
+        np.ndarray:
+            The value of the first planet (in planet order) of each star.
+    """
+    star_values = np.full(len(sInds), default, dtype=float)
+    if len(plan2star) == 0:
+        return star_values
+    # Sorted host stars and the index of each one's first planet
+    hosts, first_planet = np.unique(plan2star, return_index=True)
+    pos = np.minimum(np.searchsorted(hosts, sInds), len(hosts) - 1)
+    has_planets = hosts[pos] == sInds
+    star_values[has_planets] = values[first_planet[pos[has_planets]]]
+    return star_values
+
+
 class EXOSIMSInputFile(JSONFile):
     """Node for handling the EXOSIMS input JSON files.
 
     The `data` attribute holds the input JSON file as a dictionary. Additional
     information is generated by instantiating EXOSIMS objects (as possible) and
-    extracting the relevant information when the `_get` method is called.
+    extracting the relevant information when the `_get` method is called. The
+    EXOSIMS objects (`SS`, `TL` and `OS`) are only built the first time one of
+    them is accessed, since that is by far the slowest part of loading a run.
     """
 
-    def __init__(self, file_path: Path):
-        """Initialize the EXOSIMSInputFile node with the file path."""
-        super().__init__(file_path)
+    def __init__(self, file_path: Path, **kwargs):
+        """Initialize the EXOSIMSInputFile node with the file path.
+
+        The input JSON is always read on construction (even for lazy nodes)
+        because the observing modes are needed to set up the node.
+
+        Args:
+            file_path (Path):
+                The path to the input JSON file.
+            **kwargs:
+                Loading options passed to `FileNode` (e.g. `lazy`).
+        """
+        super().__init__(file_path, **kwargs)
         self.file_path = file_path
         self.is_input = True
         self.used_modes = []
@@ -117,10 +160,38 @@ class EXOSIMSInputFile(JSONFile):
         self.used_systs = []
         self._initialize_modes()
         self.process_input()
-        self.create_exosims_objects()
+        self._exosims_objects_built = False
+        self._SS = None
+        self._TL = None
+        self._OS = None
+        self._target_names = None
+
+    def _build_name_indices(self):
+        """Map the system, instrument and mode names to their indices.
+
+        Like `list.index`, the first entry with a given name is used.
+        """
+        self.system_index = {}
+        for ind, syst in enumerate(self.data["starlightSuppressionSystems"]):
+            self.system_index.setdefault(syst["name"], ind)
+        self.instrument_index = {}
+        for ind, inst in enumerate(self.data["scienceInstruments"]):
+            self.instrument_index.setdefault(inst["name"], ind)
+        # Modes are keyed by their (instrument, system) names
+        self.mode_index = {}
+        for ind, mode in enumerate(self.data["observingModes"]):
+            self.mode_index.setdefault((mode["instName"], mode["systName"]), ind)
+
+    @staticmethod
+    def _index_of(index: dict, name: str, kind: str) -> int:
+        """Return the index of a named entry, raising a ValueError if missing."""
+        if name not in index:
+            raise ValueError(f"No {kind} named {name} in the EXOSIMS input file")
+        return index[name]
 
     def _initialize_modes(self):
         """Initialize the used modes, instruments and systems."""
+        self._build_name_indices()
         self.used_modes = self.data["observingModes"]
         self.used_insts = [m["instName"] for m in self.used_modes]
         self.used_systs = [m["systName"] for m in self.used_modes]
@@ -132,23 +203,23 @@ class EXOSIMSInputFile(JSONFile):
                 # There is only one detection mode, so we can just use the index
                 # when we hit it in the loop
                 self.det_mode_ind = ind
-                self.det_inst_ind = [
-                    inst["name"] for inst in self.data["scienceInstruments"]
-                ].index(mode["instName"])
-                self.det_syst_ind = [
-                    syst["name"] for syst in self.data["starlightSuppressionSystems"]
-                ].index(mode["systName"])
+                self.det_inst_ind = self._index_of(
+                    self.instrument_index, mode["instName"], "instrument"
+                )
+                self.det_syst_ind = self._index_of(
+                    self.system_index, mode["systName"], "system"
+                )
             if "spectro" in mode["instName"] and self.spec_mode_ind is None:
                 # Get the first spectroscopy mode, EXOSIMS does not define a single
                 # "default" spectroscopy mode so there isn't a great way to choose
                 # between them
                 self.spec_mode_ind = ind
-                self.spec_inst_ind = [
-                    inst["name"] for inst in self.data["scienceInstruments"]
-                ].index(mode["instName"])
-                self.spec_syst_ind = [
-                    syst["name"] for syst in self.data["starlightSuppressionSystems"]
-                ].index(mode["systName"])
+                self.spec_inst_ind = self._index_of(
+                    self.instrument_index, mode["instName"], "instrument"
+                )
+                self.spec_syst_ind = self._index_of(
+                    self.system_index, mode["systName"], "system"
+                )
 
     def process_input(self):
         """Process the input JSON file.
@@ -186,7 +257,7 @@ class EXOSIMSInputFile(JSONFile):
         sss = self.data["starlightSuppressionSystems"]
         unique_systems = list(set(self.used_systs))
         for system in unique_systems:
-            syst_ind = [syst["name"] for syst in sss].index(system)
+            syst_ind = self._index_of(self.system_index, system, "system")
             syst = sss[syst_ind]
             for key in EXOSIMS_PATHS["starlightSuppressionSystems"]:
                 if key in syst:
@@ -220,9 +291,7 @@ class EXOSIMSInputFile(JSONFile):
 
         # Handle science instruments
         for instrument in self.used_insts:
-            inst_ind = [inst["name"] for inst in self.data["scienceInstruments"]].index(
-                instrument
-            )
+            inst_ind = self._index_of(self.instrument_index, instrument, "instrument")
             inst = self.data["scienceInstruments"][inst_ind]
             for key in EXOSIMS_PATHS["scienceInstruments"]:
                 if key in inst:
@@ -257,11 +326,7 @@ class EXOSIMSInputFile(JSONFile):
         mode dictionary, but for this we're just looking for a used mode
         that matches the instrument and system.
         """
-        mode_ind = None
-        for ind, mode in enumerate(self.data["observingModes"]):
-            if mode["instName"] == inst and mode["systName"] == syst:
-                mode_ind = ind
-                break
+        mode_ind = self.mode_index.get((inst, syst))
         if mode_ind is None:
             raise ValueError(f"No mode found with inst={inst} and syst={syst}")
         return self.data["observingModes"][mode_ind]
@@ -344,11 +409,11 @@ class EXOSIMSInputFile(JSONFile):
                 # Get mode first since we more often want it for lambda values
                 _dict = self._get_mode_dict(inst, syst)
             elif in_INST:
-                _insts = self.data["scienceInstruments"]
-                _dict = next(_inst for _inst in _insts if _inst["name"] == inst)
+                inst_ind = self._index_of(self.instrument_index, inst, "instrument")
+                _dict = self.data["scienceInstruments"][inst_ind]
             elif in_SYST:
-                _systs = self.data["starlightSuppressionSystems"]
-                _dict = next(_syst for _syst in _systs if _syst["name"] == syst)
+                syst_ind = self._index_of(self.system_index, syst, "system")
+                _dict = self.data["starlightSuppressionSystems"][syst_ind]
 
         if _dict is None:
             raise ValueError(
@@ -366,6 +431,51 @@ class EXOSIMSInputFile(JSONFile):
             else:
                 return value
 
+    @property
+    def SS(self):
+        """The SurveySimulation object, None unless all paths are local."""
+        self._ensure_exosims_objects()
+        return self._SS
+
+    @property
+    def TL(self):
+        """The TargetList object."""
+        self._ensure_exosims_objects()
+        return self._TL
+
+    @property
+    def OS(self):
+        """The OpticalSystem object, None unless all paths are local."""
+        self._ensure_exosims_objects()
+        return self._OS
+
+    def _ensure_exosims_objects(self):
+        """Build the EXOSIMS objects if they have not been built yet."""
+        if not self._exosims_objects_built:
+            self.create_exosims_objects()
+
+    def restrict_targets(self, star_names):
+        """Restrict the TargetList to the given stars.
+
+        The filter is applied when the TargetList is built, or immediately if
+        it already exists.
+
+        Args:
+            star_names (np.ndarray):
+                The names of the stars to keep.
+        """
+        self._target_names = star_names
+        if self._exosims_objects_built:
+            self._apply_target_restriction()
+
+    def _apply_target_restriction(self):
+        """Filter the TargetList down to the restricted stars."""
+        if self._target_names is None:
+            return
+        sInds = np.where(np.isin(self._TL.Name, self._target_names))[0]
+        self._TL.revise_lists(sInds)
+        self._target_names = None
+
     def create_exosims_objects(self):
         """Create a TargetList object from the input JSON file.
 
@@ -377,11 +487,11 @@ class EXOSIMSInputFile(JSONFile):
         # SurveySimulation object and get the TargetList object from it
         # as well as other modules
         if self.all_local_paths:
-            self.SS = get_module_from_specs(self.exosims_specs, "SurveySimulation")(
+            self._SS = get_module_from_specs(self.exosims_specs, "SurveySimulation")(
                 **self.exosims_specs
             )
-            self.TL = self.SS.TargetList
-            self.OS = self.SS.OpticalSystem
+            self._TL = self._SS.TargetList
+            self._OS = self._SS.OpticalSystem
         else:
             # To avoid filtering out targets, remove optional filters and set
             # minComp to 0. During the EXOSIMSDirectory object instantiation,
@@ -389,45 +499,30 @@ class EXOSIMSInputFile(JSONFile):
             self.exosims_specs["minComp"] = 0
             self.exosims_specs["optionalFilters"] = {}
             # Initialize the TargetList object
-            self.TL = get_module_from_specs(self.exosims_specs, "TargetList")(
+            self._TL = get_module_from_specs(self.exosims_specs, "TargetList")(
                 **self.exosims_specs
             )
+        self._exosims_objects_built = True
+        self._apply_target_restriction()
 
-    def _get_comp_per_intTime(self, key, int_times=None, star_names=None):
-        """Get the completeness per integration time.
+    def _completeness_inputs(self, star_names=None):
+        """Precompute the mode-independent inputs of the completeness calculation.
 
         Args:
-            key (str):
-                The key to get the completeness for, either "blind_comp_det" or
-                "blind_comp_spec".
-            int_times (astropy.units.Quantity):
-                The integration times.
-            star_names (list):
-                The names of the stars of interest.
+            star_names (np.ndarray, optional):
+                The names of the stars of interest. Defaults to every star in
+                the TargetList.
 
         Returns:
-            np.ndarray:
-                The completeness values for each integration time and star.
+            dict:
+                The star indices (``sInds``), the star names in EXOSIMS order
+                (``names``), the position of each of those stars in
+                ``star_names`` (``index_map``) and the per-star ``fZ``, ``WA``,
+                ``dMag``, ``d`` and ``nEZ`` values.
         """
-        is_spec = key == "blind_comp_spec"
-        if is_spec:
-            # Get the default spectroscopy mode
-            mode_syst_ind = self.spec_syst_ind
-            mode_inst_ind = self.spec_inst_ind
-            mode_syst = self.data["starlightSuppressionSystems"][mode_syst_ind]["name"]
-            mode_inst = self.data["scienceInstruments"][mode_inst_ind]["name"]
-        else:
-            # Get the default detection mode
-            mode_syst_ind = self.det_syst_ind
-            mode_inst_ind = self.det_inst_ind
-            mode_syst = self.data["starlightSuppressionSystems"][mode_syst_ind]["name"]
-            mode_inst = self.data["scienceInstruments"][mode_inst_ind]["name"]
-
         TL = self.TL
-        OS = TL.OpticalSystem
         SU = self.SS.SimulatedUniverse
         if star_names is None:
-            valid_stars = np.ones(len(TL.Name), dtype=bool)
             _star_names = TL.Name
         else:
             # Check for which stars are in the target list
@@ -440,61 +535,119 @@ class EXOSIMSInputFile(JSONFile):
                     "were not found in the TargetList object. These stars will be "
                     "ignored."
                 )
-        # Get the mode dictionary from the generated EXOSIMS objects,
-        # NOTE: We cannot take them from the input file because the `hex` value
-        # is not populated in the input file
+        sInds = np.arange(len(TL.Name))[np.isin(TL.Name, _star_names)]
+        exosims_name_order = TL.Name[sInds]
+        # Get the index map of the original star name for each of the stars in the
+        # filtered star list
+        if star_names is None:
+            index_map = np.arange(len(sInds))
+        else:
+            star_name_to_idx = {name: idx for idx, name in enumerate(star_names)}
+            index_map = np.array(
+                [star_name_to_idx.get(name) for name in exosims_name_order]
+            )
+
+        # Standard working angle (get's luminosity corrected in EXOSIMS)
+        WA = TL.int_WA[sInds]
+        return {
+            "sInds": sInds,
+            "names": exosims_name_order,
+            "index_map": index_map,
+            # Standard local zodi flux
+            "fZ": np.repeat(TL.ZodiacalLight.fZ0, len(sInds)),
+            "WA": WA,
+            # Standard planet-star dMag to use (also luminosity corrected by EXOSIMS)
+            "dMag": TL.int_dMag[sInds],
+            # Calculate the planet-star distance based on the working angles
+            "d": np.tan(WA) * TL.dist[sInds],
+            # Use the first planet's nEZ value for stars with planets, default to
+            # 3 for stars without planets
+            "nEZ": first_planet_values(SU.plan2star, SU.nEZ, sInds, default=3.0),
+        }
+
+    def _find_observing_mode(self, inst, syst):
+        """Get the EXOSIMS mode dictionary for an instrument and system.
+
+        NOTE: We cannot take the modes from the input file (see
+        `_get_mode_dict`) because the `hex` value is not populated there.
+        """
         matching_modes = [
             m
-            for m in OS.observingModes
-            if m["instName"] == mode_inst and m["systName"] == mode_syst
+            for m in self.TL.OpticalSystem.observingModes
+            if m["instName"] == inst and m["systName"] == syst
         ]
+        if len(matching_modes) == 0:
+            raise ValueError(f"No mode found with inst={inst} and syst={syst}")
         if len(matching_modes) > 1:
             logger.warning(
-                f"Found {len(matching_modes)} modes with the both inst {mode_inst}"
-                f" and syst {mode_syst}. Using the first one with SNR: "
+                f"Found {len(matching_modes)} modes with the both inst {inst}"
+                f" and syst {syst}. Using the first one with SNR: "
                 f"{matching_modes[0]['SNR']}"
             )
-        mode = matching_modes[0]
-        sInds = np.arange(len(TL.Name))[np.isin(TL.Name, _star_names)]
-        exosims_name_order = TL.Name[sInds]
-        # Get the index map of the original star name for each of the stars in the
-        # filtered star list
-        star_name_to_idx = {name: idx for idx, name in enumerate(star_names)}
-        index_map = np.array(
-            [star_name_to_idx.get(name) for name in exosims_name_order]
+        return matching_modes[0]
+
+    def _mode_JEZ(self, inputs, mode):
+        """Scale the exozodi intensity of a mode to the per-star nEZ values."""
+        # Scale to the working angles
+        JEZ0 = self.TL.JEZ0[mode["hex"]][inputs["sInds"]]
+        return JEZ0 * inputs["nEZ"] * (1 / inputs["d"].to("AU").value) ** 2
+
+    def _mode_int_times(self, inputs, mode, JEZ):
+        """Calculate the default integration time of each star for a mode."""
+        OS = self.TL.OpticalSystem
+        int_times = OS.calc_intTime(
+            self.TL,
+            inputs["sInds"],
+            inputs["fZ"],
+            JEZ,
+            inputs["dMag"],
+            inputs["WA"],
+            mode,
         )
+        # Set nan values to the maximum integration time
+        int_times[np.isnan(int_times)] = OS.intCutoff
+        return int_times
 
-        # Standard local zodi flux
-        fZ = np.repeat(TL.ZodiacalLight.fZ0, len(sInds))
+    def _get_comp_per_intTime(self, key, int_times=None, star_names=None):
+        """Get the completeness per integration time.
 
-        # Standard working angle (get's luminosity corrected in EXOSIMS)
-        WA = TL.int_WA[sInds]
-        # Standard planet-star dMag to use (also luminosity corrected by EXOSIMS)
-        dMag = TL.int_dMag[sInds]
+        Args:
+            key (str):
+                The key to get the completeness for, either "blind_comp_det" or
+                "blind_comp_spec".
+            int_times (astropy.units.Quantity):
+                The integration times.
+            star_names (list):
+                The names of the stars of interest.
 
-        # Scale to the working angles
-        JEZ0 = TL.JEZ0[mode["hex"]][sInds]
-        # Calculate the planet-star distance based on the working angles
-        d = np.tan(WA) * TL.dist[sInds]
-
-        # Get nEZ values for stars with planets, default to 3 for stars without planets
-        star_nEZ = np.full(len(sInds), 3.0)  # default value of 3
-        # For each star with planets, get its nEZ value
-        for i, sInd in enumerate(sInds):
-            # Get indices of all planets for this star
-            planet_indices = np.where(SU.plan2star == sInd)[0]
-            # Use the first planet's nEZ value for the star
-            if len(planet_indices) > 0:
-                star_nEZ[i] = SU.nEZ[planet_indices[0]]
-
-        # Use these nEZ values to scale JEZ
-        JEZ = JEZ0 * star_nEZ * (1 / d.to("AU").value) ** 2
+        Returns:
+            np.ndarray:
+                The completeness values for each integration time and star.
+        """
+        is_spec = key == "blind_comp_spec"
+        if is_spec:
+            # Get the default spectroscopy mode
+            mode_syst_ind = self.spec_syst_ind
+            mode_inst_ind = self.spec_inst_ind
+            mode_syst = self.data["starlightSuppressionSystems"][mode_syst_ind]["name"]
+            mode_inst = self.data["scienceInstruments"][mode_inst_ind]["name"]
+        else:
+            # Get the default detection mode
+            mode_syst_ind = self.det_syst_ind
+            mode_inst_ind = self.det_inst_ind
+            mode_syst = self.data["starlightSuppressionSystems"][mode_syst_ind]["name"]
+            mode_inst = self.data["scienceInstruments"][mode_inst_ind]["name"]
+
+        TL = self.TL
+        inputs = self._completeness_inputs(star_names)
+        mode = self._find_observing_mode(mode_inst, mode_syst)
+        JEZ = self._mode_JEZ(inputs, mode)
+        exosims_name_order = inputs["names"]
+        index_map = inputs["index_map"]
 
         # Get the star indices for the given star names
         if int_times is None:
-            int_times = OS.calc_intTime(TL, sInds, fZ, JEZ, dMag, WA, mode)
-            # Set nan values to the maximum integration time
-            int_times[np.isnan(int_times)] = OS.intCutoff
+            int_times = self._mode_int_times(inputs, mode, JEZ)
         elif isinstance(int_times, pd.Series):
             int_times = int_times.values * u.d
             int_times = int_times[index_map]
@@ -514,7 +667,9 @@ class EXOSIMSInputFile(JSONFile):
             return None
 
         # Finally, calculate completeness
-        comp = TL.Completeness.comp_per_intTime(int_times, TL, sInds, fZ, JEZ, WA, mode)
+        comp = TL.Completeness.comp_per_intTime(
+            int_times, TL, inputs["sInds"], inputs["fZ"], JEZ, inputs["WA"], mode
+        )
         # Use the filtered comp_star_names instead of TL.Name[sInds]
         result = pd.DataFrame(
             {
@@ -526,6 +681,92 @@ class EXOSIMSInputFile(JSONFile):
 
         return result
 
+    def comp_per_intTime_grid(self, modes=None, int_times=None, star_names=None):
+        """Calculate blind completeness for many modes and integration times.
+
+        The mode-independent inputs (``fZ``, ``WA``, ``dMag`` and the per-star
+        nEZ) are computed once and shared by every mode, and each mode's full
+        grid of stars and integration times is evaluated in a single call to
+        EXOSIMS's ``comp_per_intTime``.
+
+        Args:
+            modes (list, optional):
+                (instName, systName) pairs of the observing modes to evaluate.
+                Defaults to every observing mode of the OpticalSystem.
+            int_times (astropy.units.Quantity, optional):
+                1D grid of integration times evaluated for every star. Defaults
+                to each mode's own integration time for each star.
+            star_names (np.ndarray, optional):
+                The names of the stars of interest. Defaults to every star in
+                the TargetList.
+
+        Returns:
+            pd.DataFrame:
+                One row per mode, star and integration time with the columns
+                "inst", "syst", "star_name", "integration_time" (in days) and
+                "completeness", or None if the OpticalSystem could not be
+                generated.
+        """
+        if not self.all_local_paths:
+            logger.warning(
+                "Completeness per integration time shouldn't be trusted without "
+                "having all the necessary files to generate the OpticalSystem object."
+                "Returning None."
+            )
+            return None
+        if modes is None:
+            modes = [
+                (m["instName"], m["systName"])
+                for m in self.TL.OpticalSystem.observingModes
+            ]
+
+        TL = self.TL
+        inputs = self._completeness_inputs(star_names)
+        n_stars = len(inputs["sInds"])
+        if int_times is not None:
+            # Flatten the (time, star) grid so each mode is a single call
+            int_times = np.atleast_1d(int_times)
+            n_times = len(int_times)
+            grid_times = np.repeat(int_times, n_stars)
+            grid = {
+                name: np.tile(inputs[name], n_times)
+                for name in ["sInds", "names", "fZ", "WA"]
+            }
+        tables = []
+        for inst, syst in modes:
+            mode = self._find_observing_mode(inst, syst)
+            JEZ = self._mode_JEZ(inputs, mode)
+            if int_times is None:
+                times = self._mode_int_times(inputs, mode, JEZ)
+                comp = TL.Completeness.comp_per_intTime(
+                    times, TL, inputs["sInds"], inputs["fZ"], JEZ, inputs["WA"], mode
+                )
+                names = inputs["names"]
+            else:
+                times = grid_times
+                comp = TL.Completeness.comp_per_intTime(
+                    times,
+                    TL,
+                    grid["sInds"],
+                    grid["fZ"],
+                    np.tile(JEZ, n_times),
+                    grid["WA"],
+                    mode,
+                )
+                names = grid["names"]
+            tables.append(
+                pd.DataFrame(
+                    {
+                        "inst": inst,
+                        "syst": syst,
+                        "star_name": names,
+                        "integration_time": times.to_value(u.d),
+                        "completeness": comp,
+                    }
+                )
+            )
+        return pd.concat(tables, ignore_index=True)
+
     def _get_core_thruput(self, *args, **kwargs):
         """Get the core thruput data."""
         # Get both wavelength and core throughput
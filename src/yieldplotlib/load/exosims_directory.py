@@ -1,48 +1,58 @@
 """Loader for EXOSIMS data, organizing files into a directory-based structure."""
 
+from functools import partial
 from pathlib import Path
 
-import numpy as np
-
 from yieldplotlib.core import DirectoryNode, Node
+from yieldplotlib.core.compression import file_suffix
+from yieldplotlib.core.directory_node import values_frame
+from yieldplotlib.core.ensemble import (
+    DEFAULT_COMPRESSION,
+    REDUCTIONS,
+    reduce_members,
+    split_ensemble_key,
+)
 from yieldplotlib.load.exosims import DRMFile, EXOSIMSCSVFile, EXOSIMSInputFile, SPCFile
+from yieldplotlib.load.exosims.exosims_drm import DRM_STATISTICS, read_drm_columns
 from yieldplotlib.logger import logger
 
 
 class EXOSIMSDirectory(DirectoryNode):
     """Loader for EXOSIMS data, organizing files into a directory-based structure."""
 
-    def __init__(self, root_directory: Path):
-        """Initialize the EXOSIMSLoader by scanning the directory structure."""
-        super().__init__(root_directory)
+    def __init__(self, root_directory: Path, **kwargs):
+        """Initialize the EXOSIMSLoader by scanning the directory structure.
+
+        Args:
+            root_directory (Path):
+                The EXOSIMS run directory.
+            **kwargs:
+                Loading options passed to `DirectoryNode` (e.g. `max_workers`).
+        """
+        super().__init__(root_directory, **kwargs)
         # After loading all data check that the root
         if self.__class__.__name__ == "EXOSIMSDirectory":
             # If all paths are local, we can don't need to filter the target list
             if not self.input.all_local_paths:
-                # Match the loaded target list object's stars to the stars in the
-                # csv files
-                csv_stars = self.get("star_name")
-                has_TL = hasattr(self.input, "TL")
-                if has_TL:
-                    # Filter TL to only include stars in the csv files
-                    sInds = np.where(np.isin(self.input.TL.Name, csv_stars))[0]
-                    self.input.TL.revise_lists(sInds)
+                # Match the target list object's stars to the stars in the csv
+                # files, this is applied once the target list is built
+                self.input.restrict_targets(self.get("star_name"))
 
     def _create_directory_node(self, path: Path) -> Node:
         """Override directory node creation logic for EXOSIMS-specific directories."""
         if path.name == "drm":
-            return DRMDirectory(path)
+            return DRMDirectory(path, **self._directory_options())
         elif path.name == "spc":
-            return SPCDirectory(path)
+            return SPCDirectory(path, **self._directory_options())
         elif path.name == "csv":
-            return EXOSIMSCSVDirectory(path)
+            return EXOSIMSCSVDirectory(path, **self._directory_options())
         else:
             return self.create_base_directory(path)
 
     def _create_file_node(self, path: Path) -> Node:
         """Override file node creation logic for EXOSIMS-specific files."""
-        if path.suffix == ".json":
-            return EXOSIMSInputFile(path)
+        if file_suffix(path) == ".json":
+            return EXOSIMSInputFile(path, **self._file_options())
         else:
             return self.create_base_file(path)
 
@@ -52,41 +62,147 @@ class EXOSIMSCSVDirectory(EXOSIMSDirectory):
 
     def _create_file_node(self, path: Path):
         """Override file node creation logic for CSV-specific files."""
-        if path.suffix == ".csv":
-            return EXOSIMSCSVFile(path)
+        suffix = file_suffix(path)
+        if suffix == ".csv":
+            return EXOSIMSCSVFile(path, **self._file_options())
         else:
             logger.warning(
-                f"Unexpected file type {path.suffix} for CSV directory. "
-                f"File {path.name}."
+                f"Unexpected file type {suffix} for CSV directory. File {path.name}."
             )
             return self.create_base_file(path)
 
 
 class DRMDirectory(EXOSIMSDirectory):
-    """Loader for DRM data, organizing files into a directory-based structure."""
+    """Loader for DRM data, organizing files into a directory-based structure.
+
+    Every DRM is one member of the run's ensemble. Ensemble statistics are
+    available as keys "<statistic>.<reduction>", e.g. "n_unique_detections.mean",
+    "det_SNR.q95" or "star_visits.std", for the statistics in `DRM_STATISTICS`
+    and the reductions in `core.ensemble`. They are computed by streaming the
+    DRMs through online accumulators, so only one DRM per worker is held in
+    memory. Histograms ("<statistic>.hist") require a `bins` argument.
+    """
 
     def _create_file_node(self, path: Path):
         """Override file node creation logic for DRM-specific files."""
-        if path.suffix == ".pkl":
-            return DRMFile(path)
+        suffix = file_suffix(path)
+        if suffix == ".pkl":
+            return DRMFile(path, **self._file_options())
         else:
             logger.warning(
-                f"Unexpected file type {path.suffix} for DRM directory. "
-                f"File {path.name}."
+                f"Unexpected file type {suffix} for DRM directory. File {path.name}."
             )
             return self.create_base_file(path)
 
+    def reduce(self, statistics=None, bins=None, compression=DEFAULT_COMPRESSION):
+        """Reduce statistics over every DRM of the directory in one pass.
+
+        Args:
+            statistics (list, optional):
+                Names of statistics in `DRM_STATISTICS`, defaults to all.
+            bins (dict, optional):
+                Histogram bin edges, by statistic name.
+            compression (float):
+                Compression of the quantile sketches.
+
+        Returns:
+            dict:
+                Maps the statistic names to their `StatisticAccumulator`.
+        """
+        names = list(DRM_STATISTICS) if statistics is None else list(statistics)
+        bins = {} if bins is None else bins
+        edges = {name: tuple(bins[name]) for name in names if name in bins}
+        results = {}
+        cache_keys = {}
+        for name in names:
+            # Accumulators are cached with the directory's other values
+            cache_key = self._cache.make_key(
+                f"{name}.*", {"bins": edges.get(name), "compression": compression}
+            )
+            hit, result = self._cache.lookup(cache_key)
+            if hit:
+                results[name] = result
+            else:
+                cache_keys[name] = cache_key
+        if not cache_keys:
+            return results
+
+        statistics = {name: DRM_STATISTICS[name] for name in cache_keys}
+        columns = {column for stat in statistics.values() for column in stat.columns}
+        members = [
+            child.file_path for child in self._children if isinstance(child, DRMFile)
+        ]
+        reduced = reduce_members(
+            members,
+            partial(read_drm_columns, columns=sorted(columns)),
+            statistics,
+            edges=edges,
+            compression=compression,
+            max_workers=self.max_workers,
+            executor=self.executor,
+            progress=self.progress,
+        )
+        for name, cache_key in cache_keys.items():
+            results[name] = reduced[name]
+            if cache_key is not None:
+                self._cache.put(cache_key, reduced[name])
+        return results
+
+    def has_key(self, key: str) -> bool:
+        """Whether the key is a DRM column or an ensemble statistic."""
+        if split_ensemble_key(key, DRM_STATISTICS) is not None:
+            return True
+        return super().has_key(key)
+
+    def keys(self):
+        """Return the DRM columns and the ensemble statistics' reductions."""
+        keys = super().keys()
+        if keys is None:
+            return None
+        return keys | {
+            f"{name}.{reduction}" for name in DRM_STATISTICS for reduction in REDUCTIONS
+        }
+
+    def get(self, key: str, **kwargs):
+        """Return a DRM column or an ensemble statistic."""
+        split = split_ensemble_key(key, DRM_STATISTICS)
+        if split is None:
+            return super().get(key, **kwargs)
+        name, reduction = split
+        bins = kwargs.get("bins")
+        result = self.reduce([name], bins=None if bins is None else {name: bins})
+        return result[name].value(reduction)
+
+    def get_many(self, keys, as_frame: bool = False, **kwargs):
+        """Resolve several keys, reducing all ensemble statistics in one pass."""
+        splits = {key: split_ensemble_key(key, DRM_STATISTICS) for key in keys}
+        results = super().get_many(
+            [key for key, split in splits.items() if split is None], **kwargs
+        )
+        statistics = {split[0] for split in splits.values() if split is not None}
+        if statistics:
+            bins = kwargs.get("bins")
+            reduced = self.reduce(
+                sorted(statistics),
+                bins=None if bins is None else dict.fromkeys(statistics, bins),
+            )
+            for key, split in splits.items():
+                if split is not None:
+                    results[key] = reduced[split[0]].value(split[1])
+        results = {key: results[key] for key in splits}
+        return values_frame(results) if as_frame else results
+
 
 class SPCDirectory(EXOSIMSDirectory):
     """Loader for SPC data, organizing files into a directory-based structure."""
 
     def _create_file_node(self, path: Path):
         """Override file node creation logic for SPC-specific files."""
-        if path.suffix == ".spc":
-            return SPCFile(path)
+        suffix = file_suffix(path)
+        if suffix == ".spc":
+            return SPCFile(path, **self._file_options())
         else:
             logger.warning(
-                f"Unexpected file type {path.suffix} for SPC directory. "
-                f"File {path.name}."
+                f"Unexpected file type {suffix} for SPC directory. File {path.name}."
             )
             return self.create_base_file(path)
@@ -2,19 +2,43 @@
 
 from pathlib import Path
 
-import astropy.io.fits as pyfits
 from yippy.coronagraph import Coronagraph
 
 from yieldplotlib.core import DirectoryNode, Node
-from yieldplotlib.core.file_nodes import FitsFile
+from yieldplotlib.core.directory_node import values_frame
+from yieldplotlib.core.file_nodes import FitsFile, read_fits_data
+from yieldplotlib.core.fits_handles import FITS_HANDLES
+
+# Fits files of a YIP that back the "<name>.data" keys
+YIP_DATA_FILES = {
+    "offax.data": "offax_psf.fits",
+    "offax_offset_list.data": "offax_psf_offset_list.fits",
+    "stellar_intens.data": "stellar_intens.fits",
+    "stellar_intens_diam_list.data": "stellar_intens_diam_list.fits",
+    "sky_trans.data": "sky_trans.fits",
+}
 
 
 class YIPDirectory(DirectoryNode):
-    """Loader for YIPs, organizing files into a directory-based structure."""
+    """Loader for YIPs, organizing files into a directory-based structure.
+
+    The fits files are kept open between lookups, use the directory as a
+    context manager (or call `close`) to release them::
+
+        with YIPDirectory(path) as yip:
+            psfs = yip.get("offax.data", frames=slice(0, 10))
+    """
 
-    def __init__(self, root_directory: Path):
-        """Initialize the loader by scanning the directory structure."""
-        super().__init__(root_directory)
+    def __init__(self, root_directory: Path, **kwargs):
+        """Initialize the loader by scanning the directory structure.
+
+        Args:
+            root_directory (Path):
+                The YIP directory.
+            **kwargs:
+                Loading options passed to `DirectoryNode` (e.g. `max_workers`).
+        """
+        super().__init__(root_directory, **kwargs)
         self.coronagraph = Coronagraph(root_directory)
 
     def _create_directory_node(self, path: Path) -> Node:
@@ -24,28 +48,45 @@ class YIPDirectory(DirectoryNode):
     def _create_file_node(self, path: Path) -> Node:
         """Override file node creation logic for YIP-specific files."""
         if path.suffix == ".fits":
-            return FitsFile(path)
+            return FitsFile(path, **self._file_options())
         else:
             return self.create_base_file(path)
 
-    def get(self, key: str):
-        """Search for a key (e.g., "data" or "D") in the tree structure."""
+    def close(self):
+        """Release the handles of every fits file of the YIP."""
+        super().close()
+        for file_name in YIP_DATA_FILES.values():
+            FITS_HANDLES.release(Path(self.coronagraph.yip_path, file_name))
+
+    def keys(self):
+        """YIP keys are resolved by the coronagraph, so they are not listed."""
+        return None
+
+    def get(self, key: str, frames=None, **kwargs):
+        """Search for a key (e.g., "data" or "D") in the tree structure.
+
+        Args:
+            key (str):
+                A "<name>.data" key for the data of one of the YIP's fits files,
+                otherwise an attribute of the coronagraph.
+            frames (int | slice | np.ndarray, optional):
+                Index along the first axis of the fits data, e.g.
+                `slice(k, m)` for frames k..m-1 of the off-axis PSF cube. The
+                data is memory-mapped, so only the requested frames are read.
+            **kwargs:
+                Unused, accepted for compatibility with other nodes, whose
+                options parent directories forward (e.g. `bins`).
+        """
         if key.endswith(".data"):
-            if key == "offax.data":
-                return pyfits.getdata(Path(self.coronagraph.yip_path, "offax_psf.fits"))
-            elif key == "offax_offset_list.data":
-                return pyfits.getdata(
-                    Path(self.coronagraph.yip_path, "offax_psf_offset_list.fits")
-                )
-            elif key == "stellar_intens.data":
-                return pyfits.getdata(
-                    Path(self.coronagraph.yip_path, "stellar_intens.fits")
+            if key in YIP_DATA_FILES:
+                return read_fits_data(
+                    Path(self.coronagraph.yip_path, YIP_DATA_FILES[key]),
+                    frames=frames,
                 )
-            elif key == "stellar_intens_diam_list.data":
-                return pyfits.getdata(
-                    Path(self.coronagraph.yip_path, "stellar_intens_diam_list.fits")
-                )
-            elif key == "sky_trans.data":
-                return pyfits.getdata(Path(self.coronagraph.yip_path, "sky_trans.fits"))
         else:
             return getattr(self.coronagraph, key)
+
+    def get_many(self, keys, as_frame: bool = False, frames=None, **kwargs):
+        """Resolve several keys, see `get`. Other keyword arguments are ignored."""
+        values = {key: self.get(key, frames=frames) for key in keys}
+        return values_frame(values) if as_frame else values
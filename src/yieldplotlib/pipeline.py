@@ -11,8 +11,8 @@ from mpl_toolkits.axes_grid1 import make_axes_locatable
 from PIL import Image
 
 import yieldplotlib as ypl
-from yieldplotlib.load import AYODirectory, EXOSIMSDirectory
-from yieldplotlib.plots.yield_hist import plot_hist
+from yieldplotlib.load import AYODirectory, BundleDirectory, EXOSIMSDirectory
+from yieldplotlib.plots.yield_hist import plot_hist, population_keys
 
 # Set pipeline plot specific params
 params = {
@@ -26,9 +26,51 @@ params = {
 }
 plt.rcParams.update(params)
 
-
-def ypl_pipeline(runs):
-    """Runs the yieldplotlib pipeline to generate a page of summary plots."""
+# Temperature and planet bins of the summary page's yield bar chart
+SUMMARY_TEMPS = ["hot", "warm", "cold"]
+SUMMARY_PLANET_BINS = ["Earth", "Rocky", "Super Earth"]
+
+# Every key read by `summary_figure`, e.g. to export runs to bundles
+SUMMARY_KEYS = [
+    "star_dist",
+    "star_L",
+    "angdiam",
+    "MV",
+    "exp_time_det",
+    "exp_time_char",
+    "star_comp_det",
+    *population_keys(SUMMARY_TEMPS, SUMMARY_PLANET_BINS),
+]
+
+
+def _run_code(run):
+    """Return the code ("EXOSIMS" or "AYO") that produced a run, if known.
+
+    Run bundles (e.g. loaded by `ypl_run --jobs`) report the code of the run
+    they were exported from.
+    """
+    source = run.source if isinstance(run, BundleDirectory) else None
+    if isinstance(run, EXOSIMSDirectory) or source == EXOSIMSDirectory.__name__:
+        return "EXOSIMS"
+    if isinstance(run, AYODirectory) or source == AYODirectory.__name__:
+        return "AYO"
+    return None
+
+
+def summary_figure(runs, title=None):
+    """Create the page of summary plots of runs.
+
+    Args:
+        runs (list):
+            The runs to summarize, e.g. `AYODirectory` and `EXOSIMSDirectory`
+            nodes.
+        title (str, optional):
+            Title printed at the top of the page, e.g. the name of the runs.
+
+    Returns:
+        matplotlib.figure.Figure:
+            The summary page.
+    """
     ax_kwargs = {}
 
     fig, axes = plt.subplot_mosaic("ABC;DEE;FGG", figsize=(8.5, 11))
@@ -41,12 +83,14 @@ def ypl_pipeline(runs):
     newax = fig.add_axes([0.05, 0.9, 0.05, 0.05], anchor="NE", zorder=1)
     newax.axis("off")
     newax.imshow(ypl_logo)
+    if title is not None:
+        fig.text(0.5, 0.96, title, ha="center", fontdict={"fontsize": 10})
 
     # Plot summary yield text for a reasonable number of runs.
     if len(runs) < 5:
         y_locs = np.linspace(0.92, 0.94, len(runs))
         for i, run in enumerate(runs):
-            if isinstance(run, EXOSIMSDirectory):
+            if _run_code(run) == "EXOSIMS":
                 earth_yield = run.get("yield_earth")
                 plt.figtext(
                     0.11,
@@ -54,7 +98,7 @@ def ypl_pipeline(runs):
                     f"EXOSIMS ExoEarth yield: {earth_yield[0]:.2f}",
                     fontdict={"fontsize": 8},
                 )
-            elif isinstance(run, AYODirectory):
+            elif _run_code(run) == "AYO":
                 earth_yield = run.get("yield_earth")
                 plt.figtext(
                     0.11,
@@ -110,13 +154,28 @@ def ypl_pipeline(runs):
     cbar.ax.tick_params(labelsize=6, width=1.0)
 
     # Plot planet yield bar chart.
-    temps = ["hot", "warm", "cold"]
-    planet_bins = ["Earth", "Rocky", "Super Earth"]
-    run_labels = [
-        "EXOSIMS" if isinstance(run, EXOSIMSDirectory) else "AYO" for run in runs
-    ]
-    plot_hist(temps, planet_bins, runs, run_labels, ax=axes["G"])
+    run_labels = ["EXOSIMS" if _run_code(run) == "EXOSIMS" else "AYO" for run in runs]
+    if len(set(run_labels)) < len(run_labels):
+        # The bars are grouped by label, so runs of the same code are numbered
+        run_labels = [f"{label} {i + 1}" for i, label in enumerate(run_labels)]
+    plot_hist(SUMMARY_TEMPS, SUMMARY_PLANET_BINS, runs, run_labels, ax=axes["G"])
 
     plt.tight_layout(rect=[0, 0, 1, 0.9])
-    plt.savefig("./ypl_summary.pdf")
-    plt.show()
+    return fig
+
+
+def ypl_pipeline(runs, output="./ypl_summary.pdf", show: bool = True):
+    """Runs the yieldplotlib pipeline to generate a page of summary plots.
+
+    Args:
+        runs (list):
+            The runs to summarize.
+        output (str | Path):
+            File the summary page is saved to.
+        show (bool):
+            If True, show the page once it is saved.
+    """
+    fig = summary_figure(runs)
+    fig.savefig(output)
+    if show:
+        plt.show()
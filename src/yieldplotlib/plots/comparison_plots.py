@@ -8,11 +8,21 @@ import astropy.units as u
 import matplotlib.pyplot as plt
 import numpy as np
 
+from yieldplotlib.core import RunCollection, StackedValues
+
 # Default markers and linestyles for plotting
 DEFAULT_MARKERS = ["o", "s", "^", "D", "v", "<", ">", "p", "*", "h", "H", "+", "x"]
 DEFAULT_LINESTYLES = ["-", "--", "-.", ":"]
 
 
+def _run_label(directory) -> str:
+    """Return the default label of a run, the name of its directory class.
+
+    Run bundles are labelled with the class of the run they were exported from.
+    """
+    return getattr(directory, "source", directory.__class__.__name__)
+
+
 def _get_plot_method(ax, plot_type):
     """Get the appropriate plot method for the given plot type.
 
@@ -53,32 +63,14 @@ def _calculate_consistent_bins(directories, x, bins_param=None):
         tuple:
             (bins, reference_unit) - bin edges to use and their unit (None if unitless)
     """
-    all_data = []
-    reference_unit = None  # Track the first unit we encounter
-
-    # Collect all data from all directories
-    for directory in directories:
-        data = directory.get(x)
-        if data is not None:
-            # Handle Astropy Quantity objects
-            if hasattr(data, "unit"):
-                # Initialize reference unit with the first unit we find
-                if reference_unit is None:
-                    reference_unit = data.unit
-
-                # If units don't match, convert to the reference unit
-                if data.unit != reference_unit:
-                    data = data.to(reference_unit)
-
-                # Extract values after unit conversion
-                data_values = data.value
-                all_data.extend(np.asarray(data_values).flatten())
-            else:
-                # For data without units
-                all_data.extend(np.asarray(data).flatten())
-
-    if not all_data:
+    # Collect all data from all directories, converted to the first unit found
+    if not isinstance(directories, RunCollection):
+        directories = RunCollection(directories)
+    stacked = directories.get(x)
+    if not isinstance(stacked, StackedValues) or len(stacked.values) == 0:
         return None, None
+    reference_unit = stacked.unit
+    all_data = stacked.values.value if reference_unit is not None else stacked.values
 
     # Calculate bins based on all data combined
     if bins_param is not None:
@@ -146,7 +138,7 @@ def _handle_histogram(plot_method, directory, x, plot_kwargs, reference_unit=Non
     if "label" in plot_kwargs:
         patches[0].set_label(plot_kwargs["label"])
     else:
-        patches[0].set_label(directory.__class__.__name__)
+        patches[0].set_label(_run_label(directory))
     return patches
 
 
@@ -178,7 +170,7 @@ def _create_subplot_titles(directories, specs=None):
             List of titles for each subplot.
     """
     if specs is None:
-        return [f"{d.__class__.__name__}" for d in directories]
+        return [_run_label(d) for d in directories]
 
     titles = []
     for _d in directories:
@@ -387,8 +379,8 @@ def compare(
     Args:
         ax (matplotlib.axes.Axes):
             The axes to plot on.
-        directories (list):
-            List of DirectoryNode objects to plot.
+        directories (list | RunCollection):
+            List of DirectoryNode objects to plot, or a `RunCollection`.
         x (str):
             Key for x-axis data.
         y (str):
@@ -397,8 +389,8 @@ def compare(
             Type of plot to create. Options are 'scatter', 'plot', or 'hist'.
             Default is 'scatter'.
         labels (list, optional):
-            List of labels for each directory node. If None, uses the directory node
-            class names.
+            List of labels for each directory node. If None, uses the run names of
+            a `RunCollection`, or the directory node class names.
         colors (list, optional):
             List of colors for each directory. If None, uses default color cycle.
         markers (list, optional):
@@ -416,14 +408,16 @@ def compare(
             The axes with the plot.
     """
     # Generate labels if not provided
-    if labels is None:
-        labels = [d.__class__.__name__ for d in directories]
+    if labels is None and isinstance(directories, RunCollection):
+        labels = list(directories.names)
+    elif labels is None:
+        labels = [_run_label(d) for d in directories]
     elif not isinstance(labels, list):
         labels = [labels]
 
     # Ensure we have enough labels
     if len(labels) < len(directories):
-        labels.extend([d.__class__.__name__ for d in directories[len(labels) :]])
+        labels.extend([_run_label(d) for d in directories[len(labels) :]])
 
     # Set up markers if needed for scatter
     if markers is None and plot_type == "scatter":
@@ -486,8 +480,8 @@ def multi(
     """Create a multi-panel figure with one subplot per directory.
 
     Args:
-        directories (list):
-            List of DirectoryNode objects to plot.
+        directories (list | RunCollection):
+            List of DirectoryNode objects to plot, or a `RunCollection`.
         x (str):
             Key for x-axis data.
         y (str, optional):
@@ -912,7 +906,7 @@ def xy_grid(
                 plot_kwargs = local_kwargs.copy()
                 # Use the directory class name as default label if not provided
                 if "label" not in plot_kwargs:
-                    plot_kwargs["label"] = directory.__class__.__name__
+                    plot_kwargs["label"] = _run_label(directory)
 
                 # Add marker or linestyle depending on plot type
                 if plot_type == "scatter":
@@ -6,6 +6,32 @@ import pandas as pd
 from matplotlib.patches import Patch
 
 
+def population_keys(temps, planet_bins) -> list:
+    """Return the yield keys of the planet populations plotted by `plot_hist`.
+
+    Args:
+        temps (list):
+            List of temperature bins, e.g., ["hot", "warm", "cold"].
+        planet_bins (list):
+            List of planet types, e.g., ["Earth", "Rocky", "Super Earth"].
+
+    Returns:
+        list:
+            The keys, e.g. "yield_earth" and "yield_hot_rocky".
+    """
+    planet_populations = []
+    for temp in temps:
+        for planet_bin in planet_bins:
+            if planet_bin == "Earth":
+                if "yield_earth" not in planet_populations:
+                    planet_populations.append("yield_earth")
+            else:
+                planet_populations.append(
+                    f"yield_{temp}_{planet_bin.lower().replace(' ', '_')}"
+                )
+    return planet_populations
+
+
 def plot_hist(
     temps, planet_bins, runs, run_labels, ax=None, ax_kwargs=None, use_cyberpunk=False
 ):
@@ -37,18 +63,9 @@ def plot_hist(
         import mplcyberpunk  # noqa: F401
 
         plt.style.use("cyberpunk")
-    # Create a list of keys for the planet populations
-    planet_populations = []
-    for temp in temps:
-        for planet_bin in planet_bins:
-            if planet_bin == "Earth":
-                if "yield_earth" not in planet_populations:
-                    planet_populations.append("yield_earth")
-            else:
-                # for run, label in zip(runs, run_labels):
-                planet_populations.append(
-                    f"yield_{temp}_{planet_bin.lower().replace(' ', '_')}"
-                )
+    planet_populations = population_keys(temps, planet_bins)
+    # Fetch every population of a run in one traversal of its tree
+    run_values = [run.get_many(planet_populations) for run in runs]
     data = []
     for key in planet_populations:
         parts = key.split("_")
@@ -67,9 +84,9 @@ def plot_hist(
             temperature = "unknown"
             planet_type = "Unknown"
 
-        for run, label in zip(runs, run_labels, strict=False):
+        for values, label in zip(run_values, run_labels, strict=False):
             # Retrieve data
-            run_data = run.get(key)
+            run_data = values[key]
             try:
                 value = float(run_data)
             except (ValueError, TypeError):
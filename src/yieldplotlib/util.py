@@ -145,6 +145,11 @@ def find_unit_for_module_key(module_key, module_name, key_map):
         str or None:
             The unit string if found, None otherwise.
     """
+    if key_map is KEY_MAP:
+        # Constant-time lookup in the index built at import
+        entry = KEY_MAP_MODULE_INDEX.get((module_name, module_key))
+        return None if entry is None else entry[1]
+
     for _yieldplotlib_key, module_data in key_map.items():
         # Check if this entry has data for the specified module
         if module_name in module_data:
@@ -191,7 +196,109 @@ def get_unit(key, module_name, find_unit_func=None):
         unit = find_unit_for_module_key(key, module_name, KEY_MAP)
 
     if unit:
-        astropy_unit = u.Unit(unit)
-        return astropy_unit
+        return parse_unit(unit)
 
     return None
+
+
+@functools.cache
+def parse_unit(unit):
+    """Parse a unit string into an astropy Unit, caching the result.
+
+    Args:
+        unit (str):
+            The unit string, e.g. "mas" or "count pix^-1 s^-1".
+
+    Returns:
+        astropy.units.Unit:
+            The parsed unit.
+    """
+    return u.Unit(unit)
+
+
+def build_key_map_indices(key_map):
+    """Build the inverted indices of a key map.
+
+    Args:
+        key_map (dict):
+            The key mapping dictionary to index.
+
+    Returns:
+        tuple:
+            file_index (dict):
+                Maps each module name to a dict from file name pattern to the
+                {yieldplotlib key: (module key, unit, transform)} entries that
+                live in matching files.
+            module_index (dict):
+                Maps (module name, module key) to the (yieldplotlib key, unit,
+                transform) of the first entry using that module key.
+    """
+    file_index = {}
+    module_index = {}
+    for ypl_key, mappings in key_map.items():
+        for module_name, module_info in mappings.items():
+            if not isinstance(module_info, dict):
+                # Skip the comment entries
+                continue
+            entry = (
+                module_info["name"],
+                module_info.get("unit", ""),
+                module_info["transform"],
+            )
+            module_files = file_index.setdefault(module_name, {})
+            module_files.setdefault(module_info["file"], {})[ypl_key] = entry
+            module_index.setdefault(
+                (module_name, module_info["name"]), (ypl_key, *entry[1:])
+            )
+    return file_index, module_index
+
+
+KEY_MAP_FILE_INDEX, KEY_MAP_MODULE_INDEX = build_key_map_indices(KEY_MAP)
+
+
+def get_file_key_map(module_name, file_name):
+    """Get the keys and transforms the key map assigns to a file.
+
+    Args:
+        module_name (str):
+            The name of the file node class (e.g. 'AYOCSVFile').
+        file_name (str):
+            The name of the file, matched against the end of each key map
+            file pattern.
+
+    Returns:
+        tuple:
+            file_key_map (dict):
+                Maps yieldplotlib keys to the module-specific keys.
+            transforms (dict):
+                Maps yieldplotlib keys to their transforms.
+    """
+    file_key_map = {}
+    transforms = {}
+    for pattern, entries in KEY_MAP_FILE_INDEX.get(module_name, {}).items():
+        if file_name.endswith(pattern):
+            for ypl_key, (name, _unit, transform) in entries.items():
+                file_key_map[ypl_key] = name
+                transforms[ypl_key] = transform
+    return file_key_map, transforms
+
+
+def get_file_unit_columns(module_name, file_name):
+    """Get the module-specific keys of a file that the key map gives a unit.
+
+    Args:
+        module_name (str):
+            The name of the file node class (e.g. 'AYOCSVFile').
+        file_name (str):
+            The name of the file, matched like in `get_file_key_map`.
+
+    Returns:
+        set:
+            The module-specific keys (e.g. CSV column names) with a unit, which
+            hold numeric values.
+    """
+    columns = set()
+    for pattern, entries in KEY_MAP_FILE_INDEX.get(module_name, {}).items():
+        if file_name.endswith(pattern):
+            columns.update(name for name, unit, _ in entries.values() if unit)
+    return columns
@@ -24,54 +24,308 @@
  @@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@@
 
 Usage:
-  ypl_run PATH
+  ypl_run PATH [--jobs N] [--output OUT]
+  ypl_run PATH --batch [--jobs N] [--output OUT]
 
 Options:
-  -h, --help  Show this help message and exit.
+  -h, --help        Show this help message and exit.
+  -j, --jobs N      Number of worker processes loading the runs, or rendering
+                    the pages in batch mode [default: 1].
+  -b, --batch       Render one summary page per run or run group without a
+                    display, see `render_batch`.
+  -o, --output OUT  File the summary is saved to. In batch mode, a ".pdf" file
+                    gets one page per run group, anything else is a directory
+                    of PNG pages [default: ypl_summary.pdf].
 """
 
-import glob
 import os
+import tempfile
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
 
+import matplotlib
+import matplotlib.pyplot as plt
 from docopt import docopt
+from matplotlib.backends.backend_pdf import PdfPages
+from tqdm import tqdm
 
+from yieldplotlib.core.compression import file_suffix
+from yieldplotlib.core.file_nodes import PYARROW_AVAILABLE
 from yieldplotlib.load.ayo_directory import AYODirectory
+from yieldplotlib.load.bundle_directory import BundleDirectory
 from yieldplotlib.load.exosims_directory import EXOSIMSDirectory
-from yieldplotlib.pipeline import ypl_pipeline
+from yieldplotlib.logger import logger
+from yieldplotlib.pipeline import SUMMARY_KEYS, summary_figure, ypl_pipeline
 
 
 def main():
     """Runs the command line interface."""
-    runs = []
     arguments = docopt(__doc__, version="0.1")
-    run_paths = arguments["PATH"]
+    jobs = int(arguments["--jobs"])
+    output = Path(arguments["--output"])
+    if arguments["--batch"]:
+        failed = render_batch(find_run_groups(arguments["PATH"]), output, jobs=jobs)
+        if failed:
+            raise SystemExit(f"Failed to render {len(failed)} pages: {failed}")
+        return
+    run_dirs = find_runs(arguments["PATH"])
 
-    if is_superdir(run_paths):
-        run_dirs = glob.glob(f"{run_paths}/*")
+    # Bundles written by the workers are memory-mapped until the pipeline ends
+    with tempfile.TemporaryDirectory(prefix="ypl_run_") as bundle_dir:
+        runs = load_runs(run_dirs, jobs=jobs, bundle_dir=bundle_dir)
+        ypl_pipeline(runs, output=output)
+
+
+def _visible_entries(path):
+    """Return the entries of a directory, without hidden files, in one scan."""
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if not entry.name.startswith(".")]
+
+
+def _has_ayo_input(entries) -> bool:
+    """True if the directory entries include an AYO input file."""
+    return any(
+        entry.is_file() and file_suffix(Path(entry.name)) == ".ayo" for entry in entries
+    )
+
+
+def find_runs(path) -> list:
+    """Find the run directories of a path and the code that produced them.
+
+    Each directory is scanned once with `os.scandir`, which returns the entry
+    types along with the names on most filesystems.
+
+    Args:
+        path (str | Path):
+            A run directory, or a superdirectory that only contains run
+            directories.
+
+    Returns:
+        list:
+            (run directory, is an AYO run) tuples, sorted by path.
+    """
+    entries = _visible_entries(path)
+    if all(entry.is_dir() for entry in entries):
+        run_dirs = sorted(Path(entry.path) for entry in entries)
+        return [(run_dir, is_ayo(run_dir)) for run_dir in run_dirs]
+    return [(Path(path), _has_ayo_input(entries))]
+
+
+def find_run_groups(path) -> list:
+    """Find the run groups of a path, each summarized on one batch page.
+
+    Every subdirectory of a superdirectory is a group: a run directory is a
+    group of one run, and a directory of run directories (e.g. the AYO and
+    EXOSIMS runs of one architecture) is a group of those runs.
+
+    Args:
+        path (str | Path):
+            A run directory, or a directory of runs and run groups.
+
+    Returns:
+        list:
+            (group name, runs) tuples sorted by name, where the runs are
+            (run directory, is an AYO run) tuples as returned by `find_runs`.
+    """
+    entries = _visible_entries(path)
+    if not all(entry.is_dir() for entry in entries):
+        return [(Path(path).name, [(Path(path), _has_ayo_input(entries))])]
+    groups = [(entry.name, find_runs(entry.path)) for entry in entries]
+    return sorted(groups, key=lambda group: group[0])
+
+
+def load_run(run_dir: Path, ayo: bool, **kwargs):
+    """Load an AYO or EXOSIMS run directory.
+
+    Args:
+        run_dir (Path):
+            The run directory.
+        ayo (bool):
+            If True the run is loaded as an AYO run, otherwise as an EXOSIMS run.
+        **kwargs:
+            Loading options passed to the directory (e.g. `progress`).
+    """
+    if ayo:
+        return AYODirectory(Path(run_dir), **kwargs)
+    return EXOSIMSDirectory(Path(run_dir), **kwargs)
+
+
+def _bundle_run(run_dir: Path, ayo: bool, bundle_path: Path) -> Path:
+    """Load a run in a worker process and write its summary keys to a bundle."""
+    run = load_run(run_dir, ayo, progress=False)
+    return run.export_bundle(bundle_path, keys=SUMMARY_KEYS)
+
+
+def load_runs(runs, jobs: int = 1, bundle_dir=None) -> list:
+    """Load runs, in parallel worker processes if `jobs` is more than 1.
+
+    Workers send each run back to this process as a run bundle (see
+    `core.bundle`), which holds the values of the keys of the summary page
+    (`pipeline.SUMMARY_KEYS`) in a compact columnar file. It is cheaper to
+    transfer than the run's nodes, and keeps custom units such as λ/D intact.
+
+    Args:
+        runs (list):
+            (run directory, is an AYO run) tuples, see `find_runs`.
+        jobs (int):
+            Number of worker processes. If 1, the runs are loaded serially as
+            `AYODirectory` and `EXOSIMSDirectory` nodes.
+        bundle_dir (str | Path, optional):
+            Directory the bundles are written to, which must be kept until
+            the runs are no longer used. Required if `jobs` is more than 1.
+
+    Returns:
+        list:
+            The loaded runs, in the order of `runs`. Runs loaded by workers
+            are `BundleDirectory` nodes.
+    """
+    if jobs > 1 and not PYARROW_AVAILABLE:
+        logger.warning("Loading runs in parallel requires pyarrow, loading serially")
+        jobs = 1
+    if jobs <= 1 or len(runs) <= 1:
+        return [load_run(run_dir, ayo) for run_dir, ayo in runs]
+    if bundle_dir is None:
+        raise ValueError("A bundle directory is required to load runs in parallel")
+
+    # One subdirectory per run so the bundle is named after its run
+    bundle_paths = [
+        Path(bundle_dir, str(i), f"{Path(run_dir).name}.arrow")
+        for i, (run_dir, _) in enumerate(runs)
+    ]
+    with (
+        tqdm(total=len(runs), desc="Loading runs", unit="run") as pbar,
+        ProcessPoolExecutor(max_workers=jobs) as pool,
+    ):
+        futures = [
+            pool.submit(_bundle_run, run_dir, ayo, bundle_path)
+            for (run_dir, ayo), bundle_path in zip(runs, bundle_paths, strict=True)
+        ]
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                # Report the first failure without loading the queued runs
+                pool.shutdown(cancel_futures=True)
+                raise
+            pbar.update(1)
+        bundles = [future.result() for future in futures]
+    return [BundleDirectory(bundle) for bundle in bundles]
+
+
+def _use_agg():
+    """Render with the non-interactive Agg backend, which needs no display."""
+    matplotlib.use("Agg", force=True)
+
+
+def _render_page(name: str, runs: list, png_dir: Path | None):
+    """Load a run group and render its summary page, in a worker process.
+
+    Returns:
+        tuple:
+            name (str):
+                The group name.
+            page (Path | matplotlib.figure.Figure | None):
+                The PNG file the page was saved to, or the figure to add to
+                the PDF. None if the page failed.
+            error (str or None):
+                The traceback of the failure.
+    """
+    try:
+        loaded = [load_run(run_dir, ayo, progress=False) for run_dir, ayo in runs]
+        fig = summary_figure(loaded, title=name)
+    except Exception:
+        plt.close("all")
+        return name, None, traceback.format_exc()
+    if png_dir is None:
+        return name, fig, None
+    page = png_dir / f"{name}.png"
+    fig.savefig(page)
+    plt.close(fig)
+    return name, page, None
+
+
+def _ordered_results(pool, func, tasks, window: int):
+    """Yield `func(*task)` for every task, in order, from a worker pool.
+
+    Unlike `Executor.map`, at most `window` tasks are submitted ahead of the
+    result being consumed, so finished pages do not pile up in memory while
+    the PDF is written.
+    """
+    pending = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(func, *task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_batch(groups, output, jobs: int = 1) -> list:
+    """Render one summary page per run group without a display.
+
+    The Agg backend is forced, and with more than one job the groups are
+    loaded and rendered in worker processes. PNG pages are written by the
+    workers, PDF pages are streamed into the multi-page PDF in group order.
+    A group that fails is logged and skipped, so one broken run does not stop
+    the batch.
+
+    Example:
+        >>> render_batch(find_run_groups("nightly/"), "reports/", jobs=16)
+
+    Args:
+        groups (list):
+            (page name, runs) tuples, see `find_run_groups`.
+        output (str | Path):
+            A ".pdf" file holding all pages, or a directory that gets one
+            "<page name>.png" file per page.
+        jobs (int):
+            Number of worker processes. If 1, pages are rendered serially.
+
+    Returns:
+        list:
+            The names of the groups whose page failed.
+    """
+    _use_agg()
+    output = Path(output)
+    png_dir = None if output.suffix == ".pdf" else output
+    if png_dir is None:
+        output.parent.mkdir(parents=True, exist_ok=True)
     else:
-        run_dirs = [run_paths]
+        png_dir.mkdir(parents=True, exist_ok=True)
 
-    for run_dir in run_dirs:
-        if is_ayo(run_dir):
-            runs.append(AYODirectory(Path(run_dir)))
+    tasks = [(name, runs, png_dir) for name, runs in groups]
+    failed = []
+    with (
+        tqdm(total=len(groups), desc="Rendering pages", unit="page") as pbar,
+        PdfPages(output) if png_dir is None else nullcontext() as pdf,
+        ProcessPoolExecutor(max_workers=jobs, initializer=_use_agg)
+        if jobs > 1
+        else nullcontext() as pool,
+    ):
+        if pool is None:
+            pages = (_render_page(*task) for task in tasks)
         else:
-            runs.append(EXOSIMSDirectory(Path(run_dir)))
-
-    ypl_pipeline(runs)
+            pages = _ordered_results(pool, _render_page, tasks, window=2 * jobs)
+        for name, page, error in pages:
+            if error is not None:
+                logger.error(f"Could not render the page of {name}:\n{error}")
+                failed.append(name)
+            elif pdf is not None:
+                pdf.savefig(page)
+                plt.close(page)
+            pbar.update(1)
+    logger.info(f"Rendered {len(groups) - len(failed)} pages to {output}")
+    return failed
 
 
 def is_superdir(path):
     """True if a directory only contains other directories."""
-    for directory in glob.glob(f"{path}/*"):
-        if not os.path.isdir(directory):
-            return False
-    return True
+    return all(entry.is_dir() for entry in _visible_entries(path))
 
 
 def is_ayo(path):
     """True if a directory is an AYO run directory."""
-    for file in os.listdir(path):
-        if file.endswith(".ayo"):
-            return True
-    return False
+    return _has_ayo_input(_visible_entries(path))
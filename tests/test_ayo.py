@@ -0,0 +1,160 @@
+"""Tests for the AYO loaders."""
+
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+
+import astropy.units as u
+import numpy as np
+import pandas as pd
+import pytest
+
+from yieldplotlib.load import AYODirectory, BundleDirectory, load_ayo_sweep
+from yieldplotlib.load.ayo.ayo_input import KEY_VALUE, parse_simple_line
+
+
+def test_lazy_ayo_directory(ayo_data):
+    """A lazy AYODirectory only loads the files that own the requested keys."""
+    lazy = AYODirectory(ayo_data.directory_path, lazy=True)
+    assert not any(child._loaded for child in lazy._children)
+
+    star_dist = lazy.get("star_dist")
+    loaded = [child.file_name for child in lazy._children if child._loaded]
+    assert loaded == ["target_list.csv"]
+    assert (star_dist == ayo_data.get("star_dist")).all()
+
+
+def test_ayo_directory_from_archive(ayo_data):
+    """The AYO run is read straight from the repository's zip archive."""
+    archive = Path(__file__).parents[1] / "data" / "ayo.zip"
+    archived = AYODirectory.from_archive(archive, lazy=True)
+    assert [child.file_name for child in archived._children] == [
+        child.file_name for child in ayo_data._children
+    ]
+    for key in ["star_name", "star_dist", "pupil_diam"]:
+        np.testing.assert_array_equal(archived.get(key), ayo_data.get(key))
+
+
+@pytest.mark.parametrize("compression", [gzip, bz2, lzma])
+def test_compressed_ayo_directory(ayo_data, tmp_path, compression):
+    """Compressed run files are recognized and decompressed as they are read."""
+    suffix = {gzip: ".gz", bz2: ".bz2", lzma: ".xz"}[compression]
+    for child in ayo_data._children:
+        compressed = tmp_path / f"{child.file_name}{suffix}"
+        compressed.write_bytes(compression.compress(child.file_path.read_bytes()))
+    for options in [{}, {"lazy": True, "projected": True}]:
+        run = AYODirectory(tmp_path, **options)
+        assert [type(child) for child in run._children] == [
+            type(child) for child in ayo_data._children
+        ]
+        for key in ["star_name", "star_dist", "pupil_diam"]:
+            np.testing.assert_array_equal(run.get(key), ayo_data.get(key))
+
+
+def test_projected_ayo_directory(ayo_data):
+    """A projected AYODirectory only reads mapped columns, with the same values."""
+    projected = AYODirectory(ayo_data.directory_path, projected=True)
+    for child in projected._children:
+        if child.file_name in ("target_list.csv", "observations.csv"):
+            full = next(
+                node for node in ayo_data._children if node.file_name == child.file_name
+            )
+            assert set(child.data.columns) <= set(full.data.columns)
+            assert len(child.data.columns) <= len(full.data.columns)
+
+    for key in ["star_dist", "star_name", "Ms", "yield_earth", "Visit #"]:
+        assert np.array_equal(projected.get(key), ayo_data.get(key))
+    assert projected.get("blind_comp_det").equals(ayo_data.get("blind_comp_det"))
+    assert projected.get("core_thruput").equals(ayo_data.get("core_thruput"))
+
+
+@pytest.mark.parametrize("suffix", [".arrow", ".parquet"])
+def test_run_bundle(ayo_data, tmp_path, suffix):
+    """A run bundle returns the same values as the directory it came from."""
+    pytest.importorskip("pyarrow")
+    keys = ["star_dist", "star_name", "star_spec", "WDS_sep", "blind_comp_det"]
+    path = ayo_data.export_bundle(tmp_path / f"run{suffix}", keys=keys)
+    bundle = BundleDirectory(path)
+    assert bundle.source == "AYODirectory"
+    assert bundle.input_parameters["AYO_version"] == ayo_data.input.data["AYO_version"]
+    assert set(bundle.keys()) == set(keys)
+
+    assert u.allclose(bundle.get("star_dist"), ayo_data.get("star_dist"))
+    assert np.array_equal(bundle.get("star_name"), ayo_data.get("star_name"))
+    # Missing strings come back as None
+    star_spec = [None if pd.isna(spec) else spec for spec in ayo_data.get("star_spec")]
+    assert list(bundle.get("star_spec")) == star_spec
+    assert np.array_equal(
+        bundle.get("WDS_sep"), ayo_data.get("WDS_sep"), equal_nan=True
+    )
+    assert bundle.get("blind_comp_det").equals(ayo_data.get("blind_comp_det"))
+    assert bundle.get("Ms") is None
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "D = 7.22577 ;(m) {scalar} circumscribed diameter of telescope",
+        "total_survey_time = 2.00000         ;(years) {scalar} total time",
+        "b = -3e2 ; (count pix^-1 s^-1) {scalar} noise",
+        "c = 4 ;(m)",
+        "i = 1.5;(l/D) {scalar} iwa",
+        "j = .5 ; (mas^2) {scalar} x",
+        "k = 3 ;(m ^2) {scalar} spaced exponent",
+        "l = 7 ;some comment without a type",
+        "n = 7",
+        "o = [1, 2, 3]",
+        "p = [1, 2.5, 3e1] ;(mas) {array} mixed",
+        "q = []",
+        "s = [1, 'a']",
+        "t = 'v16' ;{str} version",
+        "u = '' ;{scalar} empty",
+        "w = 'esc\\'aped' ;{str} escaped",
+    ],
+)
+def test_fast_simple_lines(line):
+    """The regex fast path agrees with the pyparsing grammar."""
+    parsed = KEY_VALUE.parseString(line, parseAll=True)
+    value = parsed["value"][0]
+    if "units" in parsed:
+        value *= parsed["units"]
+    fast = parse_simple_line(line)
+    if fast is not None:
+        key, fast_value, type_ = fast
+        assert key == parsed["key"]
+        assert type_ == parsed.get("type", "string").lower()
+        assert type(fast_value) is type(value)
+        assert np.asarray(fast_value).dtype == np.asarray(value).dtype
+        assert np.array_equal(fast_value, value)
+        assert getattr(fast_value, "unit", None) == getattr(value, "unit", None)
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_ayo_sweep(ayo_data, tmp_path, executor):
+    """A sweep is one table with a row per run and unit-normalized columns."""
+    example = ayo_data.input.file_path.read_text(encoding="utf-8")
+    diameters = ["6.0 ;(m)", "700.0 ;(cm)", "8.0 ;(m)"]
+    for i, diameter in enumerate(diameters):
+        run_dir = tmp_path / ("nested" if i == 2 else "")
+        run_dir.mkdir(exist_ok=True)
+        (run_dir / f"run_{i}.ayo").write_text(
+            example.replace("D = 7.22577 ;(m)", f"D = {diameter}")
+        )
+    (tmp_path / "notes.txt").write_text("not an input file")
+
+    sweep = load_ayo_sweep(tmp_path, max_workers=2, executor=executor)
+    assert list(sweep.index) == ["nested/run_2", "run_0", "run_1"]
+    assert sweep.attrs["units"]["D"] == u.m
+    assert np.allclose(sweep["D"], [8.0, 6.0, 7.0])
+
+    reference = ayo_data.input.data
+    assert set(sweep.columns) == set(reference)
+    assert sweep.attrs["units"]["IWA"] == reference["IWA"].unit
+    assert (sweep["IWA"] == reference["IWA"].value).all()
+    assert np.array_equal(sweep["lambda"].iloc[0], reference["lambda"].value)
+    assert (sweep["AYO_version"] == reference["AYO_version"]).all()
+
+    serial = load_ayo_sweep(list(tmp_path.rglob("*.ayo")), max_workers=1)
+    assert serial.index.equals(sweep.index)
+    assert serial["D"].equals(sweep["D"])
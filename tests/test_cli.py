@@ -0,0 +1,82 @@
+"""Tests for the ypl_run command line interface."""
+
+import re
+import shutil
+
+import astropy.units as u
+import numpy as np
+import pytest
+
+from yieldplotlib.load import AYODirectory, BundleDirectory
+from yieldplotlib.pipeline import SUMMARY_KEYS
+from yieldplotlib.ypl_cli import (
+    find_run_groups,
+    find_runs,
+    is_ayo,
+    is_superdir,
+    load_runs,
+    render_batch,
+)
+
+
+def test_parallel_run_loading(ayo_data, tmp_path):
+    """Runs of a superdirectory are found and loaded by worker processes."""
+    superdir = tmp_path / "runs"
+    for name in ["run_b", "run_a"]:
+        shutil.copytree(ayo_data.directory_path, superdir / name)
+    (superdir / ".DS_Store").write_text("")
+    assert is_superdir(superdir)
+    assert is_ayo(superdir / "run_a")
+
+    runs = find_runs(superdir)
+    assert runs == [(superdir / "run_a", True), (superdir / "run_b", True)]
+    assert find_runs(superdir / "run_a") == [(superdir / "run_a", True)]
+
+    serial = load_runs(runs)
+    parallel = load_runs(runs, jobs=2, bundle_dir=tmp_path / "bundles")
+    assert all(isinstance(run, AYODirectory) for run in serial)
+    assert all(isinstance(run, BundleDirectory) for run in parallel)
+    assert [run.directory_name for run in parallel] == ["run_a", "run_b"]
+    assert parallel[0].source == "AYODirectory"
+    # Bundles hold exactly the keys of the summary page, with the same values
+    assert set(parallel[1].keys()) == set(SUMMARY_KEYS)
+    for key in SUMMARY_KEYS:
+        bundled, loaded = parallel[1].get(key), serial[1].get(key)
+        if isinstance(loaded, u.Quantity):
+            assert bundled.unit == loaded.unit
+        np.testing.assert_array_equal(bundled, loaded)
+
+
+def test_parallel_run_loading_failure(ayo_data, tmp_path, monkeypatch):
+    """The first failing run is raised, and queued runs are not loaded."""
+    runs = [(tmp_path / "missing", True)] + [
+        (ayo_data.directory_path, True) for _ in range(12)
+    ]
+    with pytest.raises(FileNotFoundError):
+        load_runs(runs, jobs=2, bundle_dir=tmp_path / "bundles")
+    assert len(list((tmp_path / "bundles").glob("*/*.arrow"))) < len(runs) - 1
+
+
+def test_batch_report(ayo_data, tmp_path):
+    """Every run group gets a page, and failing groups are skipped."""
+    batch = tmp_path / "batch"
+    shutil.copytree(ayo_data.directory_path, batch / "single")
+    for name in ["run_a", "run_b"]:
+        shutil.copytree(ayo_data.directory_path, batch / "pair" / name)
+    (batch / "broken").mkdir()
+
+    groups = find_run_groups(batch)
+    assert [name for name, _ in groups] == ["broken", "pair", "single"]
+    assert len(groups[1][1]) == 2
+    assert find_run_groups(batch / "single") == [("single", [(batch / "single", True)])]
+
+    failed = render_batch(groups, tmp_path / "report.pdf", jobs=2)
+    assert failed == ["broken"]
+    pdf = (tmp_path / "report.pdf").read_bytes()
+    assert len(re.findall(rb"/Type\s*/Page\b", pdf)) == 2
+
+    assert render_batch(groups[1:], tmp_path / "pages") == []
+    assert sorted(p.name for p in (tmp_path / "pages").iterdir()) == [
+        "pair.png",
+        "single.png",
+    ]
@@ -0,0 +1,299 @@
+"""Tests for the generic DirectoryNode loading machinery."""
+
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import astropy.units as u
+import numpy as np
+import pandas as pd
+import pytest
+
+from yieldplotlib.core import DirectoryNode, Node, RunCollection, directory_node
+from yieldplotlib.core.bundle import write_bundle
+from yieldplotlib.core.result_cache import ResultCache
+from yieldplotlib.load import BundleDirectory, YIPDirectory
+
+
+@pytest.fixture
+def csv_tree(tmp_path):
+    """Create a small directory tree of CSV files."""
+    (tmp_path / "sub").mkdir()
+    for i in range(4):
+        (tmp_path / f"file_{i}.csv").write_text(f"a,b\n{i},{i + 1}\n")
+        (tmp_path / "sub" / f"nested_{i}.csv").write_text(f"c\n{i}\n")
+    return tmp_path
+
+
+class StaticNode(Node):
+    """A node that serves a fixed dictionary of values."""
+
+    def __init__(self, name, values, indexed=True):
+        """Store the values to serve."""
+        super().__init__(Path(name))
+        self.values = values
+        self.indexed = indexed
+
+    def load(self):
+        """Nothing to load."""
+
+    def keys(self):
+        """Return the served keys if this node is indexed."""
+        return self.values.keys() if self.indexed else None
+
+    def get(self, key, **kwargs):
+        """Return the value for the key."""
+        return self.values.get(key)
+
+
+def child_names(node):
+    """Return the names of the children of a directory node, recursively."""
+    return [
+        (child.file_name, child_names(child))
+        if isinstance(child, DirectoryNode)
+        else child.file_name
+        for child in node._children
+    ]
+
+
+def leaf_data(node):
+    """Return the data of the file nodes of a directory node, recursively."""
+    return [
+        data
+        for child in node._children
+        for data in (
+            leaf_data(child) if isinstance(child, DirectoryNode) else [child.data]
+        )
+    ]
+
+
+def archive_tree(tree, archive_path):
+    """Archive a directory tree under a top-level folder, with macOS metadata."""
+    files = sorted(path for path in tree.rglob("*") if path.is_file())
+    if archive_path.suffix == ".zip":
+        with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for path in files:
+                name = path.relative_to(tree).as_posix()
+                archive.write(path, f"run/{name}")
+                archive.writestr(f"__MACOSX/run/._{name}", b"\x00\x05")
+            archive.writestr("run/._file_0.csv", b"\x00\x05")
+    else:
+        with tarfile.open(archive_path, "w:gz") as archive:
+            archive.add(tree, "run")
+    return archive_path
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_load_matches_serial(csv_tree, executor):
+    """Parallel loading produces the same, deterministic tree as serial loading."""
+    serial = DirectoryNode(csv_tree)
+    parallel = DirectoryNode(csv_tree, max_workers=3, executor=executor)
+
+    assert child_names(parallel) == child_names(serial)
+    assert child_names(serial)[0] == "file_0.csv"
+    for serial_child, parallel_child in zip(
+        serial._children[:-1], parallel._children[:-1], strict=True
+    ):
+        assert serial_child.data.equals(parallel_child.data)
+
+
+def test_nested_directories_load_serially(csv_tree, monkeypatch):
+    """Only the top-level directory starts a worker pool."""
+    pools = []
+
+    class CountingExecutor(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setitem(directory_node.EXECUTORS, "thread", CountingExecutor)
+    directory = DirectoryNode(csv_tree, max_workers=3)
+    assert len(pools) == 1
+    sub = directory._children[-1]
+    assert isinstance(sub, DirectoryNode)
+    assert len(sub._children) == 4
+    # Queries of the subdirectory use the workers again after loading
+    assert sub.max_workers == 3
+    assert sub._parent is directory
+
+
+def test_unknown_executor(csv_tree):
+    """An unknown executor name is rejected."""
+    with pytest.raises(ValueError):
+        DirectoryNode(csv_tree, executor="gpu")
+
+
+def test_lazy_load(csv_tree):
+    """Lazy file nodes are only read when their data is first needed."""
+    directory = DirectoryNode(csv_tree, lazy=True)
+    first, second = directory._children[:2]
+    assert not first._loaded and not second._loaded
+
+    assert first.data["a"].tolist() == [0]
+    assert first._loaded and not second._loaded
+
+
+def test_key_index(csv_tree):
+    """Keys are routed to their owners and the index follows added nodes."""
+    directory = DirectoryNode(csv_tree)
+    subdirectory = directory._children[-1]
+    directory.add(StaticNode("a", {"x": 1}))
+    directory.add(StaticNode("b", {"x": 2, "y": 3}))
+    assert directory.get("x") == 1
+    assert directory.get("y") == 3
+    assert directory.get("z") is None
+    assert directory.keys() == {"x", "y"}
+
+    # Adding to a subdirectory invalidates the index of its parents
+    subdirectory.add(StaticNode("c", {"z": 4}))
+    assert directory.get("z") == 4
+
+    # Nodes that cannot list their keys are searched in child order
+    directory.add(StaticNode("d", {"w": 5}, indexed=False))
+    assert directory.keys() is None
+    assert directory.get("w") == 5
+    assert directory.get("x") == 1
+
+
+def test_get_many(csv_tree):
+    """Bulk gets ask each owner once and match the first-match rule of get."""
+    directory = DirectoryNode(csv_tree)
+    subdirectory = directory._children[-1]
+    directory.add(StaticNode("a", {"x": None, "y": np.arange(3)}))
+    directory.add(StaticNode("b", {"x": np.arange(3) * u.m, "y": np.ones(3)}))
+    subdirectory.add(StaticNode("c", {"z": 4}))
+    calls = []
+    for node in [*directory._children[-2:], subdirectory._children[-1]]:
+        get_many = node.get_many
+        node.get_many = lambda keys, get_many=get_many, **kwargs: (
+            calls.append(sorted(keys)) or get_many(keys, **kwargs)
+        )
+
+    keys = ["x", "y", "z", "missing"]
+    values = directory.get_many(keys)
+    assert list(values) == keys
+    for key in keys:
+        assert np.array_equal(values[key], directory.get(key))
+    # "x" falls through to its second owner, "y" and "z" are asked for once
+    assert calls == [["x", "y"], ["z"], ["x"]]
+
+    calls.clear()
+    frame = directory.get_many(["y", "x"], as_frame=True)
+    assert calls == []
+    assert frame.attrs["units"] == {"x": u.m}
+    assert frame["x"].tolist() == [0, 1, 2]
+
+
+def test_result_cache(csv_tree):
+    """Repeated requests are served from the cache until it is invalidated."""
+    directory = DirectoryNode(csv_tree, cache_bytes=1024)
+    node = StaticNode("a", {"x": np.arange(10), "y": np.arange(200)})
+    directory.add(node)
+
+    first = directory.get("x")
+    node.values["x"] = np.arange(5)
+    assert directory.get("x") is first
+    assert directory.get("x", unit=None) is not first
+
+    # Values larger than the budget are not cached
+    directory.get("y")
+    assert directory._cache.nbytes <= 1024
+
+    directory.invalidate()
+    assert len(directory.get("x")) == 5
+
+
+def test_result_cache_eviction():
+    """The least recently used values are evicted once over budget."""
+    cache = ResultCache(max_bytes=250)
+    for key in "abc":
+        cache.put(cache.make_key(key, {}), np.zeros(10))
+    cache.lookup(cache.make_key("a", {}))
+    cache.put(cache.make_key("d", {}), np.zeros(10))
+    assert cache.lookup(cache.make_key("a", {}))[0]
+    assert not cache.lookup(cache.make_key("b", {}))[0]
+    assert cache.make_key("e", {"int_times": np.zeros(3)}) is None
+
+
+@pytest.mark.parametrize("max_workers", [None, 4])
+def test_run_collection(max_workers):
+    """A key is stacked across runs with a run index and a common unit."""
+    runs = RunCollection(
+        [
+            StaticNode("a", {"dist": [1, 2] * u.pc, "frame": pd.DataFrame({"x": [1]})}),
+            StaticNode("b", {}),
+            StaticNode(
+                "c", {"dist": [1000.0] * u.mpc, "frame": pd.DataFrame({"x": [2]})}
+            ),
+        ],
+        max_workers=max_workers,
+    )
+    dist = runs.get("dist")
+    assert dist.unit == u.pc
+    np.testing.assert_allclose(dist.values.value, [1, 2, 1])
+    np.testing.assert_array_equal(dist.run_ids, [0, 0, 2])
+    np.testing.assert_array_equal(dist.lengths, [2, 0, 1])
+    assert len(dist["b"]) == 0
+    assert dist["c"][0] == 1 * u.pc
+    assert dist.to_frame()["run"].tolist() == ["a", "a", "c"]
+    with pytest.raises(ValueError):
+        dist.stack()
+
+    frame = runs.get("frame")
+    assert frame.loc["c", "x"].tolist() == [2]
+    assert runs.get("missing") is None
+    assert runs["b"] is runs[1]
+    assert RunCollection([runs[0], runs[0]]).names == ["a (0)", "a (1)"]
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar.gz"])
+def test_from_archive(csv_tree, tmp_path_factory, suffix):
+    """Archived trees load like the extracted tree, skipping macOS metadata."""
+    archive = tmp_path_factory.mktemp("archive") / f"run{suffix}"
+    archive_tree(csv_tree, archive)
+    extracted = DirectoryNode(csv_tree)
+    cache = tmp_path_factory.mktemp("cache")
+    for archived in [
+        DirectoryNode.from_archive(archive),
+        DirectoryNode.from_archive(
+            archive, max_workers=2, executor="process", lazy=True, disk_cache=cache
+        ),
+        # Restored from the disk cache
+        DirectoryNode.from_archive(archive, disk_cache=cache),
+    ]:
+        assert archived.directory_name == "run"
+        assert child_names(archived) == child_names(extracted)
+        assert all(
+            archived_data.equals(extracted_data)
+            for archived_data, extracted_data in zip(
+                leaf_data(archived), leaf_data(extracted), strict=True
+            )
+        )
+    assert len(list(cache.glob("*.pkl"))) == 8
+    with pytest.raises(NotADirectoryError):
+        DirectoryNode.from_archive(archive, member="missing")
+
+
+def test_bundle_skips_dictionaries(tmp_path, caplog):
+    """Keys with dictionary values are left out of a bundle with a warning."""
+    pytest.importorskip("pyarrow")
+    node = StaticNode(
+        "run", {"star_dist": np.arange(3) * u.pc, "pupil_diam": {"inst": 6.0}}
+    )
+    path = write_bundle(node, tmp_path / "run.arrow", keys=node.keys())
+    assert "pupil_diam" in caplog.text
+    bundle = BundleDirectory(path)
+    assert set(bundle.keys()) == {"star_dist"}
+
+
+def test_unindexed_child_ignores_other_options(yip_data, tmp_path):
+    """Options meant for other nodes are ignored by unindexed YIP children."""
+    # A separate directory, so the shared fixture is never given a parent
+    yip = YIPDirectory(yip_data.directory_path)
+    parent = DirectoryNode(tmp_path)
+    parent.add(yip)
+    assert parent.get("offax.data", bins=[0, 10]) is not None
+    values = parent.get_many(["offax.data", "D"], bins=[0, 10])
+    assert values["offax.data"] is not None
+    assert values["D"] == yip_data.get("D")
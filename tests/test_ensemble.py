@@ -0,0 +1,170 @@
+"""Tests for the streaming ensemble reductions."""
+
+import pickle
+
+import astropy.units as u
+import numpy as np
+import pytest
+
+from yieldplotlib.core import DirectoryNode
+from yieldplotlib.core.ensemble import Moments, QuantileSketch, StatisticAccumulator
+from yieldplotlib.load import DRMDirectory
+
+
+def test_moments_merge():
+    """Merged batches match the moments of all samples."""
+    rng = np.random.default_rng(0)
+    samples = rng.normal(5, 2, 1000)
+    moments = Moments()
+    for batch in np.array_split(samples, 7):
+        part = Moments()
+        part.add_batch(batch)
+        moments.merge(part)
+    assert moments.count == len(samples)
+    assert np.isclose(moments.mean, samples.mean())
+    assert np.isclose(moments.std, samples.std(ddof=1))
+    assert moments.min == samples.min()
+    assert moments.max == samples.max()
+
+
+def test_moments_elementwise_growth():
+    """Shorter 1D samples count as zeros in the missing elements."""
+    moments = Moments()
+    moments.add([1, 2])
+    moments.add([3, 4, 6])
+    np.testing.assert_allclose(moments.mean, [2, 3, 3])
+    np.testing.assert_allclose(moments.var, np.var([[1, 2, 0], [3, 4, 6]], 0, ddof=1))
+
+
+def test_quantile_sketch():
+    """Quantiles of merged sketches are close to the exact quantiles."""
+    rng = np.random.default_rng(1)
+    samples = rng.lognormal(0, 1, 20000)
+    sketch = QuantileSketch()
+    for batch in np.array_split(samples, 20):
+        part = QuantileSketch()
+        part.add_batch(batch)
+        sketch.merge(part)
+    assert len(sketch.means) < 500
+    for q in [0.01, 0.1, 0.5, 0.9, 0.99]:
+        exact = np.quantile(samples, q)
+        # Rank error of the estimate
+        rank = np.mean(samples <= sketch.quantile(q))
+        assert abs(rank - q) < 0.01, (q, exact)
+
+
+def test_accumulator_reductions():
+    """Reductions are available by name."""
+    accumulator = StatisticAccumulator(edges=[0, 5, 10])
+    accumulator.add(np.array([1.0, 2.0, np.nan, 7.0]))
+    assert accumulator.value("count") == 3
+    assert accumulator.value("median") == pytest.approx(2.0)
+    counts, _ = accumulator.value("hist")
+    np.testing.assert_array_equal(counts, [2, 1])
+    with pytest.raises(ValueError):
+        accumulator.value("mode")
+    with pytest.raises(ValueError):
+        StatisticAccumulator(elementwise=True).value("q50")
+
+
+@pytest.fixture
+def drm_ensemble(tmp_path):
+    """Write a DRM directory of random runs."""
+    rng = np.random.default_rng(2)
+    drm_dir = tmp_path / "drm"
+    drm_dir.mkdir()
+    runs = []
+    for seed in range(12):
+        drm = []
+        for _ in range(rng.integers(5, 15)):
+            n_planets = rng.integers(0, 3)
+            drm.append(
+                {
+                    "star_ind": int(rng.integers(0, 6)),
+                    "arrival_time": rng.uniform(0, 365) * u.d,
+                    "det_time": rng.uniform(0.1, 2) * u.d,
+                    "plan_inds": rng.integers(0, 20, n_planets),
+                    "det_status": rng.choice([-1, 0, 1], n_planets),
+                    "det_SNR": rng.uniform(0, 20, n_planets),
+                }
+            )
+        with open(drm_dir / f"seed_{seed}.pkl", "wb") as f:
+            pickle.dump({"DRM": drm, "systems": {}, "seed": seed}, f)
+        runs.append(drm)
+    return drm_dir, runs
+
+
+@pytest.mark.parametrize("max_workers", [None, 3])
+def test_drm_ensemble_keys(drm_ensemble, max_workers):
+    """Ensemble statistics of DRMs match the statistics of every member."""
+    drm_dir, runs = drm_ensemble
+    directory = DRMDirectory(drm_dir, max_workers=max_workers)
+
+    unique = [
+        len(
+            {
+                p
+                for obs in drm
+                for p, s in zip(obs["plan_inds"], obs["det_status"], strict=True)
+                if s == 1
+            }
+        )
+        for drm in runs
+    ]
+    assert directory.has_key("n_unique_detections.mean")
+    assert "n_unique_detections.std" in directory.keys()
+    assert directory.get("n_unique_detections.count") == len(runs)
+    assert directory.get("n_unique_detections.mean") == pytest.approx(np.mean(unique))
+    assert directory.get("n_unique_detections.std") == pytest.approx(
+        np.std(unique, ddof=1)
+    )
+
+    snr = np.concatenate([obs["det_SNR"] for drm in runs for obs in drm])
+    assert directory.get("det_SNR.mean") == pytest.approx(snr.mean())
+    assert directory.get("det_SNR.max") == snr.max()
+    counts, _ = directory.get("det_SNR.hist", bins=[0, 10, 20])
+    np.testing.assert_array_equal(counts, np.histogram(snr, [0, 10, 20])[0])
+
+    visits = np.zeros((len(runs), 6))
+    for i, drm in enumerate(runs):
+        for obs in drm:
+            visits[i, obs["star_ind"]] += 1
+    star_visits = directory.get("star_visits.mean")
+    np.testing.assert_allclose(star_visits, visits.mean(0)[: len(star_visits)])
+
+    values = directory.get_many(["det_SNR.mean", "n_unique_detections.mean"])
+    assert values["det_SNR.mean"] == pytest.approx(snr.mean())
+    assert values["n_unique_detections.mean"] == pytest.approx(np.mean(unique))
+
+    # Accumulators are cached until the directory changes
+    assert (
+        directory.reduce(["det_SNR"])["det_SNR"]
+        is directory.reduce(["det_SNR"])["det_SNR"]
+    )
+
+
+class RunDirectory(DirectoryNode):
+    """A run directory whose subdirectories are DRM ensembles."""
+
+    def _create_directory_node(self, path):
+        """Load every subdirectory as a DRM directory."""
+        return DRMDirectory(path, **self._directory_options())
+
+
+def test_drm_ensemble_keys_from_run(drm_ensemble, capsys):
+    """Unlisted ensemble keys resolve through the parent run directory."""
+    drm_dir, runs = drm_ensemble
+    run = RunDirectory(drm_dir.parent, progress=False)
+    direct = DRMDirectory(drm_dir, progress=False)
+
+    assert "det_SNR.q95" not in run.keys()
+    assert run.has_key("det_SNR.q95")
+    assert run.get("det_SNR.q95") == direct.get("det_SNR.q95")
+    counts, edges = run.get("det_SNR.hist", bins=[0, 10, 20])
+    np.testing.assert_array_equal(edges, [0, 10, 20])
+    assert counts.sum() == sum(len(obs["det_SNR"]) for drm in runs for obs in drm)
+    values = run.get_many(["det_SNR.q50", "n_unique_detections.mean"])
+    assert values["det_SNR.q50"] == direct.get("det_SNR.q50")
+    assert run.get("det_SNR.mode") is None
+    # The progress option also silences the ensemble reductions
+    assert "Reducing ensemble" not in capsys.readouterr().err
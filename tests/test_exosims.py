@@ -0,0 +1,263 @@
+"""Tests for the EXOSIMS loaders."""
+
+import json
+import os
+import pickle
+import sys
+from types import ModuleType, SimpleNamespace
+
+import astropy.units as u
+import numpy as np
+import pytest
+
+from yieldplotlib.load.exosims import DRMFile, EXOSIMSInputFile
+from yieldplotlib.load.exosims.exosims_drm import read_drm_columns
+from yieldplotlib.load.exosims.exosims_input_file import first_planet_values
+
+
+class FakeTargetList:
+    """Stand-in for an EXOSIMS TargetList."""
+
+    def __init__(self):
+        """Create a target list with three stars."""
+        self.Name = np.array(["HIP 1", "HIP 2", "HIP 3"])
+
+    def revise_lists(self, sInds):
+        """Keep only the given stars."""
+        self.Name = self.Name[sInds]
+
+
+class FakeOpticalSystem:
+    """Stand-in for an EXOSIMS OpticalSystem with two observing modes."""
+
+    intCutoff = 50 * u.d
+
+    def __init__(self):
+        """Create the detection and spectroscopy modes."""
+        self.observingModes = [
+            {"instName": "imager", "systName": "coro", "hex": "det", "SNR": 5},
+            {"instName": "spectro", "systName": "coro", "hex": "spec", "SNR": 10},
+        ]
+
+    def calc_intTime(self, TL, sInds, fZ, JEZ, dMag, WA, mode):
+        """Return a mode-dependent time, nan for the last star."""
+        int_times = (JEZ.value * mode["SNR"] + dMag) * u.d
+        int_times[-1] = np.nan * u.d
+        return int_times
+
+
+class FakeCompleteness:
+    """Stand-in for an EXOSIMS Completeness module."""
+
+    def comp_per_intTime(self, intTimes, TL, sInds, fZ, JEZ, WA, mode):
+        """Return a completeness that depends on every input."""
+        assert len(intTimes) == len(sInds) == len(fZ) == len(JEZ) == len(WA)
+        scale = intTimes.to_value(u.d) * WA.to_value(u.arcsec) / mode["SNR"]
+        return 1 - np.exp(-scale / (1 + JEZ.value + sInds))
+
+
+def build_fake_universe(self):
+    """Replace `create_exosims_objects` with fake EXOSIMS objects."""
+    TL = FakeTargetList()
+    TL.ZodiacalLight = SimpleNamespace(fZ0=1e-10 / u.arcsec**2)
+    TL.int_WA = np.array([0.1, 0.2, 0.3]) * u.arcsec
+    TL.int_dMag = np.array([22.0, 23.0, 24.0])
+    TL.dist = np.array([5.0, 10.0, 15.0]) * u.pc
+    TL.JEZ0 = {
+        "det": np.array([1.0, 2.0, 3.0]) * u.ph / u.s / u.m**2,
+        "spec": np.array([4.0, 5.0, 6.0]) * u.ph / u.s / u.m**2,
+    }
+    TL.OpticalSystem = FakeOpticalSystem()
+    TL.Completeness = FakeCompleteness()
+    universe = SimpleNamespace(plan2star=np.array([0, 0, 2]), nEZ=np.array([1, 2, 5]))
+    self._SS = SimpleNamespace(SimulatedUniverse=universe)
+    self._TL = TL
+    self._OS = TL.OpticalSystem
+    self._exosims_objects_built = True
+    self._apply_target_restriction()
+
+
+@pytest.fixture
+def exosims_input(tmp_path):
+    """Write a minimal EXOSIMS input JSON file."""
+    specs = {
+        "pupilDiam": 6.0,
+        "scienceInstruments": [{"name": "imager"}, {"name": "spectro"}],
+        "starlightSuppressionSystems": [{"name": "coro"}],
+        "observingModes": [
+            {"instName": "imager", "systName": "coro", "detectionMode": True},
+            {"instName": "spectro", "systName": "coro"},
+        ],
+    }
+    path = tmp_path / "input.json"
+    path.write_text(json.dumps(specs))
+    return path
+
+
+def test_deferred_exosims_objects(monkeypatch, exosims_input):
+    """EXOSIMS objects are only built on first access, with pending filters."""
+    builds = []
+
+    def fake_create(self):
+        builds.append(self)
+        self._TL = FakeTargetList()
+        self._exosims_objects_built = True
+        self._apply_target_restriction()
+
+    monkeypatch.setattr(EXOSIMSInputFile, "create_exosims_objects", fake_create)
+    node = EXOSIMSInputFile(exosims_input)
+    node.restrict_targets(np.array(["HIP 3", "HIP 1"]))
+    assert builds == []
+
+    assert node.TL.Name.tolist() == ["HIP 1", "HIP 3"]
+    assert node.SS is None
+    assert len(builds) == 1
+
+
+def test_name_indices(exosims_input):
+    """Systems, instruments and modes are looked up by name through indices."""
+    node = EXOSIMSInputFile(exosims_input)
+    assert node.instrument_index == {"imager": 0, "spectro": 1}
+    assert node.system_index == {"coro": 0}
+    assert node.mode_index == {("imager", "coro"): 0, ("spectro", "coro"): 1}
+    assert (node.det_inst_ind, node.spec_inst_ind) == (0, 1)
+    assert node._get_mode_dict("spectro", "coro") is node.data["observingModes"][1]
+    with pytest.raises(ValueError):
+        node._get_mode_dict("spectro", "vortex")
+
+
+@pytest.mark.parametrize("n_planets", [0, 10**3, 10**4, 10**5])
+def test_first_planet_values(n_planets):
+    """The grouped lookup matches a per-star search of the planets."""
+    rng = np.random.default_rng(n_planets)
+    n_stars = max(n_planets // 10, 5)
+    plan2star = rng.integers(0, n_stars, n_planets)
+    nEZ = rng.uniform(0, 10, n_planets)
+    sInds = rng.choice(n_stars + 5, size=min(n_stars, 200), replace=False)
+
+    expected = np.full(len(sInds), 3.0)
+    for i, sInd in enumerate(sInds):
+        planet_indices = np.where(plan2star == sInd)[0]
+        if len(planet_indices) > 0:
+            expected[i] = nEZ[planet_indices[0]]
+
+    result = first_planet_values(plan2star, nEZ, sInds, default=3.0)
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_comp_per_intTime_grid(monkeypatch, exosims_input):
+    """The batched completeness matches the single-mode calculation."""
+    monkeypatch.setattr(EXOSIMSInputFile, "create_exosims_objects", build_fake_universe)
+    node = EXOSIMSInputFile(exosims_input)
+    star_names = np.array(["HIP 3", "HIP 1"])
+
+    # Default integration times of each mode
+    table = node.comp_per_intTime_grid(star_names=star_names)
+    assert table.shape == (4, 5)
+    for key, inst in [("blind_comp_det", "imager"), ("blind_comp_spec", "spectro")]:
+        expected = node._get_comp_per_intTime(key, star_names=star_names)
+        result = table[table["inst"] == inst]
+        assert result["star_name"].tolist() == expected["star_name"].tolist()
+        np.testing.assert_allclose(result["completeness"], expected["completeness"])
+
+    # A shared grid of integration times for every star
+    int_times = np.array([1.0, 10.0, 100.0]) * u.d
+    table = node.comp_per_intTime_grid(
+        modes=[("spectro", "coro")], int_times=int_times, star_names=star_names
+    )
+    assert len(table) == len(int_times) * len(star_names)
+    for int_time in int_times:
+        expected = node._get_comp_per_intTime(
+            "blind_comp_spec",
+            int_times=np.repeat(int_time, len(star_names)),
+            star_names=star_names,
+        )
+        result = table[table["integration_time"] == int_time.to_value(u.d)]
+        np.testing.assert_allclose(result["completeness"], expected["completeness"])
+
+
+class FakeObservingMode:
+    """Stand-in for an EXOSIMS object stored in a DRM."""
+
+    def __init__(self):
+        """Create an object with a Quantity attribute."""
+        self.lam = 500 * u.nm
+
+
+class Exploit:
+    """Pickles as a call to os.system."""
+
+    def __init__(self, marker):
+        """Store the file the command would create."""
+        self.marker = marker
+
+    def __reduce__(self):
+        """Run a shell command when unpickled."""
+        return os.system, (f"touch {self.marker}",)
+
+
+def test_drm_columns(monkeypatch, tmp_path):
+    """DRMs are read into typed columns without importing their classes."""
+    # Pickle an object of a module that does not exist when reading
+    module = ModuleType("EXOSIMS_missing")
+    monkeypatch.setattr(FakeObservingMode, "__module__", module.__name__)
+    module.FakeObservingMode = FakeObservingMode
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    mode = {"systName": "coro", "object": FakeObservingMode()}
+    drm = [
+        {
+            "star_ind": 3,
+            "star_name": "HIP 3",
+            "arrival_time": 1.5 * u.d,
+            "plan_inds": np.array([7, 8]),
+            "det_status": np.array([1, 0]),
+            "det_SNR": np.array([9.0, 2.0]),
+            "det_params": {"dMag": np.array([22.0, 24.0])},
+            "det_mode": mode,
+            "det_time": 0.5 * u.d,
+        },
+        {
+            "star_ind": 5,
+            "star_name": "HIP 5",
+            "arrival_time": 3.0 * u.d,
+            "plan_inds": np.array([], dtype=int),
+            "det_status": np.array([], dtype=int),
+            "det_SNR": np.array([]),
+            "det_mode": mode,
+            "exploit": Exploit(tmp_path / "exploited"),
+        },
+        {
+            "star_ind": 3,
+            "star_name": "HIP 3",
+            "arrival_time": 40.0 * u.d,
+            "plan_inds": np.array([9]),
+            "det_status": np.array([-1]),
+            "det_SNR": np.array([4.0]),
+            "det_params": {"dMag": np.array([25.0])},
+            "det_mode": mode,
+            "det_time": 1.0 * u.d,
+        },
+    ]
+    drm_path = tmp_path / "run.pkl"
+    with open(drm_path, "wb") as f:
+        pickle.dump({"DRM": drm, "systems": {}, "seed": 1}, f)
+    monkeypatch.delitem(sys.modules, module.__name__)
+
+    columns = read_drm_columns(drm_path)
+    assert not (tmp_path / "exploited").exists()
+    np.testing.assert_array_equal(columns["star_ind"], [3, 5, 3])
+    assert columns["star_ind"].dtype.kind == "i"
+    np.testing.assert_array_equal(columns["star_name"], ["HIP 3", "HIP 5", "HIP 3"])
+    np.testing.assert_array_equal(columns["arrival_time"], [1.5, 3.0, 40.0])
+    np.testing.assert_array_equal(columns["det_time"], [0.5, np.nan, 1.0])
+    np.testing.assert_array_equal(columns["det_mode"], ["coro"] * 3)
+    np.testing.assert_array_equal(columns["plan_inds"], [7, 8, 9])
+    np.testing.assert_array_equal(columns["plan_obs"], [0, 0, 2])
+    np.testing.assert_array_equal(columns["det_SNR"], [9.0, 2.0, 4.0])
+    np.testing.assert_array_equal(columns["det_params/dMag"], [22.0, 24.0, 25.0])
+    assert np.isnan(columns["det_params/WA"]).all()
+
+    node = DRMFile(drm_path, lazy=False)
+    assert not node._loaded
+    np.testing.assert_array_equal(node.get("det_status"), [1, 0, -1])
+    assert node.get("star_name") is None
@@ -0,0 +1,206 @@
+"""Tests for the generic file nodes."""
+
+import json
+import os
+import pickle
+
+import astropy.io.fits as pyfits
+import numpy as np
+import pandas as pd
+import pytest
+
+from yieldplotlib.core import disk_cache
+from yieldplotlib.core.disk_cache import DiskCache
+from yieldplotlib.core.file_nodes import CSVFile, FitsFile, JSONFile, PickleFile
+from yieldplotlib.core.fits_handles import FITS_HANDLES, FitsHandlePool
+from yieldplotlib.load.ayo import AYOInputFile
+
+
+def count_calls(monkeypatch, obj, name):
+    """Wrap `obj.name` so that every call is counted."""
+    calls = []
+    func = getattr(obj, name)
+
+    def wrapper(*args, **kwargs):
+        calls.append(args)
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(obj, name, wrapper)
+    return calls
+
+
+@pytest.fixture
+def sample_files(tmp_path):
+    """Write one small file of each supported type."""
+    paths = {
+        "csv": tmp_path / "sample.csv",
+        "json": tmp_path / "sample.json",
+        "pkl": tmp_path / "sample.pkl",
+        "fits": tmp_path / "sample.fits",
+        "ayo": tmp_path / "sample.ayo",
+    }
+    paths["csv"].write_text("a, b\n1,2\n3,4\n")
+    paths["json"].write_text(json.dumps({"a": 1}))
+    with open(paths["pkl"], "wb") as f:
+        pickle.dump({"a": 1}, f)
+    header = pyfits.Header({"D": 6.0})
+    pyfits.writeto(paths["fits"], np.zeros((3, 4, 4)), header=header)
+    paths["ayo"].write_text("D = 6.0 ;(m) {scalar} telescope diameter\n")
+    return paths
+
+
+@pytest.mark.parametrize(
+    "node_type, suffix, reader",
+    [
+        (CSVFile, "csv", (pd, "read_csv")),
+        (JSONFile, "json", (json, "load")),
+        (PickleFile, "pkl", (pickle, "load")),
+        (FitsFile, "fits", (pyfits, "open")),
+    ],
+)
+def test_single_read_per_node(monkeypatch, sample_files, node_type, suffix, reader):
+    """Constructing a file node reads the underlying file exactly once."""
+    calls = count_calls(monkeypatch, *reader)
+    node = node_type(sample_files[suffix])
+    assert len(calls) == 1
+    assert node.data is not None
+    assert len(calls) == 1
+
+
+def test_single_parse_ayo_input(monkeypatch, sample_files):
+    """An AYO input file is read and parsed exactly once."""
+    loads = count_calls(monkeypatch, AYOInputFile, "load")
+    parses = count_calls(monkeypatch, AYOInputFile, "parse")
+    node = AYOInputFile(sample_files["ayo"])
+    assert node.get("pupil_diam") is not None
+    assert (len(loads), len(parses)) == (1, 1)
+
+
+def test_fits_handles(monkeypatch, sample_files):
+    """Header lookups reuse one pooled handle that `close` releases."""
+    opens = count_calls(monkeypatch, pyfits, "open")
+    with FitsFile(sample_files["fits"]) as node:
+        for _ in range(3):
+            assert node._get("D") == 6.0
+        assert node._get("NAXIS", ext=0) == 3
+        assert node._get("data").shape == (3, 4, 4)
+        assert len(opens) == 1
+        assert sample_files["fits"] in FITS_HANDLES
+    assert sample_files["fits"] not in FITS_HANDLES
+
+
+def test_fits_handle_pool_bound(sample_files, tmp_path):
+    """The pool closes the least recently used handles beyond its bound."""
+    pool = FitsHandlePool(max_open=2)
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"frame_{i}.fits")
+        pyfits.writeto(paths[-1], np.full((2, 2), i))
+        with pool.borrow(paths[-1]) as hdul:
+            data = hdul[0].data
+    assert len(pool) == 2
+    assert paths[0] not in pool
+    # Arrays read through an evicted handle stay valid
+    assert data.sum() == 8
+    pool.close()
+    assert len(pool) == 0
+
+
+def test_disk_cache(monkeypatch, sample_files, tmp_path):
+    """Unchanged files are restored from the disk cache instead of re-parsed."""
+    cache = DiskCache(tmp_path / "cache")
+    digests = count_calls(monkeypatch, disk_cache, "file_digest")
+    node = CSVFile(sample_files["csv"], disk_cache=cache)
+    reads = count_calls(monkeypatch, pd, "read_csv")
+
+    restored = CSVFile(sample_files["csv"], disk_cache=cache)
+    assert len(reads) == 0
+    assert len(digests) == 0
+    assert restored.data.equals(node.data)
+
+    # The first touch re-parses the file and records its content hash, after
+    # which touching the file without changing it keeps the entry valid
+    os.utime(sample_files["csv"], ns=(0, 0))
+    CSVFile(sample_files["csv"], disk_cache=cache)
+    assert len(reads) == 1
+    os.utime(sample_files["csv"], ns=(10**9, 10**9))
+    CSVFile(sample_files["csv"], disk_cache=cache)
+    assert len(reads) == 1
+
+    sample_files["csv"].write_text("a, b\n5,6\n")
+    changed = CSVFile(sample_files["csv"], disk_cache=cache)
+    assert len(reads) == 2
+    assert changed.data["a"].tolist() == [5]
+
+
+def test_disk_cache_ayo_input(monkeypatch, sample_files, tmp_path):
+    """AYO input files are rehydrated from the disk cache without parsing."""
+    node = AYOInputFile(sample_files["ayo"], disk_cache=tmp_path / "cache")
+    parses = count_calls(monkeypatch, AYOInputFile, "parse")
+    restored = AYOInputFile(sample_files["ayo"], disk_cache=tmp_path / "cache")
+    assert len(parses) == 0
+    assert restored.get("pupil_diam") == node.get("pupil_diam")
+
+
+def test_fits_frames(sample_files):
+    """Fits data is memory-mapped and can be sliced along its first axis."""
+    node = FitsFile(sample_files["fits"])
+    cube = node._get("data")
+    assert cube.shape == (3, 4, 4)
+    assert not cube.flags.owndata
+
+    frames = node._get("data", frames=slice(1, 3))
+    assert frames.shape == (2, 4, 4)
+    assert not frames.flags.owndata
+    assert node._get("data", frames=0).shape == (4, 4)
+
+
+def recursive_json_get(data, key):
+    """Reference lookup walking the whole JSON for every key."""
+    values = {}
+
+    def json_recur(data):
+        if isinstance(data, dict):
+            for k, v in data.items():
+                if k == key:
+                    try:
+                        values[data["name"]] = data.get(key, None)
+                    except KeyError:
+                        values[data["instName"]] = data.get(key, None)
+                elif isinstance(v, dict | list):
+                    json_recur(v)
+        elif isinstance(data, list):
+            for item in data:
+                json_recur(item)
+
+    if data.get(key):
+        return data.get(key)
+    try:
+        json_recur(data)
+    except KeyError:
+        return None
+    return values
+
+
+def test_json_path_index(tmp_path):
+    """Indexed lookups match a recursive search of the JSON."""
+    specs = {
+        "pupilDiam": 6.0,
+        "ohTime": 0,
+        "scienceInstruments": [
+            {"name": "imager", "QE": 0.9, "texp": {"QE": 0.5}},
+            {"name": "spectro", "QE": 0.8, "Rs": 70},
+            {"name": "imager", "QE": 0.7},
+        ],
+        "starlightSuppressionSystems": [
+            {"name": "coro", "IWA": 0.1, "optics": [{"name": "lens", "IWA": 0.2}]},
+        ],
+        "observingModes": [{"instName": "imager", "systName": "coro", "SNR": 5}],
+        "unnamed": [{"lam": 500}],
+    }
+    path = tmp_path / "specs.json"
+    path.write_text(json.dumps(specs))
+    node = JSONFile(path)
+    keys = ["pupilDiam", "ohTime", "QE", "Rs", "IWA", "SNR", "lam", "name", "missing"]
+    for key in keys:
+        assert node._get(key) == recursive_json_get(specs, key), key
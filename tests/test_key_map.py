@@ -3,6 +3,7 @@
 import pytest
 
 from yieldplotlib.key_map import KEY_MAP
+from yieldplotlib.util import find_unit_for_module_key, get_file_key_map
 
 # Keys that are not always present in both AYO and EXOSIMS due to
 # whether all the data files are present. Generally these are keys
@@ -59,3 +60,27 @@ def test_all_common_keys_list():
     # The test passes if we get here
     print(f"Found {len(common_keys)} common keys between AYO and EXOSIMS:")
     print(", ".join(common_keys))
+
+
+def test_key_map_indices_match_scan():
+    """The inverted key map indices agree with a full scan of KEY_MAP."""
+    for key, mappings in KEY_MAP.items():
+        for module_name, module_info in mappings.items():
+            if module_name == "comment":
+                continue
+            file_key_map, transforms = get_file_key_map(
+                module_name, f"run/{module_info['file']}"
+            )
+            assert file_key_map[key] == module_info["name"]
+            assert transforms[key] == module_info["transform"]
+
+            # The module index returns the first entry using the module key
+            first_unit = next(
+                info[module_name]["unit"]
+                for info in KEY_MAP.values()
+                if info.get(module_name, {}).get("name") == module_info["name"]
+            )
+            assert (
+                find_unit_for_module_key(module_info["name"], module_name, KEY_MAP)
+                == first_unit
+            )